@@ -2,7 +2,6 @@ from flask import Flask, render_template, request, jsonify, send_from_directory
 from flask_cors import CORS
 import os
 from dotenv import load_dotenv
-import feedparser
 import requests
 from datetime import datetime, timedelta
 import json
@@ -54,6 +53,9 @@ def analyze_feeds():
     relevance_criteria = data.get('relevance_criteria', [])
     industry = data.get('industry', '')
     
+    # feedparser is only needed here, so keep it off the startup path
+    import feedparser
+    
     # Parse feeds and get articles
     articles = []
     for feed_url in feed_urls:
@@ -1,14 +1,28 @@
-from flask import Flask, render_template, request, jsonify
+import startup
+startup.trace_imports()
+
+from flask import Flask, render_template, request, jsonify, make_response, Response
 from flask_cors import CORS
 import os
 from dotenv import load_dotenv
 import requests
-from datetime import datetime
+from datetime import datetime, timezone
+import hmac
 import json
+import logging
+import math
 import re
-from rss_analyzer_simple import RSSAnalyzer
-from integrations import IntegrationManager
-from industry_feeds_ai import IndustryFeedManager
+import tempfile
+import time
+from result_cache import ResultCache
+from jobs import JobManager
+from singleflight import SingleFlight
+from startup import LazyComponent
+import metrics
+from profiling import RequestProfiler
+from feed_parser import parse_rss_content, clean_html
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -16,10 +30,145 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)
 
-# Initialize components
-analyzer = RSSAnalyzer()
-integration_manager = IntegrationManager()
-industry_manager = IndustryFeedManager()
+# Every gunicorn worker writes its metrics to one file so /metrics reports the whole node
+metrics.registry.share(
+    os.getenv('METRICS_DB_PATH', os.path.join(tempfile.gettempdir(), 'nuvian_metrics.sqlite3')),
+    flush_interval=os.getenv('METRICS_FLUSH_INTERVAL'),
+    retention=os.getenv('METRICS_RETENTION')
+)
+
+def create_shared_cache():
+    from shared_cache import SharedCache
+    return SharedCache()
+
+def create_analyzer():
+    from rss_analyzer_simple import RSSAnalyzer
+    return RSSAnalyzer(cache=shared_cache, article_fetcher=article_fetcher)
+
+def create_article_fetcher():
+    from article_text import ArticleFetcher
+    from shared_cache import SharedCache
+    # Article text gets its own size-bounded store so it can't evict feeds and analyses
+    cache = SharedCache(
+        path=os.getenv('ARTICLE_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'nuvian_article_text.sqlite3')),
+        max_bytes=int(os.getenv('ARTICLE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    )
+    return ArticleFetcher(cache=cache)
+
+def create_integration_manager():
+    from integrations import IntegrationManager
+    from delivery_ledger import DeliveryLedger
+    return IntegrationManager(ledger=DeliveryLedger())
+
+def create_industry_manager():
+    from industry_feeds_ai import IndustryFeedManager
+    return IndustryFeedManager(cache=shared_cache, registry=feed_registry)
+
+def create_feed_registry():
+    from feed_registry import FeedRegistry
+    return FeedRegistry()
+
+def create_feed_publisher():
+    from feed_publisher import FeedPublisher
+    return FeedPublisher()
+
+def create_leaderboard():
+    from leaderboard import Leaderboard
+    return Leaderboard()
+
+def create_delivery_queue():
+    from delivery_queue import DeliveryQueue
+    queue = DeliveryQueue(integration_manager)
+    queue.start()
+    return queue
+
+def create_scheduler():
+    from scheduler import DigestScheduler
+    return DigestScheduler(run_scheduled_digest)
+
+# Initialize components on first use to keep cold start fast
+shared_cache = LazyComponent('shared_cache', create_shared_cache)
+analyzer = LazyComponent('analyzer', create_analyzer)
+article_fetcher = LazyComponent('article_fetcher', create_article_fetcher)
+integration_manager = LazyComponent('integration_manager', create_integration_manager)
+industry_manager = LazyComponent('industry_manager', create_industry_manager)
+feed_registry = LazyComponent('feed_registry', create_feed_registry)
+leaderboard = LazyComponent('leaderboard', create_leaderboard)
+feed_publisher = LazyComponent('feed_publisher', create_feed_publisher)
+result_cache = ResultCache()
+job_manager = LazyComponent('job_manager', JobManager)
+delivery_queue = LazyComponent('delivery_queue', create_delivery_queue)
+scheduler = LazyComponent('scheduler', create_scheduler)
+feed_fetches = SingleFlight()
+
+FEED_CACHE_TTL = int(os.getenv('FEED_CACHE_TTL', 300))
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+startup.finish_startup()
+
+def is_admin_request():
+    """Check the admin token header; admin endpoints stay closed when ADMIN_TOKEN is not configured"""
+    if not ADMIN_TOKEN:
+        return False
+    return hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN)
+
+def read_feed_urls(data):
+    """Read feed_urls from a request body, raising ValueError unless it is a non-empty list of URL strings"""
+    value = data.get('feed_urls')
+    if not isinstance(value, list) or not value:
+        raise ValueError('feed_urls must be a non-empty list of URLs')
+    if not all(isinstance(url, str) and url.strip() for url in value):
+        raise ValueError('feed_urls must be a non-empty list of URLs')
+    return [url.strip() for url in value]
+
+def read_relevance_criteria(data):
+    """Read relevance_criteria from a request body, raising ValueError unless it is a list of strings"""
+    value = data.get('relevance_criteria')
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(criterion, str) for criterion in value):
+        raise ValueError('relevance_criteria must be a list of strings')
+    return value
+
+def read_max_articles(data):
+    """Read max_articles from a request body, raising ValueError unless it is a positive integer"""
+    value = data.get('max_articles')
+    if value is None:
+        return 20
+    try:
+        max_articles = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('max_articles must be a positive integer')
+    if max_articles < 1:
+        raise ValueError('max_articles must be a positive integer')
+    return max_articles
+
+def read_budget_ms(data):
+    """Read budget_ms from a request body, raising ValueError unless it is absent or a positive number"""
+    value = data.get('budget_ms')
+    if value is None:
+        return None
+    try:
+        budget_ms = float(value)
+    except (TypeError, ValueError):
+        raise ValueError('budget_ms must be a positive number')
+    if isinstance(value, bool) or not math.isfinite(budget_ms) or budget_ms <= 0:
+        raise ValueError('budget_ms must be a positive number')
+    return budget_ms
+
+def start_background_workers():
+    """Resume queued deliveries and scheduled digests in this process"""
+    delivery_queue.start()
+    scheduler.start()
+
+@app.before_request
+def start_background_workers_on_first_use():
+    """Start the background workers lazily where no gunicorn.conf.py hook started them"""
+    start_background_workers()
+
+# Profiles requests sent with an X-Profile header by an admin, or a random sample of them
+profiler = RequestProfiler()
+profiler.init_app(app, is_admin_request)
 
 @app.route('/')
 def index():
@@ -37,37 +186,165 @@ def discover_feeds():
     industry = data.get('industry')
     custom_industry = data.get('custom_industry')
     max_feeds = data.get('max_feeds', 10)
+    seed_urls = data.get('seed_urls', [])
     
     if custom_industry:
         industry = custom_industry
     
-    feeds = industry_manager.discover_feeds(industry, max_feeds)
+    feeds = industry_manager.discover_feeds(industry, max_feeds, seed_urls)
     return jsonify(feeds)
 
+@app.route('/api/feeds/registry')
+def feed_registry_stats():
+    """Get health and yield stats for known feeds, most productive first"""
+    industry = request.args.get('industry')
+    return jsonify(feed_registry.stats(industry=industry))
+
+@app.route('/api/feeds/opml', methods=['POST'])
+def import_opml():
+    """Import feeds from an OPML file and validate them in a background job"""
+    from opml import OPMLError, parse_opml
+    
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    industry = request.args.get('industry') or request.form.get('industry')
+    try:
+        outlines = list(parse_opml(stream))
+    except OPMLError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if not outlines:
+        return jsonify({'success': False, 'error': 'No feeds found in OPML'}), 400
+    
+    params = {'outlines': outlines, 'industry': industry}
+    client_id = request.headers.get('X-Client-Id') or request.remote_addr
+    job_id = job_manager.submit(client_id, run_opml_import_job, params)
+    if not job_id:
+        return jsonify({'success': False, 'error': 'Too many concurrent jobs for this client'}), 429
+    
+    return jsonify({'success': True, 'job_id': job_id, 'feeds': len(outlines)}), 202
+
+@app.route('/api/feeds/opml')
+def export_opml():
+    """Export registered feeds as OPML, grouped by industry"""
+    from opml import render_opml
+    
+    rows = [tuple(row) for row in feed_registry.export(request.args.get('industry'))]
+    return Response(
+        render_opml(rows),
+        mimetype='text/x-opml',
+        headers={'Content-Disposition': 'attachment; filename="nuvian-feeds.opml"'}
+    )
+
 @app.route('/api/feeds/analyze', methods=['POST'])
 def analyze_feeds():
     """Analyze RSS feeds and return relevant articles"""
     data = request.json
-    feed_urls = data.get('feed_urls', [])
-    max_articles = data.get('max_articles', 20)
-    relevance_criteria = data.get('relevance_criteria', [])
+    try:
+        feed_urls = read_feed_urls(data)
+        relevance_criteria = read_relevance_criteria(data)
+        max_articles = read_max_articles(data)
+        budget_ms = read_budget_ms(data)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     industry = data.get('industry', '')
+    include_timings = data.get('include_timings', False)
+    full_text = bool(data.get('full_text', False))
+    
+    deadline = time.monotonic() + budget_ms / 1000 if budget_ms else None
+    skipped = {'feeds': [], 'articles': []}
+    
+    def compute():
+        if not budget_ms:
+            return run_analysis(feed_urls, industry, relevance_criteria, max_articles, full_text=full_text)
+        # A budgeted request's background refresh gets the same budget, so a tiny budget never pays for
+        # a full run; fetched feeds and analyses are cached, so each refresh picks up where the last stopped
+        refresh_skipped = {'feeds': [], 'articles': []}
+        results = run_analysis(
+            feed_urls, industry, relevance_criteria, max_articles,
+            deadline=time.monotonic() + budget_ms / 1000, skipped=refresh_skipped, full_text=full_text
+        )
+        return None if refresh_skipped['feeds'] or refresh_skipped['articles'] else results
     
+    with metrics.collect_timings() as timings:
+        start = time.perf_counter()
+        cache_key = result_cache.make_key(feed_urls, industry, relevance_criteria, max_articles, full_text)
+        results, etag, state = result_cache.get(cache_key)
+        metrics.cache_requests.inc(cache='result', result=state)
+        
+        if data.get('refresh') or state == 'miss':
+            results = run_analysis(
+                feed_urls, industry, relevance_criteria, max_articles,
+                deadline=deadline, skipped=skipped, full_text=full_text
+            )
+            state = 'miss'
+            if skipped['feeds'] or skipped['articles']:
+                # Partial results are not cached; build the complete ones in the background instead
+                etag = None
+                result_cache.refresh_async(cache_key, compute)
+            else:
+                etag = result_cache.set(cache_key, results)
+        elif state == 'stale':
+            # Serve the stale copy and rebuild it in the background
+            result_cache.refresh_async(cache_key, compute)
+        
+        with metrics.stage('serialize'):
+            if etag and request.if_none_match.contains(etag):
+                response = make_response('', 304)
+            elif include_timings or deadline:
+                body = {'articles': results}
+                if deadline:
+                    body['partial'] = bool(skipped['feeds'] or skipped['articles'])
+                    body['skipped'] = skipped
+                if include_timings:
+                    timings['total'] = round((time.perf_counter() - start) * 1000, 3)
+                    body['timings'] = dict(timings)
+                response = jsonify(body)
+            else:
+                response = jsonify(results)
+    
+    response.headers['Server-Timing'] = ', '.join(
+        f'{name};dur={duration}' for name, duration in timings.items()
+    )
+    if etag:
+        response.set_etag(etag)
+    response.headers['X-Cache'] = state.upper()
+    response.headers['Cache-Control'] = f'private, max-age={int(result_cache.ttl)}'
+    # Pollers can switch to /api/articles?since=<cursor> for changes after this response
+    response.headers['X-Articles-Cursor'] = leaderboard.current_cursor()
+    return response
+
+def run_analysis(feed_urls, industry, relevance_criteria, max_articles, job=None, deadline=None, skipped=None,
+                 full_text=False):
+    """Fetch, parse, dedupe and score feeds, then analyze the top articles in score order"""
     # Parse feeds and get articles
-    articles = []
+    scored_articles = []
     seen_urls = set()  # Track URLs to prevent duplicates
     seen_titles = set()  # Track titles to prevent duplicates
+    skipped_articles = skipped['articles'] if skipped is not None else None
+    
+    # Fetch aliases of the same feed once, most productive feeds first; with a
+    # deadline, feeds that yield the most per second of fetch go first
+    feed_urls = feed_registry.rank(feed_urls, by_latency=deadline is not None)
     
-    for feed_url in feed_urls:
+    for index, feed_url in enumerate(feed_urls):
+        if job:
+            job.check_cancelled()
+            job.update('fetching', index, len(feed_urls))
+        
+        timeout = 10
+        if deadline:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                if skipped is not None:
+                    skipped['feeds'].append({'feed_url': feed_url, 'reason': 'deadline'})
+                continue
+        
+        articles = []
         try:
-            # Simple RSS parsing using requests
-            response = requests.get(feed_url, timeout=10)
-            if response.status_code == 200:
-                # Basic XML parsing to extract articles
-                content = response.text
-                feed_articles = parse_rss_content(content, feed_url)
-                
-                # Filter out duplicates
+            feed_articles = fetch_feed_articles(feed_url, timeout) or []
+            
+            # Filter out duplicates
+            with metrics.stage('dedupe'):
                 for article in feed_articles:
                     article_url = article.get('link', '').strip()
                     article_title = article.get('title', '').strip()
@@ -81,113 +358,346 @@ def analyze_feeds():
                     seen_titles.add(article_title)
                     articles.append(article)
                     
+        except (requests.Timeout, TimeoutError):
+            if deadline and skipped is not None:
+                skipped['feeds'].append({'feed_url': feed_url, 'reason': 'timeout'})
+            else:
+                logger.warning('Error parsing feed %s: timed out', feed_url)
         except Exception as e:
-            print(f"Error parsing feed {feed_url}: {e}")
+            logger.warning('Error parsing feed %s: %s', feed_url, e)
+        
+        # Score each feed's articles as they arrive so jobs can report partial results; AI
+        # analysis waits until every feed is in so it goes to the best articles overall
+        scored_articles.extend(analyzer.score_articles(
+            articles, industry, relevance_criteria, deadline, skipped_articles
+        ))
+        if job:
+            scored_articles.sort(key=lambda x: x['relevance_score'], reverse=True)
+            job.update('fetching', index + 1, len(feed_urls), scored_articles[:max_articles])
     
-    # Analyze articles with AI
-    analyzed_articles = analyzer.analyze_articles(articles, industry, relevance_criteria)
+    scored_articles.sort(key=lambda x: x['relevance_score'], reverse=True)
+    if full_text:
+        analyzer.enrich_articles(scored_articles, industry, relevance_criteria, deadline)
+    top_articles = scored_articles[:max_articles]
     
-    # Return top articles
-    return jsonify(analyzed_articles[:max_articles])
-
-def parse_rss_content(content, feed_url):
-    """Simple RSS content parser"""
-    articles = []
+    # Analyze in global score order, so a short budget is spent on the best articles
+    for index, article in enumerate(top_articles):
+        if job:
+            job.check_cancelled()
+            job.update('analyzing', index, len(top_articles), top_articles[:index])
+        analyzer.add_analysis(article, industry, deadline, skipped_articles)
+    
+    # Keep the industry's standing ranking current so top-N reads skip the pipeline
     try:
-        # Extract title, link, and description using regex
-        import re
-        
-        # Find all item blocks
-        items = re.findall(r'<item>(.*?)</item>', content, re.DOTALL)
-        
-        for item in items[:10]:  # Limit to 10 items per feed
-            title_match = re.search(r'<title>(.*?)</title>', item, re.DOTALL)
-            link_match = re.search(r'<link>(.*?)</link>', item, re.DOTALL)
-            desc_match = re.search(r'<description>(.*?)</description>', item, re.DOTALL)
-            pub_match = re.search(r'<pubDate>(.*?)</pubDate>', item, re.DOTALL)
-            
-            if title_match and link_match:
-                # Clean and extract title
-                title = clean_html(title_match.group(1)).strip()
-                
-            # Clean and extract summary/description
-            summary = ''
-            if desc_match:
-                raw_summary = desc_match.group(1)
-                # Remove HTML tags and clean up
-                summary = clean_html(raw_summary).strip()
-                # Limit summary length
-                if len(summary) > 300:
-                    summary = summary[:300] + '...'
-            
-            # If no summary from description, try to extract from content or other fields
-            if not summary:
-                # Look for content field
-                content_match = re.search(r'<content:encoded>(.*?)</content:encoded>', item, re.DOTALL)
-                if content_match:
-                    raw_content = content_match.group(1)
-                    summary = clean_html(raw_content).strip()
-                    if len(summary) > 300:
-                        summary = summary[:300] + '...'
-                
-                # If still no summary, use title as fallback
-                if not summary:
-                    summary = f"Article: {title}"
-            
-            # Final fallback - if still no summary, create one from title
-            if not summary or summary.strip() == '':
-                summary = f"Read more about: {title}"
-            
-            # Clean link
-            link = clean_html(link_match.group(1)).strip()
-            
-            # Clean published date
-            published = clean_html(pub_match.group(1)).strip() if pub_match else ''
-            
-            article = {
-                'title': title,
-                'link': link,
-                'summary': summary,
-                'published': published,
-                'source': 'RSS Feed',
-                'feed_url': feed_url
-            }
-            articles.append(article)
+        leaderboard.ingest(industry, relevance_criteria, top_articles)
     except Exception as e:
-        print(f"Error parsing RSS content: {e}")
+        logger.error('Error updating leaderboard for %s: %s', industry, e)
     
-    return articles
+    feed_registry.record_top(top_articles)
+    return top_articles
 
-def clean_html(text):
-    """Remove HTML tags from text"""
-    if not text:
-        return ''
+def fetch_feed_articles(feed_url, timeout=10):
+    """Fetch and parse a feed, sharing the result across requests and workers"""
+    cached = shared_cache.get('feeds', feed_url)
+    if cached is not None:
+        return cached
     
-    import re
-    import html
+    def fetch():
+        # Simple RSS parsing using requests
+        with metrics.stage('fetch'):
+            start = time.perf_counter()
+            try:
+                response = requests.get(feed_url, timeout=timeout)
+            except requests.RequestException:
+                feed_registry.record_fetch(feed_url, False, time.perf_counter() - start)
+                raise
+            latency = time.perf_counter() - start
+            metrics.feed_fetch_seconds.observe(latency, feed=metrics.feed_label(feed_url))
+            metrics.feed_bytes.inc(len(response.content), feed=metrics.feed_label(feed_url))
+        if response.status_code != 200:
+            feed_registry.record_fetch(feed_url, False, latency)
+            return None
+        
+        # Basic XML parsing to extract articles
+        with metrics.stage('parse'):
+            feed_articles = parse_rss_content(response.text, feed_url)
+        metrics.feed_items.inc(len(feed_articles), feed=metrics.feed_label(feed_url))
+        
+        # Redirects are followed once here and remembered, so aliases share one registry entry
+        if response.url != feed_url:
+            feed_registry.learn_alias(feed_url, response.url)
+        title_match = re.search(r'<title>(.*?)</title>', response.text[:4096], re.DOTALL)
+        feed_registry.record_fetch(
+            feed_url, True, latency, feed_articles, clean_html(title_match.group(1)) if title_match else None
+        )
+        shared_cache.set('feeds', feed_url, feed_articles, FEED_CACHE_TTL)
+        return feed_articles
     
-    # Remove HTML tags
-    clean = re.compile('<.*?>')
-    text = re.sub(clean, '', text)
+    # Concurrent callers for the same URL share one request, but each gets its own
+    # article dicts since scoring and analysis write into them
+    feed_articles = feed_fetches.do(feed_url, fetch, timeout)
+    return [dict(article) for article in feed_articles] if feed_articles else feed_articles
+
+def run_scheduled_digest(digest):
+    """Run a saved digest through the pipeline and queue its delivery"""
+    # Feeds and analyses come from the shared cache when other digests fetched them recently
+    articles = run_analysis(
+        digest['feed_urls'],
+        digest['industry'],
+        digest['relevance_criteria'],
+        digest['max_articles']
+    )
+    # Subscriber feeds are rendered here, once per ranking change, rather than per poll
+    published = feed_publisher.publish(digest['id'], digest_feed_info(digest), articles)
+    if digest['integration_type'] == 'feed':
+        return {'articles': len(articles), 'published': published}
     
-    # Decode HTML entities
-    text = html.unescape(text)
+    delivery_id = delivery_queue.enqueue(articles, digest['integration_type'], digest['config'])
+    return {'articles': len(articles), 'published': published, 'delivery_id': delivery_id}
+
+def digest_feed_info(digest):
+    """Describe a digest's published feed"""
+    base_url = os.getenv('PUBLIC_BASE_URL', '').rstrip('/')
+    industry = digest['industry'] or 'industry'
+    return {
+        'id': f"urn:nuvian:digest:{digest['id']}",
+        'title': f"Nuvian: {digest['name']}",
+        'description': f"Top {industry} articles ranked by relevance",
+        'link': base_url,
+        'self_url': f"{base_url}/api/digests/{digest['id']}/feed.atom" if base_url else None
+    }
+
+def run_opml_import_job(params, job):
+    """Validate and register OPML feeds inside the job worker pool"""
+    from opml import import_outlines
+    return import_outlines(
+        params['outlines'], feed_registry, industry_manager.discoverer, params['industry'], job
+    )
+
+def run_analysis_job(params, job):
+    """Run an analysis inside the job worker pool"""
+    return run_analysis(
+        params['feed_urls'],
+        params['industry'],
+        params['relevance_criteria'],
+        params['max_articles'],
+        job=job,
+        full_text=params.get('full_text', False)
+    )
+
+@app.route('/api/jobs/analyze', methods=['POST'])
+def submit_analyze_job():
+    """Start a background analysis and return its job id"""
+    data = request.json
+    try:
+        params = {
+            'feed_urls': read_feed_urls(data),
+            'max_articles': read_max_articles(data),
+            'relevance_criteria': read_relevance_criteria(data),
+            'industry': data.get('industry', ''),
+            'full_text': bool(data.get('full_text', False))
+        }
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    client_id = request.headers.get('X-Client-Id') or request.remote_addr
     
-    # Clean up extra whitespace
-    text = re.sub(r'\s+', ' ', text)
+    job_id = job_manager.submit(client_id, run_analysis_job, params)
+    if not job_id:
+        return jsonify({'success': False, 'error': 'Too many concurrent jobs for this client'}), 429
     
-    return text.strip()
+    return jsonify({'success': True, 'job_id': job_id}), 202
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """Get progress and partial or final results of a job"""
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running job"""
+    if not job_manager.cancel(job_id):
+        return jsonify({'success': False, 'error': 'Job not found or already finished'}), 404
+    return jsonify({'success': True, 'job_id': job_id})
 
 @app.route('/api/integrations/send', methods=['POST'])
 def send_to_integration():
-    """Send analyzed articles to external services"""
+    """Queue analyzed articles for delivery to external services"""
     data = request.json
     articles = data.get('articles', [])
     integration_type = data.get('integration_type')
     config = data.get('config', {})
+    if data.get('resend'):
+        config['resend'] = True
+    
+    if integration_type not in ('email', 'slack', 'airtable', 'notion'):
+        return jsonify({'success': False, 'error': 'Unsupported integration type'})
+    
+    delivery_id = delivery_queue.enqueue(articles, integration_type, config)
+    return jsonify({
+        'success': True,
+        'message': f'{len(articles)} articles queued for {integration_type}',
+        'delivery_id': delivery_id,
+        'status': 'queued'
+    }), 202
+
+@app.route('/api/integrations/deliveries/<delivery_id>')
+def get_delivery(delivery_id):
+    """Get the status of a queued delivery"""
+    delivery = delivery_queue.get(delivery_id)
+    if not delivery:
+        return jsonify({'success': False, 'error': 'Delivery not found'}), 404
+    return jsonify(delivery)
+
+@app.route('/api/digests')
+def list_digests():
+    """List saved digest definitions"""
+    return jsonify(scheduler.list())
+
+@app.route('/api/digests', methods=['POST'])
+def create_digest():
+    """Save a digest definition that runs on a cron schedule"""
+    data = request.json
+    # 'feed' digests only publish RSS, Atom and JSON Feed outputs
+    if data.get('integration_type') not in ('email', 'slack', 'airtable', 'notion', 'feed'):
+        return jsonify({'success': False, 'error': 'Unsupported integration type'}), 400
+    if not data.get('cron'):
+        return jsonify({'success': False, 'error': 'feed_urls and cron are required'}), 400
+    
+    try:
+        data = dict(data, feed_urls=read_feed_urls(data), relevance_criteria=read_relevance_criteria(data))
+        digest = scheduler.create(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(digest), 201
+
+@app.route('/api/digests/<digest_id>')
+def get_digest(digest_id):
+    """Get a digest definition and its last run"""
+    digest = scheduler.get(digest_id)
+    if not digest:
+        return jsonify({'success': False, 'error': 'Digest not found'}), 404
+    return jsonify(digest)
+
+@app.route('/api/digests/<digest_id>', methods=['DELETE'])
+def delete_digest(digest_id):
+    """Delete a digest definition"""
+    if not scheduler.delete(digest_id):
+        return jsonify({'success': False, 'error': 'Digest not found'}), 404
+    feed_publisher.delete(digest_id)
+    return jsonify({'success': True})
+
+@app.route('/api/digests/<digest_id>/feed.<fmt>')
+def get_digest_feed(digest_id, fmt):
+    """Serve a digest's latest ranking as RSS, Atom or JSON Feed"""
+    from feed_publisher import FORMATS
+    
+    if fmt not in FORMATS:
+        return jsonify({'success': False, 'error': 'Format must be rss, atom or json'}), 404
+    headers = feed_publisher.headers(digest_id, fmt)
+    if not headers:
+        return jsonify({'success': False, 'error': 'Feed not published yet'}), 404
+    
+    etag, updated_at = headers
+    last_modified = datetime.fromtimestamp(updated_at, timezone.utc)
+    # Conditional polls are answered from the stored validators without reading the body
+    not_modified = request.if_none_match.contains(etag) if request.if_none_match else (
+        request.if_modified_since is not None and request.if_modified_since >= last_modified
+    )
+    if not_modified:
+        response = make_response('', 304)
+    else:
+        response = make_response(feed_publisher.body(digest_id, fmt))
+        response.content_type = FORMATS[fmt]
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = f"public, max-age={int(os.getenv('PUBLISHED_FEED_MAX_AGE', 300))}"
+    return response
+
+@app.route('/api/digests/<digest_id>/run', methods=['POST'])
+def run_digest(digest_id):
+    """Run a digest now instead of waiting for its schedule"""
+    if not scheduler.run_now(digest_id):
+        return jsonify({'success': False, 'error': 'Digest not found'}), 404
+    return jsonify({'success': True, 'digest_id': digest_id}), 202
+
+@app.route('/api/cache/stats')
+def get_cache_stats():
+    """Get hit rates and sizes of the shared cache"""
+    return jsonify(shared_cache.stats())
+
+@app.route('/metrics')
+def get_metrics():
+    """Export pipeline metrics in Prometheus text format"""
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/debug/startup')
+def get_startup_report():
+    """Get the import tree timing and component initialization report"""
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    return jsonify(startup.startup_report())
+
+@app.route('/api/debug/profiles')
+def list_profiles():
+    """List stored request profiles"""
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    return jsonify(profiler.list_profiles())
+
+@app.route('/api/debug/profiles/<name>')
+def get_profile(name):
+    """Download a request profile as collapsed stacks for flamegraph tools"""
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    
+    profile = profiler.read_profile(name)
+    if profile is None:
+        return jsonify({'success': False, 'error': 'Profile not found'}), 404
+    return Response(profile, mimetype='text/plain')
+
+def parse_criteria_arg():
+    """Read the comma separated criteria a ranking was scored for from the query string"""
+    return [criterion for criterion in request.args.get('criteria', '').split(',') if criterion.strip()]
+
+@app.route('/api/leaderboard')
+def list_leaderboards():
+    """List the maintained rankings by industry and criteria"""
+    return jsonify(leaderboard.industries())
+
+@app.route('/api/leaderboard/<industry>')
+def get_leaderboard(industry):
+    """Get the top articles for an industry and criteria from the maintained ranking"""
+    limit = max(min(request.args.get('limit', 20, type=int), leaderboard.capacity), 1)
+    return jsonify(leaderboard.top(industry, parse_criteria_arg(), limit))
+
+@app.route('/api/articles')
+def list_articles():
+    """Get an industry's ranked articles, or only those that changed since a cursor"""
+    industry = request.args.get('industry', '')
+    since = request.args.get('since')
+    relevance_criteria = parse_criteria_arg()
+    limit = max(min(request.args.get('limit', 100, type=int), leaderboard.capacity), 1)
+    
+    if since:
+        try:
+            since_seq = leaderboard.decode_cursor(since)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if since_seq is not None:
+            articles, cursor, has_more = leaderboard.changes(industry, relevance_criteria, since_seq, limit)
+            return jsonify({'articles': articles, 'cursor': cursor, 'has_more': has_more, 'reset': False})
     
-    result = integration_manager.send_articles(articles, integration_type, config)
-    return jsonify(result)
+    # First poll, or a cursor the store no longer recognizes: send the full ranking
+    cursor = leaderboard.current_cursor()
+    return jsonify({
+        'articles': leaderboard.top(industry, relevance_criteria, limit),
+        'cursor': cursor,
+        'has_more': False,
+        'reset': bool(since)
+    })
 
 @app.route('/api/criteria')
 def get_relevance_criteria():
@@ -237,5 +747,6 @@ def get_relevance_criteria():
     return jsonify(criteria)
 
 if __name__ == '__main__':
+    start_background_workers()
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=False, host='0.0.0.0', port=port)
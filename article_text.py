@@ -0,0 +1,199 @@
+import codecs
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as URLLib3Error
+
+logger = logging.getLogger(__name__)
+
+class TextExtractor(HTMLParser):
+    # Boilerplate containers whose text never counts as article content
+    SKIP_TAGS = {'script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'svg', 'iframe', 'button'}
+    BLOCK_TAGS = {'p', 'h1', 'h2', 'h3', 'h4', 'li', 'blockquote', 'pre', 'div', 'section', 'td'}
+
+    def __init__(self, max_chars):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.skip_depth = 0
+        self.article_depth = 0
+        self.blocks = []
+        self.article_blocks = []
+        self.current = []
+        self.chars = 0
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        # Only skip tags are counted, since tags inside them often have no end tag (<li>, <p>, <img>)
+        if tag in self.SKIP_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth:
+            return
+        if tag in ('article', 'main'):
+            self.article_depth += 1
+        if tag in self.BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth = max(self.skip_depth - 1, 0)
+            return
+        if self.skip_depth:
+            return
+        if tag in self.BLOCK_TAGS or tag in ('article', 'main'):
+            self._flush()
+        if tag in ('article', 'main') and self.article_depth:
+            self.article_depth -= 1
+            # The main content is complete once the outermost article closes
+            if not self.article_depth and self.article_chars() >= 500:
+                self.done = True
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.current.append(data)
+
+    def _flush(self):
+        text = re.sub(r'\s+', ' ', ''.join(self.current)).strip()
+        self.current = []
+        # Short fragments are usually menus, bylines and buttons
+        if len(text) < 40:
+            return
+        (self.article_blocks if self.article_depth else self.blocks).append(text)
+        self.chars += len(text)
+        if self.chars >= self.max_chars:
+            self.done = True
+
+    def article_chars(self):
+        return sum(len(block) for block in self.article_blocks)
+
+    def text(self):
+        self._flush()
+        blocks = self.article_blocks if self.article_chars() >= 200 else self.article_blocks + self.blocks
+        return '\n\n'.join(blocks)[:self.max_chars]
+
+def iter_available(response, size):
+    """Yield body chunks as they arrive instead of waiting for full chunks, so time limits hold on slow pages"""
+    read1 = getattr(response.raw, 'read1', None)
+    if read1 is None:
+        # urllib3 1.x has no read1; small chunks keep the wait per read short
+        yield from response.iter_content(min(size, 1024))
+        return
+    while True:
+        chunk = read1(size, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+CHARSET_PATTERN = re.compile(rb'''<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)''', re.IGNORECASE)
+# Bytes of a page inspected for a <meta> charset, as in the HTML encoding sniffing algorithm
+SNIFF_BYTES = 1024
+
+def detect_encoding(content_type, head):
+    """Pick a page's encoding from a BOM, the Content-Type charset or a <meta> charset, defaulting to UTF-8"""
+    # requests assumes ISO-8859-1 when the header has no charset, which garbles UTF-8 pages
+    for bom, encoding in ((codecs.BOM_UTF8, 'utf-8'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16')):
+        if head.startswith(bom):
+            return encoding
+    candidates = []
+    match = re.search(r'charset\s*=\s*["\']?([A-Za-z0-9_.:-]+)', content_type or '', re.IGNORECASE)
+    if match:
+        candidates.append(match.group(1))
+    match = CHARSET_PATTERN.search(head[:SNIFF_BYTES])
+    if match:
+        candidates.append(match.group(1).decode('ascii'))
+    for candidate in candidates:
+        try:
+            return codecs.lookup(candidate).name
+        except LookupError:
+            continue
+    return 'utf-8'
+
+class ArticleFetcher:
+    def __init__(self, cache=None, workers=None):
+        self.cache = cache
+        self.workers = int(workers or os.getenv('ARTICLE_FETCH_WORKERS', 8))
+        # Hard limits per page: bytes read, wall-clock seconds and characters kept
+        self.max_bytes = int(os.getenv('ARTICLE_MAX_BYTES', 1024 * 1024))
+        self.timeout = float(os.getenv('ARTICLE_FETCH_TIMEOUT', 5))
+        self.max_chars = int(os.getenv('ARTICLE_MAX_CHARS', 8000))
+        self.cache_ttl = int(os.getenv('ARTICLE_CACHE_TTL', 7 * 86400))
+        self.negative_ttl = int(os.getenv('ARTICLE_NEGATIVE_TTL', 3600))
+        self.chunk_size = 16384
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['User-Agent'] = 'NuvianArticleFetcher/1.0'
+
+    def fetch_text(self, url, deadline=None):
+        """Return the main text of an article page, or '' if it can't be fetched within the limits"""
+        if self.cache:
+            cached = self.cache.get('articles', url)
+            if cached is not None:
+                return cached
+
+        stop_at = time.monotonic() + self.timeout
+        if deadline:
+            stop_at = min(stop_at, deadline)
+        if stop_at <= time.monotonic():
+            return ''
+
+        text = ''
+        timed_out = False
+        try:
+            with self.session.get(url, timeout=max(stop_at - time.monotonic(), 0.1), stream=True) as response:
+                content_type = response.headers.get('Content-Type', '')
+                if response.status_code == 200 and 'html' in content_type:
+                    extractor = TextExtractor(self.max_chars)
+                    read = 0
+                    head = b''
+                    decoder = None
+                    for chunk in iter_available(response, self.chunk_size):
+                        read += len(chunk)
+                        if decoder is None:
+                            # Hold back the start of the page until its <meta> charset can be seen
+                            head += chunk
+                            if len(head) < SNIFF_BYTES and read < self.max_bytes and time.monotonic() < stop_at:
+                                continue
+                            chunk, head = head, b''
+                            # Incremental, so a multibyte character split across chunks decodes intact
+                            decoder = codecs.getincrementaldecoder(detect_encoding(content_type, chunk))('replace')
+                        extractor.feed(decoder.decode(chunk))
+                        if extractor.done or read >= self.max_bytes:
+                            break
+                        if time.monotonic() >= stop_at:
+                            timed_out = True
+                            break
+                    if decoder is None:
+                        decoder = codecs.getincrementaldecoder(detect_encoding(content_type, head))('replace')
+                    extractor.feed(decoder.decode(head, final=True))
+                    text = extractor.text()
+        except (requests.RequestException, URLLib3Error, OSError) as e:
+            logger.warning('Error fetching article %s: %s', url, e)
+
+        # Pages cut short by the time limit are retried sooner, like failures
+        if self.cache:
+            self.cache.set('articles', url, text, self.cache_ttl if text and not timed_out else self.negative_ttl)
+        return text
+
+    def enrich(self, articles, deadline=None):
+        """Fetch full text for articles concurrently, setting article['full_text']"""
+        articles = [article for article in articles if article.get('link')]
+        if not articles:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(articles))) as executor:
+            texts = list(executor.map(lambda article: self.fetch_text(article['link'], deadline), articles))
+
+        enriched = 0
+        for article, text in zip(articles, texts):
+            if text:
+                article['full_text'] = text
+                enriched += 1
+        return enriched
@@ -0,0 +1,217 @@
+"""Re-rank archived feed snapshots offline.
+
+Walks a directory or tar archive of feed XML files, parses and scores them in a
+process pool and writes the ranked articles as JSONL or Parquet:
+
+    python batch_rank.py snapshots/ --industry fintech --criteria "trending, expertise" --output ranked.jsonl
+    python batch_rank.py snapshots.tar.gz --industry healthcare --top 1000 --format parquet --output ranked.parquet
+"""
+import argparse
+import gzip
+import heapq
+import json
+import os
+import sys
+import tarfile
+import threading
+import time
+from multiprocessing import Pool
+
+from feed_parser import parse_rss_content
+
+FEED_EXTENSIONS = ('.xml', '.rss', '.atom')
+OUTPUT_FIELDS = ('title', 'link', 'summary', 'published', 'source', 'feed_url', 'relevance_score')
+
+_analyzer = None
+_settings = None
+
+def is_feed_file(name):
+    name = name.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    return name.endswith(FEED_EXTENSIONS)
+
+def iter_directory(root):
+    """Yield (name, path) for feed files under a directory, in a stable order"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if is_feed_file(filename):
+                path = os.path.join(dirpath, filename)
+                yield os.path.relpath(path, root), path
+
+def iter_tar(path):
+    """Yield (name, bytes) for feed files in a tar archive, reading it once front to back"""
+    with tarfile.open(path, 'r:*') as archive:
+        for member in archive:
+            if member.isfile() and is_feed_file(member.name):
+                handle = archive.extractfile(member)
+                if handle is not None:
+                    yield member.name, handle.read()
+
+def iter_batches(sources, size):
+    batch = []
+    for source in sources:
+        batch.append(source)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def iter_bounded(batches, slots, stop):
+    """Yield batches only while a slot is free, so the pool's feeder can't read the whole input ahead"""
+    for batch in batches:
+        slots.acquire()
+        if stop.is_set():
+            return
+        yield batch
+
+def _init_worker(industry, criteria, max_items):
+    global _analyzer, _settings
+    # Scoring is keyword based, so workers need neither the AI key nor a cache
+    os.environ.pop('OPENAI_API_KEY', None)
+    from rss_analyzer_simple import RSSAnalyzer
+    _analyzer = RSSAnalyzer()
+    _settings = (industry, criteria, max_items)
+
+def _read(source):
+    """Return the raw bytes of a feed given as a path or already-read bytes"""
+    name, data = source
+    if isinstance(data, str):
+        with open(data, 'rb') as handle:
+            data = handle.read()
+    if name.lower().endswith('.gz'):
+        data = gzip.decompress(data)
+    return data
+
+def score_batch(batch):
+    """Parse and score a batch of feed files in a worker, returning (articles, files, bytes, items, errors)"""
+    industry, criteria, max_items = _settings
+    articles = []
+    read_bytes = 0
+    items = 0
+    errors = 0
+    for source in batch:
+        try:
+            data = _read(source)
+        except (OSError, EOFError, gzip.BadGzipFile) as e:
+            print(f"Error reading {source[0]}: {e}", file=sys.stderr)
+            errors += 1
+            continue
+        read_bytes += len(data)
+        parse_errors = []
+        parsed = parse_rss_content(data.decode('utf-8', 'replace'), source[0], max_items, parse_errors)
+        items += len(parsed)
+        if parse_errors:
+            errors += 1
+        # Scored per file so results don't depend on how files were batched
+        for article in _analyzer.score_articles(parsed, industry, criteria):
+            articles.append({field: article.get(field) for field in OUTPUT_FIELDS})
+
+    return articles, len(batch), read_bytes, items, errors
+
+def write_jsonl(articles, handle):
+    for rank, article in enumerate(articles, 1):
+        handle.write(json.dumps(dict(article, rank=rank), ensure_ascii=False) + '\n')
+
+def write_parquet(articles, path):
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit('Error: Parquet output needs pyarrow (pip install pyarrow)')
+    table = pyarrow.Table.from_pylist([dict(article, rank=rank) for rank, article in enumerate(articles, 1)])
+    pyarrow.parquet.write_table(table, path)
+
+def _rank_order(article):
+    return -article['relevance_score'], article['link'] or '', article['feed_url'] or ''
+
+def parse_criteria(value):
+    """Split a comma separated criteria list, rejecting names the analyzer doesn't score"""
+    from rss_analyzer_simple import RSSAnalyzer
+    criteria = [criterion.strip().lower() for criterion in value.split(',') if criterion.strip()]
+    unknown = [criterion for criterion in criteria if criterion not in RSSAnalyzer.SCORED_CRITERIA]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown criteria {', '.join(unknown)} (choose from {', '.join(RSSAnalyzer.SCORED_CRITERIA)})"
+        )
+    return criteria
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Rank archived feed XML files offline')
+    parser.add_argument('input', help='directory or tar archive (optionally compressed) of feed XML files')
+    parser.add_argument('--industry', required=True)
+    parser.add_argument('--criteria', type=parse_criteria, default=[],
+                        help='comma separated relevance criteria: trending, innovation, expertise')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-size', type=int, default=int(os.getenv('BATCH_RANK_BATCH_SIZE', 64)),
+                        help='feed files per worker task')
+    parser.add_argument('--max-items', type=int, default=0, help='items kept per feed file; 0 keeps all')
+    parser.add_argument('--top', type=int, default=0, help='only write the best N articles; 0 writes all')
+    parser.add_argument('--format', choices=('jsonl', 'parquet'), default='jsonl')
+    parser.add_argument('--output', help='output file; JSONL defaults to stdout')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.format == 'parquet' and not args.output:
+        raise SystemExit('Error: --output is required for Parquet output')
+    if os.path.isdir(args.input):
+        sources = iter_directory(args.input)
+    elif tarfile.is_tarfile(args.input):
+        sources = iter_tar(args.input)
+    else:
+        raise SystemExit(f'Error: {args.input} is neither a directory nor a tar archive')
+
+    start = time.perf_counter()
+    files = read_bytes = items = errors = 0
+    # Articles keyed by link so the same item archived in several snapshots is ranked once
+    best = {}
+    settings = (args.industry, args.criteria, args.max_items or None)
+    # A couple of batches per worker are read ahead; the rest of a tar archive stays unread until needed
+    slots = threading.Semaphore(max(args.workers, 1) * 2)
+    stop = threading.Event()
+    batches = iter_bounded(iter_batches(sources, max(args.batch_size, 1)), slots, stop)
+    with Pool(max(args.workers, 1), initializer=_init_worker, initargs=settings) as pool:
+        try:
+            results = pool.imap_unordered(score_batch, batches)
+            for articles, batch_files, batch_bytes, batch_items, batch_errors in results:
+                slots.release()
+                files += batch_files
+                read_bytes += batch_bytes
+                items += batch_items
+                errors += batch_errors
+                for article in articles:
+                    key = article['link'] or article['title']
+                    previous = best.get(key)
+                    if previous is None or _rank_order(article) < _rank_order(previous):
+                        best[key] = article
+        finally:
+            # Unblock the feeder so the pool can shut down
+            stop.set()
+            slots.release()
+
+    if args.top:
+        ranked = heapq.nsmallest(args.top, best.values(), key=_rank_order)
+    else:
+        ranked = sorted(best.values(), key=_rank_order)
+
+    if args.format == 'parquet':
+        write_parquet(ranked, args.output)
+    elif args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            write_jsonl(ranked, handle)
+    else:
+        write_jsonl(ranked, sys.stdout)
+
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(
+        f"Ranked {len(ranked)} of {len(best)} unique articles from {files} files ({errors} unreadable or malformed) "
+        f"with {args.workers} workers in {elapsed:.2f}s: {files / elapsed:.1f} files/s, "
+        f"{items / elapsed:.1f} items/s, {read_bytes / elapsed / 1e6:.2f} MB/s",
+        file=sys.stderr
+    )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+TOPICS = [
+    'AI', 'machine learning', 'GPT', 'LLM', 'transformer', 'neural networks',
+    'research', 'benchmark', 'startup', 'funding', 'breakthrough', 'release',
+    'analysis', 'expert', 'trending', 'innovation', 'model', 'inference'
+]
+
+WORDS = [
+    'company', 'announced', 'today', 'new', 'update', 'team', 'report', 'users',
+    'market', 'data', 'system', 'platform', 'launch', 'open', 'source', 'study',
+    'performance', 'results', 'industry', 'customers', 'product', 'growth'
+]
+
+def _sentence(rng, length):
+    words = [rng.choice(WORDS) for _ in range(length)]
+    words[rng.randrange(length)] = rng.choice(TOPICS)
+    return ' '.join(words).capitalize() + '.'
+
+def _html_body(rng, paragraphs):
+    parts = []
+    for _ in range(paragraphs):
+        text = ' '.join(_sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(2, 5)))
+        parts.append(f'<p>{text} <a href="https://example.com/{rng.randint(1, 9999)}">more</a></p>')
+    return ''.join(parts)
+
+def generate_items(count, seed=0, feed_id=0):
+    """Generate synthetic article dicts with HTML bodies and recent dates"""
+    rng = random.Random(f'{seed}-{feed_id}')
+    now = datetime.now(timezone.utc)
+    items = []
+    for index in range(count):
+        items.append({
+            'title': _sentence(rng, rng.randint(5, 12)).rstrip('.'),
+            'link': f'https://bench-{feed_id}.example.com/articles/{index}',
+            'description': _html_body(rng, 1),
+            'content': _html_body(rng, rng.randint(3, 8)),
+            'published': now - timedelta(hours=rng.randint(0, 24 * 60))
+        })
+    return items
+
+def generate_rss(count, seed=0, feed_id=0):
+    """Generate an RSS 2.0 document with count items"""
+    entries = []
+    for item in generate_items(count, seed, feed_id):
+        entries.append(
+            '<item>'
+            f'<title>{escape(item["title"])}</title>'
+            f'<link>{escape(item["link"])}</link>'
+            f'<description>{escape(item["description"])}</description>'
+            f'<content:encoded><![CDATA[{item["content"]}]]></content:encoded>'
+            f'<pubDate>{format_datetime(item["published"])}</pubDate>'
+            '</item>'
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">'
+        f'<channel><title>Benchmark Feed {feed_id}</title>'
+        f'<link>https://bench-{feed_id}.example.com/</link>'
+        '<description>Synthetic benchmark feed</description>'
+        + ''.join(entries) +
+        '</channel></rss>'
+    )
+
+def generate_atom(count, seed=0, feed_id=0):
+    """Generate an Atom 1.0 document with count entries"""
+    entries = []
+    for item in generate_items(count, seed, feed_id):
+        entries.append(
+            '<entry>'
+            f'<title>{escape(item["title"])}</title>'
+            f'<link href="{escape(item["link"])}"/>'
+            f'<id>{escape(item["link"])}</id>'
+            f'<updated>{item["published"].isoformat()}</updated>'
+            f'<summary type="html">{escape(item["description"])}</summary>'
+            f'<content type="html">{escape(item["content"])}</content>'
+            '</entry>'
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom">'
+        f'<title>Benchmark Atom Feed {feed_id}</title>'
+        f'<id>https://bench-{feed_id}.example.com/</id>'
+        + ''.join(entries) +
+        '</feed>'
+    )
+
+def generate_articles(count, seed=0):
+    """Generate article dicts shaped like parse_rss_content output"""
+    articles = []
+    for index, item in enumerate(generate_items(count, seed)):
+        articles.append({
+            'title': item['title'],
+            'link': item['link'],
+            'summary': item['description'][:300],
+            'published': item['published'].strftime('%Y-%m-%d'),
+            'source': 'RSS Feed',
+            'feed_url': f'https://bench-0.example.com/feed/{index % 10}',
+            'relevance_score': (index * 37) % 100,
+            'analysis': _sentence(random.Random(index), 30)
+        })
+    return articles
@@ -0,0 +1,251 @@
+"""HTTP load test for app_simple under gunicorn with stand-in upstreams.
+
+Run from the repository root:
+
+    python -m benchmarks.load_test --workers 2 --concurrency 16 --duration 30
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from benchmarks.standins import FeedServer, MockOpenAIServer, store_environment
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def child_pids(pid):
+    """Return direct children of a process using /proc"""
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            if int(fields[1]) == pid:
+                children.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return children
+
+def rss_kb(pid):
+    """Return the resident set size of a process in kilobytes"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+class MemorySampler:
+    def __init__(self, master_pid, interval=0.5):
+        self.master_pid = master_pid
+        self.interval = interval
+        self.peak_kb = {}
+        self.last_kb = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            for pid in child_pids(self.master_pid):
+                kb = rss_kb(pid)
+                if kb is not None:
+                    self.last_kb[pid] = kb
+                    self.peak_kb[pid] = max(kb, self.peak_kb.get(pid, 0))
+            self._stop.wait(self.interval)
+
+def start_gunicorn(args, env):
+    port = free_port()
+    command = [
+        sys.executable, '-m', 'gunicorn', 'app_simple:app',
+        '--bind', f'127.0.0.1:{port}',
+        '--workers', str(args.workers),
+        '--threads', str(args.threads),
+        '--timeout', str(args.timeout),
+        '--log-level', 'warning'
+    ]
+    process = subprocess.Popen(command, cwd=ROOT_DIR, env=env)
+    base_url = f'http://127.0.0.1:{port}'
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            requests.get(f'{base_url}/api/criteria', timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            if process.poll() is not None:
+                raise RuntimeError('gunicorn exited during startup')
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('gunicorn did not become ready')
+
+def build_requests(args, feed_urls):
+    """Return (name, method, path, body) templates for each endpoint"""
+    return {
+        'industries': ('GET', '/api/industries', None),
+        'criteria': ('GET', '/api/criteria', None),
+        'discover': ('POST', '/api/feeds/discover', {'industry': 'bench', 'max_feeds': args.feeds}),
+        'analyze': ('POST', '/api/feeds/analyze', {
+            'feed_urls': feed_urls,
+            'industry': 'ai',
+            'relevance_criteria': ['trending', 'innovation'],
+            'max_articles': 20,
+            'refresh': args.no_cache
+        })
+    }
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(','):
+        name, weight = part.split('=')
+        weights[name.strip()] = float(weight)
+    return weights
+
+def run_load(args, base_url, templates):
+    weights = parse_mix(args.mix)
+    names = list(weights)
+    samples = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    lock = threading.Lock()
+    deadline = time.time() + args.duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+        session = requests.Session()
+        while time.time() < deadline:
+            name = rng.choices(names, weights=[weights[n] for n in names])[0]
+            method, path, body = templates[name]
+            start = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, json=body, timeout=args.timeout + 5)
+                ok = response.status_code < 400
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples[name].append(elapsed)
+                if not ok:
+                    errors[name] += 1
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    report = {}
+    for name in names + ['total']:
+        latencies = samples[name] if name != 'total' else [s for n in names for s in samples[n]]
+        failed = errors[name] if name != 'total' else sum(errors.values())
+        count = len(latencies)
+        report[name] = {
+            'requests': count,
+            'error_rate': round(failed / count, 4) if count else 0.0,
+            'throughput_rps': round(count / wall, 2),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 1) if count else None,
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 1) if count else None,
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 1) if count else None
+        }
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test app_simple under gunicorn')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=1, help='gunicorn threads per worker')
+    parser.add_argument('--timeout', type=int, default=30, help='gunicorn worker timeout in seconds')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent client connections')
+    parser.add_argument('--duration', type=float, default=20, help='test duration in seconds')
+    parser.add_argument('--mix', default='industries=2,criteria=2,discover=1,analyze=1',
+                        help='endpoint weights, e.g. analyze=1,criteria=3')
+    parser.add_argument('--feeds', type=int, default=5, help='feeds per discover/analyze request')
+    parser.add_argument('--items', type=int, default=20, help='items per synthetic feed')
+    parser.add_argument('--latency', type=float, default=0.05, help='feed server latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of feed requests that fail')
+    parser.add_argument('--llm-latency', type=float, default=0.05, help='mock OpenAI latency in seconds')
+    parser.add_argument('--no-cache', action='store_true', help='bypass the analyze result cache')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix='nuvian-load-')
+    with FeedServer(args.items, args.latency, args.error_rate) as feed_server, \
+            MockOpenAIServer(args.llm_latency) as openai_server:
+        feed_urls = feed_server.feed_urls(args.feeds)
+        feeds_file = os.path.join(work_dir, 'industry_feeds.json')
+        with open(feeds_file, 'w') as f:
+            json.dump({'bench': feed_urls, 'ai': feed_urls}, f)
+
+        env = dict(os.environ)
+        env.update(store_environment(work_dir))
+        env.update({
+            'INDUSTRY_FEEDS_FILE': feeds_file,
+            'OPENAI_API_KEY': 'load-test',
+            'OPENAI_API_BASE': openai_server.api_base
+        })
+
+        process, base_url = start_gunicorn(args, env)
+        sampler = MemorySampler(process.pid)
+        sampler.start()
+        try:
+            report = run_load(args, base_url, build_requests(args, feed_urls))
+        finally:
+            sampler.stop()
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=30)
+
+    report = {
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'endpoints': report,
+        'worker_rss_mb': {
+            str(pid): {'peak': round(peak / 1024, 1), 'last': round(sampler.last_kb.get(pid, 0) / 1024, 1)}
+            for pid, peak in sampler.peak_kb.items()
+        },
+        'llm_calls': openai_server.calls
+    }
+
+    print(f"{'endpoint':<12} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, stats in report['endpoints'].items():
+        print(f"{name:<12} {stats['requests']:>7} {stats['throughput_rps']:>8} "
+              f"{stats['error_rate'] * 100:>5.1f}% {stats['p50_ms'] or 0:>7.1f}ms "
+              f"{stats['p95_ms'] or 0:>7.1f}ms {stats['p99_ms'] or 0:>7.1f}ms")
+    for pid, memory in report['worker_rss_mb'].items():
+        print(f"worker {pid}: peak RSS {memory['peak']} MB, last {memory['last']} MB")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""Offline benchmarks for the analyze pipeline.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import generate_articles, generate_rss
+from benchmarks.standins import FeedServer, MockOpenAIServer, store_environment
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def measure(func, iterations, items_per_call=1):
+    """Call func repeatedly and summarize per-call latency and throughput"""
+    func()  # warm up
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+
+    durations.sort()
+    median = statistics.median(durations)
+    return {
+        'iterations': iterations,
+        'min_ms': round(durations[0] * 1000, 3),
+        'median_ms': round(median * 1000, 3),
+        'p95_ms': round(durations[min(len(durations) - 1, int(len(durations) * 0.95))] * 1000, 3),
+        'items_per_s': round(items_per_call / median, 1) if median else None
+    }
+
+def configure_environment(openai_server):
+    # Caches are disabled so every iteration exercises the full pipeline
+    os.environ.update(store_environment(tempfile.mkdtemp(prefix='nuvian-bench-')))
+    os.environ['FEED_CACHE_TTL'] = '0'
+    os.environ['ANALYSIS_CACHE_TTL'] = '0'
+    os.environ['RESULT_CACHE_TTL'] = '0'
+    os.environ['RESULT_CACHE_STALE_TTL'] = '0'
+    os.environ['OPENAI_API_KEY'] = 'benchmark'
+    os.environ['OPENAI_API_BASE'] = openai_server.api_base
+
+def run_micro(args):
+    import app_simple
+    from integrations import IntegrationManager
+    from rss_analyzer_simple import RSSAnalyzer
+
+    results = {}
+    rss = generate_rss(args.items, seed=args.seed)
+    html_snippet = generate_articles(1, seed=args.seed)[0]['analysis'] * 20
+    html_snippet = f'<div><p>{html_snippet}</p><a href="#">link</a> &amp; more</div>'
+
+    results['parse_rss_content'] = measure(
+        lambda: app_simple.parse_rss_content(rss, 'http://bench/rss'),
+        args.iterations, items_per_call=min(args.items, 10)
+    )
+    results['clean_html'] = measure(
+        lambda: app_simple.clean_html(html_snippet), args.iterations * 10
+    )
+
+    analyzer = RSSAnalyzer()
+    analyzer.openai_api_key = None
+    articles = generate_articles(args.articles, seed=args.seed)
+    results['analyze_articles_scoring'] = measure(
+        lambda: analyzer.analyze_articles([dict(a) for a in articles], 'ai', ['trending', 'innovation']),
+        args.iterations, items_per_call=len(articles)
+    )
+
+    manager = IntegrationManager()
+    results['format_articles_html'] = measure(
+        lambda: manager._format_articles_html(articles), args.iterations, items_per_call=len(articles)
+    )
+    results['format_articles_slack'] = measure(
+        lambda: manager._format_articles_slack(articles), args.iterations, items_per_call=len(articles)
+    )
+    return results
+
+def run_end_to_end(args, feed_server, openai_server):
+    import app_simple
+
+    client = app_simple.app.test_client()
+    payload = {
+        'feed_urls': feed_server.feed_urls(args.feeds),
+        'industry': 'ai',
+        'relevance_criteria': ['trending', 'innovation'],
+        'max_articles': 20,
+        'refresh': True
+    }
+
+    statuses = []
+    def analyze():
+        response = client.post('/api/feeds/analyze', json=payload)
+        statuses.append(response.status_code)
+
+    calls_before = openai_server.calls
+    result = measure(analyze, args.e2e_iterations, items_per_call=1)
+    result['feeds'] = args.feeds
+    result['errors'] = sum(1 for status in statuses if status != 200)
+    result['llm_calls'] = openai_server.calls - calls_before
+    return {'analyze_endpoint': result}
+
+def compare(base_path, new_path):
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    print(f"{'benchmark':<30} {base['revision']:>12} {new['revision']:>12} {'change':>9}")
+    for name, result in new['results'].items():
+        if name not in base['results']:
+            continue
+        old_ms = base['results'][name]['median_ms']
+        new_ms = result['median_ms']
+        change = (new_ms - old_ms) / old_ms * 100 if old_ms else 0.0
+        print(f'{name:<30} {old_ms:>10.3f}ms {new_ms:>10.3f}ms {change:>+8.1f}%')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run offline benchmarks for the RSS analyzer')
+    parser.add_argument('--feeds', type=int, default=10, help='feeds per analyze request')
+    parser.add_argument('--items', type=int, default=50, help='items per synthetic feed')
+    parser.add_argument('--articles', type=int, default=200, help='articles for scoring and formatting')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--e2e-iterations', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.05, help='feed server latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of feed requests that fail')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='fraction of feed bodies sent slowly')
+    parser.add_argument('--llm-latency', type=float, default=0.02, help='mock OpenAI latency in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='where to write results (default: benchmarks/results/<revision>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='compare two result files and exit')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    with FeedServer(args.items, args.latency, args.error_rate, args.slow_rate, seed=args.seed) as feed_server, \
+            MockOpenAIServer(args.llm_latency) as openai_server:
+        configure_environment(openai_server)
+        results = run_micro(args)
+        results.update(run_end_to_end(args, feed_server, openai_server))
+
+    report = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'results': results
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in results.items():
+        print(f"{name:<30} median {result['median_ms']:>10.3f}ms  p95 {result['p95_ms']:>10.3f}ms  "
+              f"{result['items_per_s'] or 0:>12.1f} items/s")
+    print(f'Results written to {output}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
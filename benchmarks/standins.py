@@ -0,0 +1,359 @@
+import json
+import os
+import random
+import re
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.corpus import generate_atom, generate_rss
+
+# Every SQLite store the app opens, so a benchmark never reads or writes the real ones
+STORE_PATH_VARIABLES = {
+    'SHARED_CACHE_PATH': 'cache.sqlite3',
+    'ARTICLE_CACHE_PATH': 'article_text.sqlite3',
+    'FEED_REGISTRY_PATH': 'feed_registry.sqlite3',
+    'LEADERBOARD_PATH': 'leaderboard.sqlite3',
+    'JOBS_DB_PATH': 'jobs.sqlite3',
+    'DELIVERY_DB_PATH': 'deliveries.sqlite3',
+    'DELIVERY_LEDGER_PATH': 'delivery_ledger.sqlite3',
+    'SCHEDULER_DB_PATH': 'digests.sqlite3',
+    'PUBLISHED_FEEDS_PATH': 'published_feeds.sqlite3',
+    'METRICS_DB_PATH': 'metrics.sqlite3',
+    'RATE_LIMIT_DB_PATH': 'rate_limits.sqlite3'
+}
+
+def store_environment(work_dir):
+    """Return environment variables pointing every app store into work_dir"""
+    return {name: os.path.join(work_dir, filename) for name, filename in STORE_PATH_VARIABLES.items()}
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type, chunk_delay=0.0):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+
+        if not chunk_delay:
+            self.wfile.write(data)
+            return
+
+        # Dribble the body out to simulate a slow upstream
+        chunk_size = 4096
+        for offset in range(0, len(data), chunk_size):
+            self.wfile.write(data[offset:offset + chunk_size])
+            self.wfile.flush()
+            time.sleep(chunk_delay)
+
+class StandInServer:
+    def __init__(self, handler_class):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler_class)
+        self.server.daemon_threads = True
+        self.server.standin = self
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+class _FeedHandler(_QuietHandler):
+    def do_GET(self):
+        config = self.server.standin
+        match = re.match(r'^/(rss|atom)/(\d+)\.xml$', self.path)
+        if not match:
+            self._send(404, 'not found', 'text/plain')
+            return
+
+        if config.latency:
+            time.sleep(config.latency * config.rng.uniform(0.5, 1.5))
+        if config.error_rate and config.rng.random() < config.error_rate:
+            self._send(503, 'upstream error', 'text/plain')
+            return
+
+        kind, feed_id = match.group(1), int(match.group(2))
+        body = config.document(kind, feed_id)
+        slow = config.slow_rate and config.rng.random() < config.slow_rate
+        content_type = 'application/rss+xml' if kind == 'rss' else 'application/atom+xml'
+        self._send(200, body, content_type, config.slow_chunk_delay if slow else 0.0)
+
+class FeedServer(StandInServer):
+    def __init__(self, items_per_feed=20, latency=0.0, error_rate=0.0,
+                 slow_rate=0.0, slow_chunk_delay=0.05, seed=0):
+        super().__init__(_FeedHandler)
+        self.items_per_feed = items_per_feed
+        self.latency = latency
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_chunk_delay = slow_chunk_delay
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self._documents = {}
+        self._lock = threading.Lock()
+
+    def document(self, kind, feed_id):
+        """Return the cached synthetic document for a feed"""
+        key = (kind, feed_id)
+        with self._lock:
+            if key not in self._documents:
+                generate = generate_rss if kind == 'rss' else generate_atom
+                self._documents[key] = generate(self.items_per_feed, self.seed, feed_id)
+            return self._documents[key]
+
+    def feed_urls(self, count, kind='rss'):
+        """Return URLs for count distinct feeds"""
+        return [f'{self.base_url}/{kind}/{feed_id}.xml' for feed_id in range(count)]
+
+class _OpenAIHandler(_QuietHandler):
+    def do_POST(self):
+        config = self.server.standin
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+
+        if not self.path.endswith('/chat/completions'):
+            self._send(404, json.dumps({'error': 'not found'}), 'application/json')
+            return
+        if config.latency:
+            time.sleep(config.latency)
+
+        with config.lock:
+            config.calls += 1
+
+        prompt = request.get('messages', [{}])[-1].get('content', '')
+        body = {
+            'id': 'chatcmpl-bench',
+            'object': 'chat.completion',
+            'model': request.get('model', 'gpt-3.5-turbo'),
+            'choices': [{
+                'index': 0,
+                'message': {
+                    'role': 'assistant',
+                    'content': 'Benchmark analysis: relevant to the industry with notable implications.'
+                },
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': len(prompt.split()),
+                'completion_tokens': 10,
+                'total_tokens': len(prompt.split()) + 10
+            }
+        }
+        self._send(200, json.dumps(body), 'application/json')
+
+class MockOpenAIServer(StandInServer):
+    def __init__(self, latency=0.0):
+        super().__init__(_OpenAIHandler)
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    @property
+    def api_base(self):
+        return f'{self.base_url}/v1'
+
+class _NotionHandler(_QuietHandler):
+    def do_POST(self):
+        config = self.server.standin
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+
+        if self.path != '/v1/pages':
+            self._send(404, json.dumps({'object': 'error', 'status': 404}), 'application/json')
+            return
+
+        with config.lock:
+            config.requests += 1
+            throttled = config.throttle_every and config.requests % config.throttle_every == 0
+            if not throttled:
+                page_id = f'page-{len(config.pages) + 1}'
+                config.pages.append(payload)
+
+        if throttled:
+            self.send_response(429)
+            self.send_header('Retry-After', str(config.retry_after))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if config.latency:
+            time.sleep(config.latency)
+        self._send(200, json.dumps({'object': 'page', 'id': page_id}), 'application/json')
+
+class MockNotionServer(StandInServer):
+    def __init__(self, latency=0.0, throttle_every=0, retry_after=1):
+        super().__init__(_NotionHandler)
+        self.latency = latency
+        # Every Nth request gets a 429 with Retry-After
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.pages = []
+        self.lock = threading.Lock()
+
+    @property
+    def api_base(self):
+        return f'{self.base_url}/v1'
+
+class _AirtableHandler(_QuietHandler):
+    def do_PATCH(self):
+        config = self.server.standin
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+
+        if not re.match(r'^/v0/[^/]+/[^/]+$', self.path):
+            self._send(404, json.dumps({'error': 'NOT_FOUND'}), 'application/json')
+            return
+
+        with config.lock:
+            config.requests += 1
+            throttled = config.throttle_every and config.requests % config.throttle_every == 0
+
+        if throttled:
+            self.send_response(429)
+            self.send_header('Retry-After', str(config.retry_after))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        merge_on = payload.get('performUpsert', {}).get('fieldsToMergeOn', [])
+        created, updated, records = [], [], []
+        with config.lock:
+            for record in payload.get('records', []):
+                fields = record.get('fields', {})
+                key = tuple(fields.get(name) for name in merge_on)
+                record_id = config.keys.get(key) if merge_on else None
+                if record_id:
+                    config.rows[record_id].update(fields)
+                    updated.append(record_id)
+                else:
+                    record_id = f'rec{len(config.rows) + 1}'
+                    config.rows[record_id] = dict(fields)
+                    if merge_on:
+                        config.keys[key] = record_id
+                    created.append(record_id)
+                records.append({'id': record_id, 'fields': config.rows[record_id]})
+
+        if config.latency:
+            time.sleep(config.latency)
+        body = {'records': records, 'createdRecords': created, 'updatedRecords': updated}
+        self._send(200, json.dumps(body), 'application/json')
+
+class MockAirtableServer(StandInServer):
+    def __init__(self, latency=0.0, throttle_every=0, retry_after=1):
+        super().__init__(_AirtableHandler)
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.rows = {}
+        self.keys = {}
+        self.lock = threading.Lock()
+
+    @property
+    def api_base(self):
+        return f'{self.base_url}/v0'
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode('utf-8'))
+
+    def handle(self):
+        config = self.server.standin
+        with config.lock:
+            config.connections += 1
+
+        self._reply('220 standin ESMTP')
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+
+            if verb in ('EHLO', 'HELO'):
+                self.wfile.write(b'250-standin\r\n250-AUTH PLAIN LOGIN\r\n250 SIZE 10485760\r\n')
+            elif verb == 'AUTH':
+                with config.lock:
+                    config.logins += 1
+                self._reply('235 Authentication successful')
+            elif verb == 'MAIL':
+                sender, recipients = command[10:].strip('<>'), []
+                self._reply('250 OK')
+            elif verb == 'RCPT':
+                recipient = command.split(':', 1)[1].split()[0].strip('<>')
+                if recipient in config.reject:
+                    self._reply('550 No such user')
+                else:
+                    recipients.append(recipient)
+                    self._reply('250 OK')
+            elif verb == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b'.\r\n', b'.\n'):
+                        break
+                    data.append(chunk)
+                with config.lock:
+                    config.messages.append({'from': sender, 'to': recipients, 'data': b''.join(data)})
+                self._reply('250 OK queued')
+            elif verb in ('NOOP', 'RSET'):
+                self._reply('250 OK')
+            elif verb == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Command not implemented')
+
+class SMTPStandIn:
+    def __init__(self, reject=()):
+        # Minimal SMTP server without TLS; run the app with SMTP_STARTTLS=false against it
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _SMTPHandler)
+        self.server.daemon_threads = True
+        self.server.standin = self
+        self.reject = set(reject)
+        self.connections = 0
+        self.logins = 0
+        self.messages = []
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.sha1(item.encode('utf-8')).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:16], 'big') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class DeliveryLedger:
+    def __init__(self, path=None, capacity=None):
+        self.path = path or os.getenv(
+            'DELIVERY_LEDGER_PATH',
+            os.path.join(tempfile.gettempdir(), 'nuvian_delivery_ledger.sqlite3')
+        )
+        self.capacity = int(capacity or os.getenv('DELIVERY_LEDGER_BLOOM_CAPACITY', 100000))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter(self.capacity)
+        # Highest row id folded into the Bloom filter; rows written by other workers are synced past it
+        self._last_id = 0
+        self._init_db()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # A forked worker opens its own connection instead of sharing its parent's
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS delivered (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                destination TEXT NOT NULL,
+                article_hash TEXT NOT NULL,
+                sent_at REAL NOT NULL,
+                UNIQUE (destination, article_hash)
+            )
+        """)
+
+    @staticmethod
+    def destination_key(integration_type, config):
+        """Identify a destination without storing its credentials"""
+        if integration_type == 'email':
+            recipients = config.get('recipients') or config.get('to_email') or []
+            if isinstance(recipients, str):
+                recipients = recipients.split(',')
+            identity = sorted(recipient.strip().lower() for recipient in recipients if recipient.strip())
+        elif integration_type == 'slack':
+            identity = [config.get('webhook_url', ''), config.get('channel', '')]
+        elif integration_type == 'airtable':
+            identity = [config.get('base_id', ''), config.get('table_name', 'RSS Articles')]
+        elif integration_type == 'notion':
+            identity = [config.get('database_id', '')]
+        else:
+            identity = [json.dumps(config, sort_keys=True)]
+
+        raw = json.dumps([integration_type] + identity)
+        return f'{integration_type}:' + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def article_hash(article):
+        """Identify an article by its link, falling back to its title"""
+        identity = (article.get('link') or '').strip() or (article.get('title') or '').strip().lower()
+        return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+    def _sync(self):
+        conn = self._connect()
+        with self._lock:
+            rows = conn.execute(
+                'SELECT id, destination, article_hash FROM delivered WHERE id > ? ORDER BY id',
+                (self._last_id,)
+            ).fetchall()
+            for row_id, destination, article_hash in rows:
+                if self._bloom.count >= self._bloom.capacity:
+                    self._rebuild(conn)
+                    return
+                self._bloom.add(f'{destination}|{article_hash}')
+                self._last_id = row_id
+
+    def _rebuild(self, conn):
+        # Grow the filter once it is full so the false positive rate stays bounded
+        total, last_id = conn.execute('SELECT COUNT(*), COALESCE(MAX(id), 0) FROM delivered').fetchone()
+        bloom = BloomFilter(max(self.capacity, total * 2))
+        for destination, article_hash in conn.execute(
+            'SELECT destination, article_hash FROM delivered WHERE id <= ?', (last_id,)
+        ):
+            bloom.add(f'{destination}|{article_hash}')
+        self._bloom = bloom
+        self._last_id = last_id
+
+    def filter_new(self, destination, articles):
+        """Return the articles not yet delivered to the destination"""
+        self._sync()
+        conn = self._connect()
+        new_articles = []
+        for article in articles:
+            article_hash = self.article_hash(article)
+            # The Bloom filter answers most lookups; only possible hits touch the index
+            if f'{destination}|{article_hash}' in self._bloom:
+                row = conn.execute(
+                    'SELECT 1 FROM delivered WHERE destination = ? AND article_hash = ?',
+                    (destination, article_hash)
+                ).fetchone()
+                if row:
+                    continue
+            new_articles.append(article)
+        return new_articles
+
+    def record(self, destination, articles):
+        """Record successful deliveries"""
+        now = time.time()
+        self._connect().executemany(
+            'INSERT OR IGNORE INTO delivered (destination, article_hash, sent_at) VALUES (?, ?, ?)',
+            [(destination, self.article_hash(article), now) for article in articles]
+        )
+        self._sync()
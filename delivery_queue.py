@@ -0,0 +1,235 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+def create_private_file(path):
+    """Create path readable only by this user, or restrict an existing one; SQLite gives -wal and -shm files the same mode"""
+    fd = os.open(path, os.O_CREAT | os.O_RDWR | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+    os.close(fd)
+    for name in (path, path + '-wal', path + '-shm'):
+        if os.path.exists(name):
+            os.chmod(name, 0o600)
+
+class DeliveryQueue:
+    def __init__(self, integration_manager, path=None, workers=None, max_attempts=None,
+                 batch_size=None, retry_base=None, lease=None):
+        self.integration_manager = integration_manager
+        self.path = path or os.getenv(
+            'DELIVERY_DB_PATH',
+            os.path.join(tempfile.gettempdir(), 'nuvian_deliveries.sqlite3')
+        )
+        self.workers = int(workers or os.getenv('DELIVERY_WORKERS', 2))
+        self.max_attempts = int(max_attempts or os.getenv('DELIVERY_MAX_ATTEMPTS', 5))
+        self.batch_size = int(batch_size or os.getenv('DELIVERY_BATCH_SIZE', 10))
+        self.retry_base = float(retry_base or os.getenv('DELIVERY_RETRY_BASE', 5))
+        # A claimed delivery is retried by another worker if not finished within the lease
+        self.lease = float(lease or os.getenv('DELIVERY_LEASE', 300))
+        # Sent and failed deliveries are kept this long for status polls, then deleted
+        self.retention = float(os.getenv('DELIVERY_RETENTION', 7 * 86400))
+        self.poll_interval = 1.0
+        self.purge_interval = 3600
+        self._last_purge = 0
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._started_pid = None
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # A forked worker opens its own connection instead of sharing its parent's
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_db(self):
+        # Queued deliveries hold integration credentials until they are sent
+        create_private_file(self.path)
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS deliveries (
+                id TEXT PRIMARY KEY,
+                integration_type TEXT NOT NULL,
+                destination TEXT NOT NULL,
+                config TEXT NOT NULL,
+                articles TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                lease_until REAL,
+                last_error TEXT,
+                result TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_deliveries_due ON deliveries (status, next_attempt_at)')
+
+    def start(self):
+        """Start the background delivery workers once per process"""
+        with self._lock:
+            # Compared by pid so a worker forked from a started parent starts its own threads
+            if self._started_pid == os.getpid():
+                return
+            self._started_pid = os.getpid()
+            self._threads = []
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f'delivery-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def enqueue(self, articles, integration_type, config):
+        """Persist a delivery and return its id"""
+        self.start()
+
+        delivery_id = uuid.uuid4().hex
+        now = time.time()
+        config_json = json.dumps(config or {}, sort_keys=True)
+        # Deliveries with identical configs are batched; the key is a hash so it holds no secrets
+        destination = f'{integration_type}:' + hashlib.sha256(config_json.encode('utf-8')).hexdigest()
+        self._connect().execute(
+            'INSERT INTO deliveries (id, integration_type, destination, config, articles, status, '
+            'next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (delivery_id, integration_type, destination, config_json,
+             json.dumps(articles), 'queued', now, now, now)
+        )
+        self._wakeup.set()
+        return delivery_id
+
+    def get(self, delivery_id):
+        """Return the public status of a delivery, or None if unknown"""
+        row = self._connect().execute(
+            'SELECT id, integration_type, status, attempts, next_attempt_at, last_error, result, '
+            'created_at, updated_at FROM deliveries WHERE id = ?',
+            (delivery_id,)
+        ).fetchone()
+        if not row:
+            return None
+
+        delivery = dict(row)
+        delivery['result'] = json.loads(delivery['result']) if delivery['result'] else None
+        return delivery
+
+    def _claim_batch(self):
+        """Atomically claim due deliveries, grouped by destination"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                "SELECT * FROM deliveries WHERE "
+                "(status = 'queued' AND next_attempt_at <= ?) OR (status = 'sending' AND lease_until < ?) "
+                "ORDER BY next_attempt_at LIMIT ?",
+                (now, now, self.batch_size)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE deliveries SET status = 'sending', lease_until = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                [(now + self.lease, now, row['id']) for row in rows]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        batches = {}
+        for row in rows:
+            batches.setdefault(row['destination'], []).append(dict(row, attempts=row['attempts'] + 1))
+        return list(batches.values())
+
+    def _worker(self):
+        while True:
+            try:
+                self._purge()
+                batches = self._claim_batch()
+            except sqlite3.Error as e:
+                logger.error('Delivery queue claim error: %s', e)
+                batches = []
+
+            if not batches:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            for batch in batches:
+                try:
+                    self._deliver(batch)
+                except Exception as e:
+                    # The lease expires and another attempt picks the batch up
+                    logger.error('Delivery queue error: %s', e)
+
+    def _purge(self):
+        """Delete finished deliveries older than the retention, at most once per purge interval"""
+        with self._lock:
+            now = time.time()
+            if now - self._last_purge < self.purge_interval:
+                return
+            self._last_purge = now
+        self._connect().execute(
+            "DELETE FROM deliveries WHERE status IN ('sent', 'failed') AND updated_at < ?",
+            (now - self.retention,)
+        )
+
+    def _deliver(self, batch):
+        """Send one or more deliveries to the same destination in a single call"""
+        articles = []
+        seen_links = set()
+        for delivery in batch:
+            for article in json.loads(delivery['articles']):
+                link = article.get('link')
+                if link and link in seen_links:
+                    continue
+                seen_links.add(link)
+                articles.append(article)
+
+        first = batch[0]
+        try:
+            result = self.integration_manager.send_articles(
+                articles, first['integration_type'], json.loads(first['config'])
+            )
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+
+        now = time.time()
+        conn = self._connect()
+        for delivery in batch:
+            try:
+                # Finished deliveries drop their config so credentials aren't kept longer than needed
+                if result.get('success'):
+                    conn.execute(
+                        "UPDATE deliveries SET status = 'sent', config = '{}', result = ?, last_error = NULL, "
+                        "lease_until = NULL, updated_at = ? WHERE id = ?",
+                        (json.dumps(result), now, delivery['id'])
+                    )
+                elif delivery['attempts'] >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE deliveries SET status = 'failed', config = '{}', result = ?, last_error = ?, "
+                        "lease_until = NULL, updated_at = ? WHERE id = ?",
+                        (json.dumps(result), result.get('error'), now, delivery['id'])
+                    )
+                else:
+                    # Exponential backoff with jitter
+                    delay = self.retry_base * (2 ** (delivery['attempts'] - 1)) * random.uniform(0.8, 1.2)
+                    conn.execute(
+                        "UPDATE deliveries SET status = 'queued', next_attempt_at = ?, last_error = ?, "
+                        "lease_until = NULL, updated_at = ? WHERE id = ?",
+                        (now + delay, result.get('error'), now, delivery['id'])
+                    )
+            except sqlite3.Error as e:
+                # Left in 'sending', the delivery is retried once its lease expires
+                logger.error('Error updating delivery %s: %s', delivery['id'], e)
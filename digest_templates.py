@@ -0,0 +1,82 @@
+import os
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# Slack limits: 50 blocks per message, 3000 characters per section text, 150 per header
+SLACK_MAX_BLOCKS = 50
+SLACK_MAX_SECTION_CHARS = 3000
+SLACK_MAX_HEADER_CHARS = 150
+
+SLACK_SECTION_TEMPLATE = (
+    "*{% if article.link %}<{{ article.link|slack_escape }}|{{ title|slack_escape }}>"
+    "{% else %}{{ title|slack_escape }}{% endif %}*\n"
+    "{{ summary|slack_escape }}\n"
+    "Source: {{ (article.source or 'Unknown')|slack_escape }} | "
+    "Relevance: {{ '%.1f'|format(article.relevance_score or 0) }}%"
+)
+
+def slack_escape(text):
+    """Escape the characters Slack mrkdwn treats as control sequences"""
+    return str(text).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+def _truncate(text, limit):
+    text = text or ''
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+class DigestRenderer:
+    def __init__(self, template_dir=TEMPLATE_DIR):
+        # Templates are compiled once and reused for every digest
+        html_env = Environment(
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(['html']),
+            auto_reload=False
+        )
+        self.email_template = html_env.get_template('digest_email.html')
+
+        text_env = Environment(autoescape=False)
+        text_env.filters['slack_escape'] = slack_escape
+        self.slack_section_template = text_env.from_string(SLACK_SECTION_TEMPLATE)
+
+    def render_email(self, articles, title='RSS Feed Analysis Results'):
+        """Render the HTML email digest with all article fields escaped"""
+        return self.email_template.render(articles=articles, title=title)
+
+    def render_slack(self, articles, title='RSS Feed Analysis Results'):
+        """Render Slack payloads, split so each stays within Slack's block and text limits"""
+        return [payload for payload, _ in self.render_slack_parts(articles, title)]
+
+    def render_slack_parts(self, articles, title='RSS Feed Analysis Results'):
+        """Render Slack payloads paired with the articles each one carries"""
+        sections = []
+        for article in articles:
+            text = self.slack_section_template.render(
+                article=article,
+                title=_truncate(article.get('title') or 'No title', 200),
+                summary=_truncate(article.get('summary') or 'No summary', 200)
+            )
+            sections.append({
+                'type': 'section',
+                'text': {'type': 'mrkdwn', 'text': _truncate(text, SLACK_MAX_SECTION_CHARS)}
+            })
+
+        # One block per message is the header
+        per_message = SLACK_MAX_BLOCKS - 1
+        chunks = [sections[i:i + per_message] for i in range(0, len(sections), per_message)] or [[]]
+
+        messages = []
+        for index, chunk in enumerate(chunks):
+            chunk_articles = articles[index * per_message:(index + 1) * per_message]
+            header = f'{title} ({len(articles)} articles)'
+            if len(chunks) > 1:
+                header = f'{header} - part {index + 1}/{len(chunks)}'
+            messages.append(({
+                'text': f'{title} - {len(articles)} articles',
+                'blocks': [
+                    {
+                        'type': 'header',
+                        'text': {'type': 'plain_text', 'text': _truncate(header, SLACK_MAX_HEADER_CHARS)}
+                    }
+                ] + chunk
+            }, chunk_articles))
+        return messages
@@ -0,0 +1,182 @@
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+FEED_TYPES = ('application/rss+xml', 'application/atom+xml', 'application/feed+json', 'application/json')
+FEED_MARKERS = ('<rss', '<feed', '<rdf:rdf')
+
+class HeadLinkParser(HTMLParser):
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.links = []
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'body':
+            self.done = True
+            return
+        if tag == 'base':
+            href = dict(attrs).get('href')
+            if href:
+                self.base_url = urljoin(self.base_url, href)
+            return
+        if tag != 'link':
+            return
+
+        attrs = dict(attrs)
+        rel = (attrs.get('rel') or '').lower().split()
+        link_type = (attrs.get('type') or '').lower().split(';')[0].strip()
+        href = attrs.get('href')
+        if 'alternate' in rel and link_type in FEED_TYPES and href:
+            self.links.append({'url': urljoin(self.base_url, href), 'title': attrs.get('title') or ''})
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.done = True
+
+class FeedDiscoverer:
+    def __init__(self, cache=None, patterns=None, workers=None):
+        self.cache = cache
+        self.patterns = [pattern for pattern in (patterns or ['/feed/', '/rss.xml']) if pattern.startswith('/')]
+        self.workers = int(workers or os.getenv('FEED_DISCOVERY_WORKERS', 8))
+        self.timeout = float(os.getenv('FEED_DISCOVERY_TIMEOUT', 5))
+        # Pages whose <head> runs past this many bytes are given up on
+        self.head_max_bytes = int(os.getenv('FEED_DISCOVERY_HEAD_MAX_BYTES', 256 * 1024))
+        self.cache_ttl = int(os.getenv('FEED_DISCOVERY_CACHE_TTL', 86400))
+        self.negative_ttl = int(os.getenv('FEED_DISCOVERY_NEGATIVE_TTL', 3600))
+        self.chunk_size = 8192
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['User-Agent'] = 'NuvianFeedDiscovery/1.0'
+
+    def _cache_get(self, namespace, key):
+        if self.cache:
+            return self.cache.get(namespace, key)
+        return None
+
+    def _cache_set(self, namespace, key, value, ttl):
+        if self.cache:
+            self.cache.set(namespace, key, value, ttl)
+
+    def find_head_links(self, site_url):
+        """Return feed links declared in a page's <head>, reading only as much of the page as needed"""
+        cached = self._cache_get('discovery_heads', site_url)
+        if cached is not None:
+            return cached
+
+        links = []
+        try:
+            with self.session.get(site_url, timeout=self.timeout, stream=True) as response:
+                if response.status_code != 200:
+                    self._cache_set('discovery_heads', site_url, links, self.negative_ttl)
+                    return links
+
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                if 'xml' in content_type or 'json' in content_type:
+                    # The seed is already a feed
+                    links = [{'url': response.url, 'title': ''}]
+                else:
+                    parser = HeadLinkParser(response.url)
+                    read = 0
+                    for chunk in response.iter_content(self.chunk_size, decode_unicode=False):
+                        read += len(chunk)
+                        parser.feed(chunk.decode(response.encoding or 'utf-8', 'replace'))
+                        if parser.done or read >= self.head_max_bytes:
+                            break
+                    links = parser.links
+        except requests.RequestException as e:
+            logger.warning('Error fetching %s for feed discovery: %s', site_url, e)
+            self._cache_set('discovery_heads', site_url, links, self.negative_ttl)
+            return links
+
+        self._cache_set('discovery_heads', site_url, links, self.cache_ttl if links else self.negative_ttl)
+        return links
+
+    def probe_urls(self, site_url):
+        """Return the common feed locations to try for a site"""
+        parsed = urlparse(site_url)
+        root = f'{parsed.scheme}://{parsed.netloc}'
+        return [root + pattern for pattern in self.patterns]
+
+    def validate(self, candidate_url):
+        """Fetch a candidate once and return its canonical URL and title if it is a feed"""
+        cached = self._cache_get('discovery_feeds', candidate_url)
+        if cached is not None:
+            return cached or None
+
+        feed = False
+        try:
+            with self.session.get(candidate_url, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 200:
+                    # The root element and channel title are near the top of the document
+                    head = b''
+                    for chunk in response.iter_content(self.chunk_size):
+                        head += chunk
+                        if len(head) >= 4 * self.chunk_size:
+                            break
+                    text = head.decode(response.encoding or 'utf-8', 'replace')
+                    lowered = text.lower()
+                    is_json_feed = 'jsonfeed.org/version' in lowered
+                    if is_json_feed or any(marker in lowered for marker in FEED_MARKERS):
+                        if is_json_feed:
+                            title_match = re.search(r'"title"\s*:\s*"((?:[^"\\]|\\.)*)"', text)
+                        else:
+                            title_match = re.search(r'<title[^>]*>(.*?)</title>', text, re.DOTALL)
+                        title = re.sub(r'<.*?>', '', title_match.group(1)).strip() if title_match else ''
+                        feed = {'url': response.url, 'title': title.replace('<![CDATA[', '').replace(']]>', '')}
+        except requests.RequestException:
+            feed = False
+
+        self._cache_set('discovery_feeds', candidate_url, feed, self.cache_ttl if feed else self.negative_ttl)
+        return feed or None
+
+    def discover(self, site_urls, max_feeds=10, exclude=()):
+        """Discover feeds for seed sites, fetching sites and candidates concurrently"""
+        site_urls = list(dict.fromkeys(site_urls))
+        if not site_urls or max_feeds <= 0:
+            return []
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='discovery')
+        try:
+            head_links = dict(zip(site_urls, executor.map(self.find_head_links, site_urls)))
+
+            # Declared links come first; sites without any get the common paths probed
+            candidates = {}
+            for site_url in site_urls:
+                links = head_links[site_url] or [{'url': url, 'title': ''} for url in self.probe_urls(site_url)]
+                for link in links:
+                    candidates.setdefault(link['url'], link['title'])
+
+            seen = set(exclude)
+            feeds = []
+            futures = {
+                executor.submit(self.validate, url): url
+                for url in candidates if url not in seen
+            }
+            for future in as_completed(futures):
+                feed = future.result()
+                if not feed or feed['url'] in seen:
+                    continue
+                seen.add(feed['url'])
+                feeds.append({
+                    'url': feed['url'],
+                    'title': feed['title'] or candidates[futures[future]] or 'Unknown Feed'
+                })
+                if len(feeds) >= max_feeds:
+                    break
+        finally:
+            # Don't wait on candidates still in flight once enough feeds are found
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return feeds
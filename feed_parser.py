@@ -0,0 +1,92 @@
+import sys
+
+def parse_rss_content(content, feed_url, max_items=10, errors=None):
+    """Simple RSS content parser; max_items=None keeps every item and parse failures are appended to errors"""
+    articles = []
+    try:
+        # Extract title, link, and description using regex
+        import re
+        
+        # Find all item blocks
+        items = re.findall(r'<item>(.*?)</item>', content, re.DOTALL)
+        
+        for item in items[:max_items]:  # Limit to 10 items per feed by default
+            title_match = re.search(r'<title>(.*?)</title>', item, re.DOTALL)
+            link_match = re.search(r'<link>(.*?)</link>', item, re.DOTALL)
+            desc_match = re.search(r'<description>(.*?)</description>', item, re.DOTALL)
+            pub_match = re.search(r'<pubDate>(.*?)</pubDate>', item, re.DOTALL)
+            
+            if title_match and link_match:
+                # Clean and extract title
+                title = clean_html(title_match.group(1)).strip()
+                
+            # Clean and extract summary/description
+            summary = ''
+            if desc_match:
+                raw_summary = desc_match.group(1)
+                # Remove HTML tags and clean up
+                summary = clean_html(raw_summary).strip()
+                # Limit summary length
+                if len(summary) > 300:
+                    summary = summary[:300] + '...'
+            
+            # If no summary from description, try to extract from content or other fields
+            if not summary:
+                # Look for content field
+                content_match = re.search(r'<content:encoded>(.*?)</content:encoded>', item, re.DOTALL)
+                if content_match:
+                    raw_content = content_match.group(1)
+                    summary = clean_html(raw_content).strip()
+                    if len(summary) > 300:
+                        summary = summary[:300] + '...'
+                
+                # If still no summary, use title as fallback
+                if not summary:
+                    summary = f"Article: {title}"
+            
+            # Final fallback - if still no summary, create one from title
+            if not summary or summary.strip() == '':
+                summary = f"Read more about: {title}"
+            
+            # Clean link
+            link = clean_html(link_match.group(1)).strip()
+            
+            # Clean published date
+            published = clean_html(pub_match.group(1)).strip() if pub_match else ''
+            
+            article = {
+                'title': title,
+                'link': link,
+                'summary': summary,
+                'published': published,
+                'source': 'RSS Feed',
+                'feed_url': feed_url
+            }
+            articles.append(article)
+    except Exception as e:
+        # stderr, so diagnostics never mix with output written to stdout
+        print(f"Error parsing RSS content from {feed_url}: {e}", file=sys.stderr)
+        if errors is not None:
+            errors.append({'feed_url': feed_url, 'error': str(e)})
+    
+    return articles
+
+def clean_html(text):
+    """Remove HTML tags from text"""
+    if not text:
+        return ''
+    
+    import re
+    import html
+    
+    # Remove HTML tags
+    clean = re.compile('<.*?>')
+    text = re.sub(clean, '', text)
+    
+    # Decode HTML entities
+    text = html.unescape(text)
+    
+    # Clean up extra whitespace
+    text = re.sub(r'\s+', ' ', text)
+    
+    return text.strip()
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from xml.sax.saxutils import escape, quoteattr
+
+FORMATS = {
+    'rss': 'application/rss+xml; charset=utf-8',
+    'atom': 'application/atom+xml; charset=utf-8',
+    'json': 'application/feed+json; charset=utf-8'
+}
+
+def _published(article, fallback):
+    try:
+        moment = parsedate_to_datetime(article.get('published') or '')
+    except (TypeError, ValueError):
+        return fallback
+    if moment is None:
+        return fallback
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+def _description(article):
+    summary = article.get('summary') or ''
+    analysis = article.get('analysis') or ''
+    return f'{summary}\n\n{analysis}'.strip() if analysis else summary
+
+def render_rss(feed, articles, updated):
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0">\n<channel>\n',
+        f'<title>{escape(feed["title"])}</title>\n',
+        f'<link>{escape(feed.get("link") or "")}</link>\n',
+        f'<description>{escape(feed["description"])}</description>\n',
+        f'<lastBuildDate>{format_datetime(updated)}</lastBuildDate>\n'
+    ]
+    for article in articles:
+        parts.append(
+            '<item>\n'
+            f'<title>{escape(article.get("title") or "")}</title>\n'
+            f'<link>{escape(article.get("link") or "")}</link>\n'
+            f'<guid isPermaLink="true">{escape(article.get("link") or "")}</guid>\n'
+            f'<description>{escape(_description(article))}</description>\n'
+            f'<pubDate>{format_datetime(_published(article, updated))}</pubDate>\n'
+            '</item>\n'
+        )
+    parts.append('</channel>\n</rss>\n')
+    return ''.join(parts)
+
+def render_atom(feed, articles, updated):
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">\n',
+        f'<id>{escape(feed["id"])}</id>\n',
+        f'<title>{escape(feed["title"])}</title>\n',
+        f'<subtitle>{escape(feed["description"])}</subtitle>\n',
+        f'<updated>{updated.isoformat()}</updated>\n'
+    ]
+    if feed.get('self_url'):
+        parts.append(f'<link rel="self" href={quoteattr(feed["self_url"])} />\n')
+    for article in articles:
+        link = article.get('link') or ''
+        parts.append(
+            '<entry>\n'
+            f'<id>{escape(link)}</id>\n'
+            f'<title>{escape(article.get("title") or "")}</title>\n'
+            f'<link href={quoteattr(link)} />\n'
+            f'<updated>{_published(article, updated).isoformat()}</updated>\n'
+            f'<summary>{escape(_description(article))}</summary>\n'
+            '</entry>\n'
+        )
+    parts.append('</feed>\n')
+    return ''.join(parts)
+
+def render_json_feed(feed, articles, updated):
+    body = {
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': feed['title'],
+        'description': feed['description'],
+        'items': [{
+            'id': article.get('link') or article.get('title', ''),
+            'url': article.get('link'),
+            'title': article.get('title'),
+            'content_text': _description(article),
+            'date_published': _published(article, updated).isoformat(),
+            '_nuvian': {'relevance_score': article.get('relevance_score')}
+        } for article in articles]
+    }
+    if feed.get('self_url'):
+        body['feed_url'] = feed['self_url']
+    return json.dumps(body, ensure_ascii=False)
+
+RENDERERS = {'rss': render_rss, 'atom': render_atom, 'json': render_json_feed}
+
+class FeedPublisher:
+    def __init__(self, path=None):
+        self.path = path or os.getenv(
+            'PUBLISHED_FEEDS_PATH',
+            os.path.join(tempfile.gettempdir(), 'nuvian_published_feeds.sqlite3')
+        )
+        self._local = threading.local()
+        self._init_db()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # A forked worker opens its own connection instead of sharing its parent's
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_db(self):
+        self._connect().execute("""
+            CREATE TABLE IF NOT EXISTS published_feeds (
+                feed_id TEXT NOT NULL,
+                format TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (feed_id, format)
+            )
+        """)
+
+    @staticmethod
+    def content_hash(feed, articles):
+        """Hash what subscribers see, so unchanged rankings keep their ETag and Last-Modified"""
+        raw = json.dumps([
+            feed['title'], feed['description'], feed.get('self_url'),
+            [[article.get('link'), article.get('title'), _description(article)] for article in articles]
+        ])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def publish(self, feed_id, feed, articles):
+        """Render every format for a ranking, skipping the work when the ranking is unchanged"""
+        conn = self._connect()
+        content_hash = self.content_hash(feed, articles)
+        row = conn.execute(
+            "SELECT content_hash FROM published_feeds WHERE feed_id = ? AND format = 'rss'", (feed_id,)
+        ).fetchone()
+        if row and row['content_hash'] == content_hash:
+            return False
+
+        now = time.time()
+        # Last-Modified has one-second resolution, so the stored time is truncated to match
+        updated = datetime.fromtimestamp(int(now), timezone.utc)
+        rows = []
+        for name, render in RENDERERS.items():
+            body = render(feed, articles, updated).encode('utf-8')
+            rows.append((feed_id, name, body, hashlib.sha1(body).hexdigest(), content_hash, int(now)))
+        conn.executemany(
+            'INSERT OR REPLACE INTO published_feeds (feed_id, format, body, etag, content_hash, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?)', rows
+        )
+        return True
+
+    def headers(self, feed_id, fmt):
+        """Return (etag, updated_at) for a rendered feed without reading its body"""
+        row = self._connect().execute(
+            'SELECT etag, updated_at FROM published_feeds WHERE feed_id = ? AND format = ?', (feed_id, fmt)
+        ).fetchone()
+        return (row['etag'], row['updated_at']) if row else None
+
+    def body(self, feed_id, fmt):
+        row = self._connect().execute(
+            'SELECT body FROM published_feeds WHERE feed_id = ? AND format = ?', (feed_id, fmt)
+        ).fetchone()
+        return row['body'] if row else None
+
+    def delete(self, feed_id):
+        self._connect().execute('DELETE FROM published_feeds WHERE feed_id = ?', (feed_id,))
@@ -0,0 +1,367 @@
+import hashlib
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+class FeedRegistry:
+    def __init__(self, path=None, workers=None):
+        self.path = path or os.getenv(
+            'FEED_REGISTRY_PATH',
+            os.path.join(tempfile.gettempdir(), 'nuvian_feed_registry.sqlite3')
+        )
+        self.workers = int(workers or os.getenv('FEED_REGISTRY_WORKERS', 8))
+        # Window used for items per day, and how long item hashes are kept for yield
+        self.rate_window = int(os.getenv('FEED_REGISTRY_RATE_WINDOW', 7 * 86400))
+        self.item_retention = int(os.getenv('FEED_REGISTRY_ITEM_RETENTION', 30 * 86400))
+        # Seconds before a URL whose redirect lookup failed is looked up again
+        self.resolve_retry = int(os.getenv('FEED_REGISTRY_RESOLVE_RETRY', 3600))
+        self.prune_every = 64
+        # Longest redirect chain followed when looking up a canonical URL
+        self.max_alias_hops = 8
+        # Assumed fetch time of feeds that have never been fetched
+        self.default_latency = 1.0
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._init_db()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # A forked worker opens its own connection instead of sharing its parent's
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS feeds (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                first_seen REAL NOT NULL,
+                last_fetch_at REAL,
+                last_success_at REAL,
+                fetches INTEGER NOT NULL DEFAULT 0,
+                failures INTEGER NOT NULL DEFAULT 0,
+                avg_latency REAL,
+                items INTEGER NOT NULL DEFAULT 0,
+                top_items INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS feed_aliases (
+                alias TEXT PRIMARY KEY,
+                url TEXT NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS feed_industries (
+                industry TEXT NOT NULL,
+                url TEXT NOT NULL,
+                PRIMARY KEY (industry, url)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS feed_items (
+                url TEXT NOT NULL,
+                item_hash TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                top INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (url, item_hash)
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS feed_items_first_seen ON feed_items (first_seen)')
+        conn.execute('CREATE INDEX IF NOT EXISTS feed_items_url_first_seen ON feed_items (url, first_seen)')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS feed_resolve_failures (
+                url TEXT PRIMARY KEY,
+                failed_at REAL NOT NULL
+            )
+        """)
+
+    @staticmethod
+    def is_feed_url(url):
+        """Return whether a value is an absolute http(s) URL"""
+        if not isinstance(url, str):
+            return False
+        parsed = urlparse(url)
+        return parsed.scheme in ('http', 'https') and bool(parsed.netloc)
+
+    @staticmethod
+    def item_hash(article):
+        identity = (article.get('link') or '').strip() or (article.get('title') or '').strip().lower()
+        return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+    def canonical(self, url):
+        """Return the canonical URL recorded for a feed URL, or the URL itself"""
+        conn = self._connect()
+        seen = {url}
+        for _ in range(self.max_alias_hops):
+            row = conn.execute('SELECT url FROM feed_aliases WHERE alias = ?', (url,)).fetchone()
+            if not row or row['url'] in seen:
+                break
+            url = row['url']
+            seen.add(url)
+        return url
+
+    def is_known(self, url):
+        """Return whether a URL or one of its aliases is registered"""
+        row = self._connect().execute('SELECT 1 FROM feed_aliases WHERE alias = ?', (url,)).fetchone()
+        return row is not None
+
+    def export(self, industry=None):
+        """Return (industry, url, title) rows for every registered feed, grouped by industry"""
+        query = (
+            'SELECT feed_industries.industry, feeds.url, feeds.title FROM feed_industries '
+            'JOIN feeds ON feeds.url = feed_industries.url'
+        )
+        params = ()
+        if industry is not None:
+            query += ' WHERE feed_industries.industry = ?'
+            params = (industry,)
+        return self._connect().execute(query + ' ORDER BY feed_industries.industry, feeds.url', params).fetchall()
+
+    def _ensure_feed(self, conn, url, title=None, resolved=True):
+        if not self.is_feed_url(url):
+            return False
+        conn.execute(
+            'INSERT OR IGNORE INTO feeds (url, title, first_seen) VALUES (?, ?, ?)', (url, title, time.time())
+        )
+        # Only URLs whose redirects are known count as known, so failed lookups are retried
+        if resolved:
+            conn.execute('INSERT OR IGNORE INTO feed_aliases (alias, url) VALUES (?, ?)', (url, url))
+        return True
+
+    def learn_alias(self, url, final_url):
+        """Record where a feed URL redirects to"""
+        conn = self._connect()
+        final_url = self.canonical(final_url)
+        if not self.is_feed_url(final_url):
+            return url
+        if final_url == url:
+            self._ensure_feed(conn, url)
+            return url
+        self._ensure_feed(conn, final_url)
+        conn.execute('INSERT OR REPLACE INTO feed_aliases (alias, url) VALUES (?, ?)', (url, final_url))
+        # Older aliases of this URL and its industries move along, so chains stay one hop long
+        conn.execute('UPDATE feed_aliases SET url = ? WHERE url = ?', (final_url, url))
+        conn.execute('UPDATE OR IGNORE feed_industries SET url = ? WHERE url = ?', (final_url, url))
+        conn.execute('DELETE FROM feed_industries WHERE url = ?', (url,))
+        return final_url
+
+    def _resolve(self, url):
+        try:
+            response = self.session.head(url, allow_redirects=True, timeout=5)
+            if response.status_code in (405, 501):
+                with self.session.get(url, allow_redirects=True, timeout=5, stream=True) as response:
+                    return url, response.url
+            return url, response.url
+        except requests.RequestException:
+            # Try again next time rather than pinning a wrong canonical URL
+            return url, None
+
+    def register(self, industry, urls):
+        """Add feed URLs to an industry, following each unknown URL's redirects once"""
+        conn = self._connect()
+        urls = [url for url in dict.fromkeys(urls) if self.is_feed_url(url)]
+        placeholders = ",".join("?" * len(urls))
+        known = {
+            row['alias'] for row in conn.execute(
+                f'SELECT alias FROM feed_aliases WHERE alias IN ({placeholders})', urls
+            )
+        } if urls else set()
+        # Failed lookups are retried after a while rather than on every discovery request
+        recently_failed = {
+            row['url'] for row in conn.execute(
+                f'SELECT url FROM feed_resolve_failures WHERE url IN ({placeholders}) AND failed_at >= ?',
+                urls + [time.time() - self.resolve_retry]
+            )
+        } if urls else set()
+        unknown = [url for url in urls if url not in known and url not in recently_failed]
+
+        for url in recently_failed - known:
+            self._ensure_feed(conn, url, resolved=False)
+        if unknown:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(unknown))) as executor:
+                for url, final_url in executor.map(self._resolve, unknown):
+                    if final_url:
+                        self.learn_alias(url, final_url)
+                        conn.execute('DELETE FROM feed_resolve_failures WHERE url = ?', (url,))
+                    else:
+                        self._ensure_feed(conn, url, resolved=False)
+                        conn.execute(
+                            'INSERT OR REPLACE INTO feed_resolve_failures (url, failed_at) VALUES (?, ?)',
+                            (url, time.time())
+                        )
+
+        for url in urls:
+            conn.execute(
+                'INSERT OR IGNORE INTO feed_industries (industry, url) VALUES (?, ?)', (industry, self.canonical(url))
+            )
+
+    def add(self, industry, url, title=None):
+        """Add an already canonical feed URL to an industry"""
+        conn = self._connect()
+        if not self._ensure_feed(conn, url, title):
+            return
+        if title:
+            self.set_title(url, title)
+        conn.execute('INSERT OR IGNORE INTO feed_industries (industry, url) VALUES (?, ?)', (industry, url))
+
+    def set_title(self, url, title):
+        self._connect().execute('UPDATE feeds SET title = ? WHERE url = ?', (title, self.canonical(url)))
+
+    def record_fetch(self, url, success, latency, articles=(), title=None):
+        """Update a feed's health stats and remember the items it served"""
+        conn = self._connect()
+        url = self.canonical(url)
+        now = time.time()
+        # Only registered feeds and successful fetches get a row, so failing client URLs leave no trace;
+        # a failure updates the stats of a feed already in the registry
+        if success and not self._ensure_feed(conn, url, title):
+            return
+
+        new_items = 0
+        if success and articles:
+            before = conn.total_changes
+            conn.executemany(
+                'INSERT OR IGNORE INTO feed_items (url, item_hash, first_seen) VALUES (?, ?, ?)',
+                [(url, self.item_hash(article), now) for article in articles]
+            )
+            new_items = conn.total_changes - before
+
+        # Latency is an exponentially weighted average so recent fetches dominate
+        conn.execute("""
+            UPDATE feeds SET
+                title = COALESCE(?, title),
+                last_fetch_at = ?,
+                last_success_at = CASE WHEN ? THEN ? ELSE last_success_at END,
+                fetches = fetches + 1,
+                failures = failures + CASE WHEN ? THEN 0 ELSE 1 END,
+                avg_latency = CASE WHEN avg_latency IS NULL THEN ? ELSE avg_latency * 0.8 + ? * 0.2 END,
+                items = items + ?
+            WHERE url = ?
+        """, (title, now, success, now, success, latency, latency, new_items, url))
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.prune_every == 0
+        if prune:
+            conn.execute('DELETE FROM feed_items WHERE first_seen < ?', (now - self.item_retention,))
+            conn.execute('DELETE FROM feed_resolve_failures WHERE failed_at < ?', (now - self.resolve_retry,))
+
+    def record_top(self, articles):
+        """Credit feeds whose items made it into a top-K result"""
+        conn = self._connect()
+        by_feed = {}
+        for article in articles:
+            if article.get('feed_url'):
+                by_feed.setdefault(self.canonical(article['feed_url']), []).append(self.item_hash(article))
+
+        for url, hashes in by_feed.items():
+            cursor = conn.execute(
+                f'UPDATE feed_items SET top = 1 WHERE url = ? AND top = 0 '
+                f'AND item_hash IN ({",".join("?" * len(hashes))})',
+                [url] + hashes
+            )
+            if cursor.rowcount > 0:
+                conn.execute('UPDATE feeds SET top_items = top_items + ? WHERE url = ?', (cursor.rowcount, url))
+
+    @staticmethod
+    def _score(fetches, failures, items, top_items, items_per_day):
+        # Roughly top-K items per day, smoothed so new feeds get a fair first try
+        success_rate = (fetches - failures + 1) / (fetches + 1)
+        return success_rate * (top_items + 1) / (items + 2) * (1 + math.log1p(items_per_day))
+
+    def _stats(self, row, recent_items):
+        now = time.time()
+        window_days = max(min(self.rate_window, now - row['first_seen']), 86400) / 86400
+        items_per_day = recent_items / window_days
+        top_fraction = row['top_items'] / row['items'] if row['items'] else None
+        score = self._score(row['fetches'], row['failures'], row['items'], row['top_items'], items_per_day)
+        return {
+            'url': row['url'],
+            'title': row['title'],
+            'last_success_at': row['last_success_at'],
+            'last_fetch_at': row['last_fetch_at'],
+            'fetches': row['fetches'],
+            'failures': row['failures'],
+            'avg_latency': round(row['avg_latency'], 4) if row['avg_latency'] is not None else None,
+            'items': row['items'],
+            'items_per_day': round(items_per_day, 2),
+            'top_fraction': round(top_fraction, 4) if top_fraction is not None else None,
+            'score': round(score, 4)
+        }
+
+    def stats(self, urls=None, industry=None):
+        """Return health and yield stats for feeds, most productive first"""
+        conn = self._connect()
+        if industry is not None:
+            rows = conn.execute(
+                'SELECT feeds.* FROM feeds JOIN feed_industries ON feed_industries.url = feeds.url '
+                'WHERE feed_industries.industry = ?', (industry,)
+            ).fetchall()
+        elif urls is not None:
+            urls = list(dict.fromkeys(self.canonical(url) for url in urls))
+            rows = conn.execute(
+                f'SELECT * FROM feeds WHERE url IN ({",".join("?" * len(urls))})', urls
+            ).fetchall() if urls else []
+        else:
+            rows = conn.execute('SELECT * FROM feeds').fetchall()
+
+        recent = self._recent_items(conn, [row['url'] for row in rows])
+        stats = [self._stats(row, recent.get(row['url'], 0)) for row in rows]
+        stats.sort(key=lambda feed: feed['score'], reverse=True)
+        return stats
+
+    def _recent_items(self, conn, urls):
+        """Count items first seen within the rate window for each of the given feeds"""
+        since = time.time() - self.rate_window
+        recent = {}
+        # Chunked to stay under SQLite's bound parameter limit; each lookup is a range on the (url, first_seen) index
+        for start in range(0, len(urls), 500):
+            chunk = urls[start:start + 500]
+            recent.update(conn.execute(
+                f'SELECT url, COUNT(*) FROM feed_items WHERE url IN ({",".join("?" * len(chunk))}) '
+                f'AND first_seen >= ? GROUP BY url',
+                chunk + [since]
+            ).fetchall())
+        return recent
+
+    def rank(self, urls, by_latency=False):
+        """Canonicalize and dedupe feed URLs and order them by productivity, or productivity per second of fetch"""
+        canonical_urls = list(dict.fromkeys(self.canonical(url) for url in urls))
+        stats = {feed['url']: feed for feed in self.stats(canonical_urls)}
+        # Unknown feeds score like a fresh feed so they still get fetched early
+        default = round(self._score(0, 0, 0, 0, 0), 4)
+
+        def priority(url):
+            feed = stats.get(url)
+            score = feed['score'] if feed else default
+            if by_latency:
+                latency = feed['avg_latency'] if feed and feed['avg_latency'] is not None else self.default_latency
+                score /= max(latency, 0.05)
+            return score
+
+        return sorted(canonical_urls, key=priority, reverse=True)
+
+    def feeds_for(self, industry):
+        """Return an industry's feeds, most productive first"""
+        return self.stats(industry=industry)
@@ -0,0 +1,8 @@
+# Loaded by gunicorn from the working directory, so `gunicorn app_simple:app` picks it up
+
+def post_worker_init(worker):
+    """Start delivery and digest workers in each worker process once the app is loaded"""
+    # Runs after startup timing finished and after any --preload fork, so no thread or
+    # SQLite connection is shared with the master
+    from app_simple import start_background_workers
+    start_background_workers()
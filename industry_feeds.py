@@ -1,6 +1,4 @@
 import requests
-from bs4 import BeautifulSoup
-import feedparser
 import re
 from urllib.parse import urljoin, urlparse
 import time
@@ -103,6 +101,8 @@ class IndustryFeedManager:
     
     def _get_feed_title(self, feed_url):
         """Get the title of an RSS feed"""
+        import feedparser
+        
         try:
             feed = feedparser.parse(feed_url)
             return feed.feed.get('title', 'Unknown Feed')
@@ -168,6 +168,8 @@ class IndustryFeedManager:
     
     def _is_valid_feed(self, feed_url):
         """Check if a URL is a valid RSS feed"""
+        import feedparser
+        
         try:
             feed = feedparser.parse(feed_url)
             return len(feed.entries) > 0
@@ -176,6 +178,8 @@ class IndustryFeedManager:
     
     def _find_rss_links(self, url):
         """Find RSS links on a webpage"""
+        from bs4 import BeautifulSoup
+        
         try:
             response = requests.get(url, timeout=10)
             soup = BeautifulSoup(response.content, 'html.parser')
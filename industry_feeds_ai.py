@@ -1,10 +1,16 @@
 import requests
 import re
-from urllib.parse import urljoin, urlparse
-import time
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from feed_discovery import FeedDiscoverer
 
 class IndustryFeedManager:
-    def __init__(self):
+    def __init__(self, cache=None, registry=None):
+        self.cache = cache
+        self.registry = registry
+        self.title_cache_ttl = int(os.getenv('FEED_TITLE_CACHE_TTL', 86400))
+        
         # AI-focused RSS feeds with unique sources
         self.industry_feeds = {
             'ai': [
@@ -80,114 +86,133 @@ class IndustryFeedManager:
             '.rss',
             '.xml'
         ]
+        
+        # Sites crawled for feeds when the predefined list runs short
+        self.discovery_seeds = {
+            'ai': [
+                'https://www.technologyreview.com/',
+                'https://blog.google/technology/ai/',
+                'https://www.marktechpost.com/'
+            ],
+            'ai-models': [
+                'https://huggingface.co/blog',
+                'https://openai.com/news/',
+                'https://ai.meta.com/blog/'
+            ],
+            'machine-learning': [
+                'https://machinelearningmastery.com/',
+                'https://pytorch.org/blog/',
+                'https://blog.tensorflow.org/'
+            ],
+            'ai-research': [
+                'https://bair.berkeley.edu/blog/',
+                'https://research.google/blog/',
+                'https://syncedreview.com/'
+            ],
+            'ai-news': [
+                'https://venturebeat.com/category/ai/',
+                'https://www.artificialintelligence-news.com/',
+                'https://www.technologyreview.com/topic/artificial-intelligence/'
+            ]
+        }
+        self.discoverer = FeedDiscoverer(cache=cache, patterns=self.rss_patterns)
+        
+        # Optional JSON file of {industry: [feed urls]} that replaces the built-in lists
+        feeds_file = os.getenv('INDUSTRY_FEEDS_FILE')
+        if feeds_file:
+            with open(feeds_file) as f:
+                self.industry_feeds = json.load(f)
     
     def get_industries(self):
         """Get list of available industries"""
         return list(self.industry_feeds.keys())
     
-    def discover_feeds(self, industry, max_feeds=10):
-        """Discover RSS feeds for a given industry"""
+    def discover_feeds(self, industry, max_feeds=10, seed_urls=None):
+        """Discover RSS feeds for a given industry, crawling any seed_urls first"""
         feeds = []
         
+        # Sites the caller asked for come before the predefined list
+        if seed_urls:
+            feeds.extend(self._discover_new_feeds(industry, max_feeds, seed_urls))
+        
         # Get predefined feeds for the industry
-        if industry.lower() in self.industry_feeds:
+        if industry.lower() in self.industry_feeds and len(feeds) < max_feeds:
             predefined_feeds = self.industry_feeds[industry.lower()]
-            for feed_url in predefined_feeds[:max_feeds]:
+            known_titles = {}
+            if self.registry:
+                # The registry collapses redirect aliases and puts the most productive feeds first
+                self.registry.register(industry.lower(), predefined_feeds)
+                registered = self.registry.feeds_for(industry.lower())
+                predefined_feeds = [feed['url'] for feed in registered]
+                known_titles = {feed['url']: feed['title'] for feed in registered}
+            taken = {feed['url'] for feed in feeds}
+            predefined_feeds = [url for url in dict.fromkeys(predefined_feeds) if url not in taken]
+            predefined_feeds = predefined_feeds[:max_feeds - len(feeds)]
+            
+            # Titles not known yet are fetched concurrently
+            missing = [url for url in predefined_feeds if not known_titles.get(url)]
+            if missing:
+                with ThreadPoolExecutor(max_workers=min(self.discoverer.workers, len(missing))) as executor:
+                    known_titles.update(zip(missing, executor.map(self._get_feed_title, missing)))
+            
+            for feed_url in predefined_feeds:
                 feeds.append({
                     'url': feed_url,
-                    'title': self._get_feed_title(feed_url),
+                    'title': known_titles[feed_url],
                     'type': 'predefined',
                     'industry': industry
                 })
         
         # If we need more feeds, try to discover them
         if len(feeds) < max_feeds:
-            discovered_feeds = self._discover_new_feeds(industry, max_feeds - len(feeds))
+            discovered_feeds = self._discover_new_feeds(
+                industry, max_feeds - len(feeds), self.discovery_seeds.get(industry.lower(), []),
+                [feed['url'] for feed in feeds]
+            )
             feeds.extend(discovered_feeds)
         
         return feeds[:max_feeds]
     
     def _get_feed_title(self, feed_url):
         """Get the title of an RSS feed"""
+        if self.cache:
+            cached = self.cache.get('feed_titles', feed_url)
+            if cached is not None:
+                return cached
+        
         try:
             response = requests.get(feed_url, timeout=5)
             if response.status_code == 200:
                 content = response.text
                 title_match = re.search(r'<title>(.*?)</title>', content, re.DOTALL)
                 if title_match:
-                    return clean_html(title_match.group(1))
+                    title = clean_html(title_match.group(1))
+                    if self.cache:
+                        self.cache.set('feed_titles', feed_url, title, self.title_cache_ttl)
+                    if self.registry:
+                        self.registry.set_title(feed_url, title)
+                    return title
             return 'Unknown Feed'
         except:
             return 'Unknown Feed'
     
-    def _discover_new_feeds(self, industry, max_feeds):
-        """Discover new RSS feeds for an industry using web search"""
+    def _discover_new_feeds(self, industry, max_feeds, seed_urls, exclude=()):
+        """Discover new RSS feeds for an industry by crawling seed sites"""
         discovered_feeds = []
-        
-        # Search terms for the industry
-        search_terms = [
-            f"{industry} RSS feed",
-            f"{industry} news RSS",
-            f"{industry} blog RSS",
-            f"best {industry} RSS feeds"
-        ]
-        
-        for term in search_terms:
-            if len(discovered_feeds) >= max_feeds:
-                break
-            
-            # Use a simple web search approach
-            feeds = self._search_for_feeds(term)
-            for feed in feeds:
-                if len(discovered_feeds) >= max_feeds:
-                    break
-                if self._is_valid_feed(feed):
-                    discovered_feeds.append({
-                        'url': feed,
-                        'title': self._get_feed_title(feed),
-                        'type': 'discovered',
-                        'industry': industry
-                    })
-        
+        if not seed_urls:
+            return discovered_feeds
+        for feed in self.discoverer.discover(list(seed_urls), max_feeds, exclude):
+            if self.cache:
+                self.cache.set('feed_titles', feed['url'], feed['title'], self.title_cache_ttl)
+            if self.registry:
+                self.registry.add(industry.lower(), feed['url'], feed['title'])
+            discovered_feeds.append({
+                'url': feed['url'],
+                'title': feed['title'],
+                'type': 'discovered',
+                'industry': industry
+            })
         return discovered_feeds
-    
-    def _search_for_feeds(self, search_term):
-        """Search for RSS feeds using web search"""
-        # This is a simplified approach - in production, you'd use a proper search API
-        feeds = []
-        
-        # Common RSS feed URLs for different industries
-        common_feeds = {
-            'ai': [
-                'https://techcrunch.com/feed/',
-                'https://www.wired.com/feed/rss',
-                'https://feeds.arstechnica.com/arstechnica/index/',
-                'https://feeds.feedburner.com/venturebeat/SZYF',
-                'https://feeds.feedburner.com/TechCrunch/'
-            ],
-            'ai-models': [
-                'https://techcrunch.com/feed/',
-                'https://www.wired.com/feed/rss',
-                'https://feeds.arstechnica.com/arstechnica/index/',
-                'https://feeds.feedburner.com/venturebeat/SZYF',
-                'https://feeds.feedburner.com/TechCrunch/'
-            ]
-        }
-        
-        # Return some common feeds as examples
-        return common_feeds.get('ai', [])[:5]
-    
-    def _is_valid_feed(self, feed_url):
-        """Check if a URL is a valid RSS feed"""
-        try:
-            response = requests.get(feed_url, timeout=5)
-            if response.status_code == 200:
-                content = response.text
-                # Check if it contains RSS-like content
-                return '<rss' in content.lower() or '<feed' in content.lower()
-            return False
-        except:
-            return False
 
 def clean_html(text):
     """Remove HTML tags from text"""
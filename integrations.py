@@ -1,65 +1,196 @@
-import smtplib
 import requests
 import json
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
+from urllib.parse import quote
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from rate_limit import SharedRateLimiter, retry_after_seconds
+from smtp_pool import SMTPPool
+from digest_templates import DigestRenderer
 
 class IntegrationManager:
-    def __init__(self):
+    def __init__(self, ledger=None):
         self.smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
         self.smtp_port = int(os.getenv('SMTP_PORT', 587))
         self.smtp_username = os.getenv('SMTP_USERNAME')
         self.smtp_password = os.getenv('SMTP_PASSWORD')
+        self.smtp_pool = SMTPPool(
+            self.smtp_server,
+            self.smtp_port,
+            self.smtp_username,
+            self.smtp_password,
+            starttls=os.getenv('SMTP_STARTTLS', 'true').lower() != 'false',
+            size=int(os.getenv('SMTP_POOL_SIZE', 2))
+        )
+        
+        # Notion allows an average of 3 requests per second per integration
+        self.notion_api_base = os.getenv('NOTION_API_BASE', 'https://api.notion.com/v1').rstrip('/')
+        self.notion_rate = float(os.getenv('NOTION_RATE_LIMIT', 3))
+        self.notion_concurrency = int(os.getenv('NOTION_CONCURRENCY', 3))
+        self.max_retries = int(os.getenv('INTEGRATION_MAX_RETRIES', 3))
+        
+        # Airtable allows 5 requests per second per base and asks clients to wait 30s after a 429
+        self.airtable_api_base = os.getenv('AIRTABLE_API_BASE', 'https://api.airtable.com/v0').rstrip('/')
+        self.airtable_rate = float(os.getenv('AIRTABLE_RATE_LIMIT', 5))
+        self.airtable_concurrency = int(os.getenv('AIRTABLE_CONCURRENCY', 4))
+        
+        # One pooled session reuses connections across all API calls
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        self._limiters = {}
+        self._limiters_lock = threading.Lock()
+        self.renderer = DigestRenderer()
+        self.ledger = ledger
+    
+    def _get_limiter(self, service, api_key, rate):
+        """Get the rate limiter for an API key, shared with the other worker processes"""
+        with self._limiters_lock:
+            key = (service, api_key)
+            if key not in self._limiters:
+                self._limiters[key] = SharedRateLimiter(f'{service}:{api_key}', rate)
+            return self._limiters[key]
     
     def send_articles(self, articles, integration_type, config):
         """Send articles to the specified integration"""
         try:
+            destination = None
+            skipped = 0
+            if self.ledger and integration_type == 'email':
+                return self._send_email_tracked(articles, config)
+            if self.ledger and integration_type in ('slack', 'airtable', 'notion'):
+                destination = self.ledger.destination_key(integration_type, config)
+                if not config.get('resend'):
+                    # Only deliver articles this destination has not received yet
+                    new_articles = self.ledger.filter_new(destination, articles)
+                    skipped = len(articles) - len(new_articles)
+                    articles = new_articles
+                    if not articles:
+                        return {'success': True, 'message': 'No new articles to send', 'skipped': skipped}
+            
             if integration_type == 'email':
-                return self._send_email(articles, config)
+                result = self._send_email(articles, config)
             elif integration_type == 'slack':
-                return self._send_slack(articles, config)
+                result = self._send_slack(articles, config)
             elif integration_type == 'airtable':
-                return self._send_airtable(articles, config)
+                result = self._send_airtable(articles, config)
             elif integration_type == 'notion':
-                return self._send_notion(articles, config)
+                result = self._send_notion(articles, config)
             else:
                 return {'success': False, 'error': 'Unsupported integration type'}
+            
+            if destination:
+                self.ledger.record(destination, self._delivered_articles(articles, result))
+                result['skipped'] = skipped
+            return result
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
+    def _delivered_articles(self, articles, result):
+        """Work out which articles reached the destination from a send result"""
+        if result.get('success'):
+            return articles
+        
+        delivered_links = set()
+        for item in result.get('results', []):
+            if item.get('success') and item.get('link'):
+                delivered_links.add(item['link'])
+        for batch in result.get('batches', []):
+            if batch.get('success'):
+                delivered_links.update(batch.get('links', []))
+        return [article for article in articles if article.get('link') in delivered_links]
+    
+    @staticmethod
+    def _email_recipients(config):
+        recipients = config.get('recipients') or config.get('to_email') or []
+        if isinstance(recipients, str):
+            recipients = recipients.split(',')
+        return [recipient.strip() for recipient in recipients if recipient.strip()]
+    
+    def _send_email_tracked(self, articles, config):
+        """Send an email digest, recording deliveries per recipient so one failed recipient doesn't re-send to the rest"""
+        recipients = self._email_recipients(config)
+        if not recipients:
+            return {'success': False, 'error': 'Email address required'}
+        
+        # Recipients owed the same articles share one rendered digest
+        groups = {}
+        pending_links = set()
+        for recipient in recipients:
+            destination = self.ledger.destination_key('email', {'recipients': [recipient]})
+            pending = articles if config.get('resend') else self.ledger.filter_new(destination, articles)
+            if not pending:
+                continue
+            pending_links.update(self.ledger.article_hash(article) for article in pending)
+            key = tuple(self.ledger.article_hash(article) for article in pending)
+            groups.setdefault(key, (pending, {}))[1][recipient] = destination
+        
+        skipped = len({self.ledger.article_hash(article) for article in articles} - pending_links)
+        if not groups:
+            return {'success': True, 'message': 'No new articles to send', 'skipped': skipped}
+        
+        results = []
+        errors = []
+        for pending, destinations in groups.values():
+            result = self._send_email(pending, dict(config, recipients=list(destinations)))
+            if result.get('error'):
+                errors.append(result['error'])
+            for item in result.get('results', []):
+                if item['success']:
+                    self.ledger.record(destinations[item['recipient']], pending)
+                results.append(item)
+        
+        sent = [item['recipient'] for item in results if item['success']]
+        response = {
+            'success': not errors,
+            'message': f'Email sent to {", ".join(sent)}' if sent else 'Email not sent',
+            'results': results,
+            'skipped': skipped
+        }
+        if errors:
+            response['error'] = '; '.join(errors)
+        return response
+    
     def _send_email(self, articles, config):
         """Send articles via email"""
         try:
-            # Email configuration
-            to_email = config.get('to_email')
+            recipients = self._email_recipients(config)
             subject = config.get('subject', 'RSS Feed Analysis Results')
             
-            if not to_email:
+            if not recipients:
                 return {'success': False, 'error': 'Email address required'}
             
-            # Create email content
+            # Render the digest once and reuse it for every recipient
             html_content = self._format_articles_html(articles)
             
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = self.smtp_username
-            msg['To'] = to_email
+            messages = []
+            for recipient in recipients:
+                msg = MIMEMultipart('alternative')
+                msg['Subject'] = subject
+                msg['From'] = self.smtp_username
+                msg['To'] = recipient
+                msg.attach(MIMEText(html_content, 'html'))
+                messages.append((recipient, msg))
             
-            # Add HTML content
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
+            # Send over a pooled, already authenticated connection
+            results = self.smtp_pool.send(messages)
             
-            # Send email
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.smtp_username, self.smtp_password)
-            server.send_message(msg)
-            server.quit()
-            
-            return {'success': True, 'message': f'Email sent to {to_email}'}
+            sent = [result['recipient'] for result in results if result['success']]
+            response = {
+                'success': len(sent) == len(recipients),
+                'message': f'Email sent to {", ".join(sent)}' if sent else 'Email not sent',
+                'results': results
+            }
+            if len(sent) < len(recipients):
+                response['error'] = f'{len(recipients) - len(sent)} of {len(recipients)} recipients failed'
+            return response
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
@@ -72,20 +203,33 @@ class IntegrationManager:
             if not webhook_url:
                 return {'success': False, 'error': 'Slack webhook URL required'}
             
-            # Format articles for Slack
-            slack_message = self._format_articles_slack(articles)
+            # Format articles for Slack, split into messages within Slack's limits
+            parts = self.renderer.render_slack_parts(articles)
             
-            payload = {
-                'text': f'RSS Feed Analysis Results - {len(articles)} articles',
-                'blocks': slack_message
-            }
-            
-            response = requests.post(webhook_url, json=payload)
+            # Post in order and stop at the first failure so parts never arrive out of sequence;
+            # articles in the parts already posted are reported so a retry doesn't post them again
+            results = []
+            for index, (payload, part_articles) in enumerate(parts):
+                try:
+                    response = self.session.post(webhook_url, json=payload, timeout=30)
+                    error = None if response.status_code == 200 else f'Slack API error: {response.status_code}'
+                except requests.RequestException as e:
+                    error = str(e)
+                if error:
+                    return {
+                        'success': False,
+                        'error': f'{error} on message {index + 1} of {len(parts)}',
+                        'messages_sent': index,
+                        'results': results
+                    }
+                results.extend({'link': article.get('link', ''), 'success': True} for article in part_articles)
             
-            if response.status_code == 200:
-                return {'success': True, 'message': 'Message sent to Slack'}
-            else:
-                return {'success': False, 'error': f'Slack API error: {response.status_code}'}
+            return {
+                'success': True,
+                'message': f'{len(parts)} message(s) sent to Slack',
+                'messages_sent': len(parts),
+                'results': results
+            }
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
@@ -99,14 +243,19 @@ class IntegrationManager:
             if not all([api_key, base_id]):
                 return {'success': False, 'error': 'Airtable API key and base ID required'}
             
-            # Prepare records for Airtable
+            # Prepare records for Airtable, one per link so upserts stay unambiguous
             records = []
+            seen_links = set()
             for article in articles:
+                link = article.get('link', '')
+                if link in seen_links:
+                    continue
+                seen_links.add(link)
                 record = {
                     'fields': {
                         'Title': article.get('title', ''),
                         'Summary': article.get('summary', ''),
-                        'Link': article.get('link', ''),
+                        'Link': link,
                         'Source': article.get('source', ''),
                         'Published': article.get('published', ''),
                         'Relevance Score': article.get('relevance_score', 0),
@@ -116,24 +265,75 @@ class IntegrationManager:
                 records.append(record)
             
             # Send to Airtable
-            url = f'https://api.airtable.com/v0/{base_id}/{table_name}'
+            url = f'{self.airtable_api_base}/{base_id}/{quote(table_name, safe="")}'
             headers = {'Authorization': f'Bearer {api_key}'}
+            limiter = self._get_limiter('airtable', base_id, self.airtable_rate)
             
             # Airtable allows up to 10 records per request
             batch_size = 10
-            for i in range(0, len(records), batch_size):
-                batch = records[i:i + batch_size]
-                payload = {'records': batch}
-                
-                response = requests.post(url, json=payload, headers=headers)
-                
-                if response.status_code != 200:
-                    return {'success': False, 'error': f'Airtable API error: {response.status_code}'}
-            
-            return {'success': True, 'message': f'{len(articles)} articles sent to Airtable'}
+            batches = [records[i:i + batch_size] for i in range(0, len(records), batch_size)]
+            
+            with ThreadPoolExecutor(max_workers=self.airtable_concurrency) as executor:
+                results = list(executor.map(
+                    lambda item: self._upsert_airtable_batch(url, headers, item[0], item[1], limiter),
+                    enumerate(batches)
+                ))
+            
+            sent = sum(result['records'] for result in results if result['success'])
+            response = {
+                'success': sent == len(records),
+                'message': f'{sent} of {len(records)} articles sent to Airtable',
+                'batches': results
+            }
+            if sent < len(records):
+                failed = sum(1 for result in results if not result['success'])
+                response['error'] = f'{failed} of {len(batches)} Airtable batches failed'
+            return response
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
+    def _upsert_airtable_batch(self, url, headers, index, batch, limiter):
+        """Upsert up to 10 records keyed on Link so re-sends update existing rows"""
+        payload = {
+            'performUpsert': {'fieldsToMergeOn': ['Link']},
+            'records': batch,
+            'typecast': True
+        }
+        
+        result = {
+            'batch': index,
+            'records': len(batch),
+            'links': [record['fields']['Link'] for record in batch],
+            'success': False
+        }
+        for attempt in range(self.max_retries + 1):
+            limiter.acquire()
+            try:
+                response = self.session.patch(url, json=payload, headers=headers, timeout=30)
+            except requests.RequestException as e:
+                result['error'] = str(e)
+                time.sleep(2 ** attempt)
+                continue
+            
+            result['status'] = response.status_code
+            if response.status_code == 200:
+                body = response.json()
+                result['success'] = True
+                result['created'] = len(body.get('createdRecords', []))
+                result['updated'] = len(body.get('updatedRecords', []))
+                result.pop('error', None)
+                return result
+            
+            result['error'] = f'Airtable API error: {response.status_code}'
+            if response.status_code == 429:
+                limiter.pause(retry_after_seconds(response, 30.0))
+            elif response.status_code >= 500:
+                time.sleep(2 ** attempt)
+            else:
+                return result
+        
+        return result
+    
     def _send_notion(self, articles, config):
         """Send articles to Notion"""
         try:
@@ -143,17 +343,30 @@ class IntegrationManager:
             if not all([api_key, database_id]):
                 return {'success': False, 'error': 'Notion API key and database ID required'}
             
-            # Prepare records for Notion
-            for article in articles:
-                self._create_notion_page(api_key, database_id, article)
+            limiter = self._get_limiter('notion', api_key, self.notion_rate)
+            
+            # Create pages concurrently; the rate limiter keeps us within Notion's limit
+            with ThreadPoolExecutor(max_workers=self.notion_concurrency) as executor:
+                results = list(executor.map(
+                    lambda article: self._create_notion_page(api_key, database_id, article, limiter),
+                    articles
+                ))
             
-            return {'success': True, 'message': f'{len(articles)} articles sent to Notion'}
+            sent = sum(1 for result in results if result['success'])
+            response = {
+                'success': sent == len(articles),
+                'message': f'{sent} of {len(articles)} articles sent to Notion',
+                'results': results
+            }
+            if sent < len(articles):
+                response['error'] = f'{len(articles) - sent} of {len(articles)} Notion pages failed'
+            return response
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
-    def _create_notion_page(self, api_key, database_id, article):
+    def _create_notion_page(self, api_key, database_id, article, limiter=None):
         """Create a Notion page for an article"""
-        url = 'https://api.notion.com/v1/pages'
+        url = f'{self.notion_api_base}/pages'
         headers = {
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json',
@@ -171,68 +384,49 @@ class IntegrationManager:
             }
         }
         
-        response = requests.post(url, json=payload, headers=headers)
-        return response.status_code == 200
+        # Page creation isn't idempotent: only retry when Notion surely didn't create the page,
+        # since a retried request that was processed would leave a duplicate page
+        result = {'link': article.get('link', ''), 'success': False}
+        for attempt in range(self.max_retries + 1):
+            if limiter:
+                limiter.acquire()
+            try:
+                response = self.session.post(url, json=payload, headers=headers, timeout=30)
+            except requests.ConnectTimeout as e:
+                result['error'] = str(e)
+                time.sleep(2 ** attempt)
+                continue
+            except requests.RequestException as e:
+                result['error'] = f'{e} (the page may have been created; not retried)'
+                return result
+            
+            result['status'] = response.status_code
+            if response.status_code == 200:
+                result['success'] = True
+                result['page_id'] = response.json().get('id')
+                result.pop('error', None)
+                return result
+            
+            result['error'] = f'Notion API error: {response.status_code}'
+            if response.status_code == 429:
+                # Hold back every worker sharing this key, not just this one
+                delay = retry_after_seconds(response, 1.0)
+                if limiter:
+                    limiter.pause(delay)
+                else:
+                    time.sleep(delay)
+            elif response.status_code == 503:
+                # Notion rejects requests with 503 while unavailable, before processing them
+                time.sleep(2 ** attempt)
+            else:
+                return result
+        
+        return result
     
     def _format_articles_html(self, articles):
         """Format articles as HTML for email"""
-        html = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                .article {{ border: 1px solid #ddd; margin: 10px 0; padding: 15px; border-radius: 5px; }}
-                .title {{ font-size: 18px; font-weight: bold; margin-bottom: 10px; }}
-                .summary {{ color: #666; margin-bottom: 10px; }}
-                .meta {{ font-size: 12px; color: #999; }}
-                .score {{ background: #f0f0f0; padding: 5px; border-radius: 3px; display: inline-block; }}
-            </style>
-        </head>
-        <body>
-            <h2>RSS Feed Analysis Results</h2>
-            <p>Found {len(articles)} relevant articles:</p>
-        """
-        
-        for article in articles:
-            html += f"""
-            <div class="article">
-                <div class="title">{article.get('title', 'No title')}</div>
-                <div class="summary">{article.get('summary', 'No summary')}</div>
-                <div class="meta">
-                    Source: {article.get('source', 'Unknown')} | 
-                    Published: {article.get('published', 'Unknown')} |
-                    <span class="score">Relevance: {article.get('relevance_score', 0):.1f}%</span>
-                </div>
-                <div class="analysis">{article.get('analysis', '')}</div>
-            </div>
-            """
-        
-        html += "</body></html>"
-        return html
+        return self.renderer.render_email(articles)
     
     def _format_articles_slack(self, articles):
-        """Format articles for Slack"""
-        blocks = [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": f"RSS Feed Analysis Results ({len(articles)} articles)"
-                }
-            }
-        ]
-        
-        for article in articles:
-            blocks.append({
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*{article.get('title', 'No title')}*\n"
-                           f"{article.get('summary', 'No summary')[:200]}...\n"
-                           f"Source: {article.get('source', 'Unknown')} | "
-                           f"Relevance: {article.get('relevance_score', 0):.1f}%"
-                }
-            })
-        
-        return blocks
-
+        """Format articles as one or more Slack message payloads"""
+        return self.renderer.render_slack(articles)
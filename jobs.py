@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+class JobCancelled(Exception):
+    pass
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class JobManager:
+    def __init__(self, max_workers=None, max_jobs_per_client=None, retention=None, path=None):
+        # Job state lives in SQLite so any gunicorn worker on the node can report or cancel a job;
+        # the job itself runs in the worker that accepted it
+        self.path = path or os.getenv(
+            'JOBS_DB_PATH',
+            os.path.join(tempfile.gettempdir(), 'nuvian_jobs.sqlite3')
+        )
+        self.max_workers = int(max_workers or os.getenv('JOB_WORKERS', 2))
+        self.max_jobs_per_client = int(max_jobs_per_client or os.getenv('JOB_MAX_PER_CLIENT', 2))
+        self.retention = float(retention or os.getenv('JOB_RETENTION', 3600))
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+        self._local = threading.local()
+        self._init_db()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # A forked worker opens its own connection instead of sharing its parent's
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                client_id TEXT NOT NULL,
+                owner_pid INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                progress TEXT NOT NULL,
+                partial_results TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_client ON jobs (client_id, status)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at)')
+
+    def submit(self, client_id, func, params):
+        """Queue a job; func is called as func(params, job) and its return value is the result"""
+        self._prune()
+
+        conn = self._connect()
+        job_id = uuid.uuid4().hex
+        # Count and insert in one write transaction so workers can't both admit a client's last slot
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            active = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE client_id = ? AND status IN ('queued', 'running')",
+                (client_id,)
+            ).fetchone()[0]
+            if active >= self.max_jobs_per_client:
+                conn.execute('ROLLBACK')
+                return None
+
+            conn.execute(
+                'INSERT INTO jobs (id, client_id, owner_pid, status, progress, partial_results, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, client_id, os.getpid(), 'queued',
+                 json.dumps({'stage': 'queued', 'done': 0, 'total': 0}), '[]', time.time())
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        self._get_executor().submit(self._run, job_id, func, params)
+        return job_id
+
+    def _get_executor(self):
+        # An executor inherited over fork has no live threads, so each process makes its own
+        with self._executor_lock:
+            if self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, job_id, func, params):
+        conn = self._connect()
+        cursor = conn.execute(
+            "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ? AND cancel_requested = 0",
+            (time.time(), job_id)
+        )
+        if cursor.rowcount == 0:
+            self._finish(job_id, 'cancelled')
+            return
+
+        try:
+            result = func(params, JobHandle(self, job_id))
+            self._finish(job_id, 'completed', result=json.dumps(result))
+        except JobCancelled:
+            self._finish(job_id, 'cancelled')
+        except Exception as e:
+            self._finish(job_id, 'failed', error=str(e))
+
+    def _finish(self, job_id, status, result=None, error=None):
+        try:
+            self._connect().execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?',
+                (status, result, error, time.time(), job_id)
+            )
+        except sqlite3.Error as e:
+            logger.error('Error finishing job %s: %s', job_id, e)
+
+    def get(self, job_id):
+        """Return a JSON-safe snapshot of a job, or None if unknown"""
+        row = self._connect().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if not row:
+            return None
+        return {
+            'id': row['id'],
+            'status': row['status'],
+            'progress': json.loads(row['progress']),
+            'partial_results': json.loads(row['partial_results']),
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
+
+    def cancel(self, job_id):
+        """Request cancellation of a queued or running job"""
+        cursor = self._connect().execute(
+            "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status IN ('queued', 'running')",
+            (job_id,)
+        )
+        return cursor.rowcount > 0
+
+    def cancel_requested(self, job_id):
+        row = self._connect().execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def _prune(self):
+        conn = self._connect()
+        now = time.time()
+        conn.execute('DELETE FROM jobs WHERE finished_at < ?', (now - self.retention,))
+        # Jobs owned by a worker that has since exited will never finish on their own
+        for row in conn.execute(
+            "SELECT id, owner_pid FROM jobs WHERE status IN ('queued', 'running') AND owner_pid != ?",
+            (os.getpid(),)
+        ).fetchall():
+            if not _process_alive(row['owner_pid']):
+                self._finish(row['id'], 'failed', error='Worker exited before the job finished')
+
+class JobHandle:
+    def __init__(self, manager, job_id):
+        self._manager = manager
+        self._job_id = job_id
+
+    def update(self, stage, done=0, total=0, partial_results=None):
+        """Record progress and optionally replace the partial results"""
+        progress = json.dumps({'stage': stage, 'done': done, 'total': total})
+        try:
+            if partial_results is not None:
+                self._manager._connect().execute(
+                    'UPDATE jobs SET progress = ?, partial_results = ? WHERE id = ?',
+                    (progress, json.dumps(partial_results), self._job_id)
+                )
+            else:
+                self._manager._connect().execute(
+                    'UPDATE jobs SET progress = ? WHERE id = ?', (progress, self._job_id)
+                )
+        except sqlite3.Error as e:
+            # Progress is best effort; the job keeps running
+            logger.warning('Error updating job %s: %s', self._job_id, e)
+
+    def check_cancelled(self):
+        """Raise JobCancelled if cancellation was requested"""
+        if self._manager.cancel_requested(self._job_id):
+            raise JobCancelled()
@@ -0,0 +1,260 @@
+import base64
+import binascii
+import json
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+class Leaderboard:
+    def __init__(self, path=None, capacity=None, half_life=None, max_age=None):
+        self.path = path or os.getenv(
+            'LEADERBOARD_PATH',
+            os.path.join(tempfile.gettempdir(), 'nuvian_leaderboard.sqlite3')
+        )
+        self.capacity = int(capacity or os.getenv('LEADERBOARD_CAPACITY', 500))
+        # A score halves every half_life seconds after the article is first ingested
+        self.half_life = float(half_life or os.getenv('LEADERBOARD_HALF_LIFE', 86400))
+        self.max_age = float(max_age or os.getenv('LEADERBOARD_MAX_AGE', 7 * 86400))
+        self.expire_every = 32
+        self._local = threading.local()
+        self._ingests = 0
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # A forked worker opens its own connection instead of sharing its parent's
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def criteria_key(relevance_criteria):
+        """Normalize relevance criteria into the key of the ranking they were scored for"""
+        # Duplicates are kept since each entry adds to the score
+        return ','.join(sorted(criterion.strip().lower() for criterion in relevance_criteria or () if criterion.strip()))
+
+    def _init_db(self):
+        conn = self._connect()
+        columns = [row['name'] for row in conn.execute('PRAGMA table_info(leaderboard)')]
+        if columns and 'criteria' not in columns:
+            # Rankings from before scores were kept per criteria mix scores; they refill as analyses run
+            conn.execute('DROP TABLE leaderboard')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS leaderboard (
+                industry TEXT NOT NULL,
+                criteria TEXT NOT NULL,
+                link TEXT NOT NULL,
+                article TEXT NOT NULL,
+                score REAL NOT NULL,
+                rank_key REAL NOT NULL,
+                first_seen REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                seq INTEGER NOT NULL,
+                PRIMARY KEY (industry, criteria, link)
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS leaderboard_rank ON leaderboard (industry, criteria, rank_key)')
+        conn.execute('CREATE INDEX IF NOT EXISTS leaderboard_first_seen ON leaderboard (first_seen)')
+        conn.execute('CREATE INDEX IF NOT EXISTS leaderboard_seq ON leaderboard (industry, criteria, seq)')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS leaderboard_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        conn.execute("INSERT OR IGNORE INTO leaderboard_meta (key, value) VALUES ('seq', 0)")
+        # Cursors carry the store's epoch so ones issued by a since-deleted store are detected
+        conn.execute(
+            "INSERT OR IGNORE INTO leaderboard_meta (key, value) VALUES ('epoch', ?)",
+            (uuid.uuid4().int >> 80,)
+        )
+
+    def _rank_key(self, score, first_seen):
+        # log(score * 2^(-(now - first_seen) / half_life)) without the now term, so stored
+        # keys keep their order as time passes and the index never needs rebuilding
+        return math.log(max(score, 1e-6)) + first_seen * math.log(2) / self.half_life
+
+    def _decayed(self, rank_key, now):
+        return math.exp(rank_key - now * math.log(2) / self.half_life)
+
+    def ingest(self, industry, relevance_criteria, articles):
+        """Insert or re-score analyzed articles in the ranking for an industry and criteria"""
+        industry = (industry or '').lower()
+        criteria = self.criteria_key(relevance_criteria)
+        articles = [article for article in articles if article.get('link')]
+        if not industry or not articles:
+            return 0
+
+        conn = self._connect()
+        now = time.time()
+        links = list(dict.fromkeys(article['link'] for article in articles))
+        changed = 0
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            existing = {}
+            for offset in range(0, len(links), 500):
+                chunk = links[offset:offset + 500]
+                for row in conn.execute(
+                    f'SELECT link, score, first_seen, article FROM leaderboard '
+                    f'WHERE industry = ? AND criteria = ? AND link IN ({",".join("?" * len(chunk))})',
+                    [industry, criteria] + chunk
+                ):
+                    existing[row['link']] = row
+
+            seq = conn.execute("SELECT value FROM leaderboard_meta WHERE key = 'seq'").fetchone()[0]
+            # On a full board, new articles that would be trimmed straight away are not inserted
+            cutoff = conn.execute(
+                'SELECT rank_key FROM leaderboard WHERE industry = ? AND criteria = ? '
+                'ORDER BY rank_key DESC LIMIT 1 OFFSET ?',
+                (industry, criteria, self.capacity - 1)
+            ).fetchone()
+            rows = []
+            for article in {article['link']: article for article in articles}.values():
+                score = float(article.get('relevance_score', 0))
+                previous = existing.get(article['link'])
+                if previous is not None:
+                    # Unchanged articles keep their position and sequence number
+                    if abs(previous['score'] - score) < 1e-9 and \
+                            json.loads(previous['article']).get('analysis') == article.get('analysis'):
+                        continue
+                    first_seen = previous['first_seen']
+                else:
+                    first_seen = now
+                    if cutoff and self._rank_key(score, first_seen) <= cutoff['rank_key']:
+                        continue
+                seq += 1
+                rows.append((
+                    industry, criteria, article['link'], json.dumps(article), score,
+                    self._rank_key(score, first_seen), first_seen, now, seq
+                ))
+
+            if rows:
+                conn.executemany("""
+                    INSERT INTO leaderboard (industry, criteria, link, article, score, rank_key, first_seen, updated_at, seq)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (industry, criteria, link) DO UPDATE SET
+                        article = excluded.article,
+                        score = excluded.score,
+                        rank_key = excluded.rank_key,
+                        updated_at = excluded.updated_at,
+                        seq = excluded.seq
+                """, rows)
+                conn.execute("UPDATE leaderboard_meta SET value = ? WHERE key = 'seq'", (seq,))
+                changed = len(rows)
+                self._trim(conn, industry, criteria)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        with self._lock:
+            self._ingests += 1
+            expire = self._ingests % self.expire_every == 0
+        if expire:
+            self.expire()
+        return changed
+
+    def _trim(self, conn, industry, criteria):
+        # Keep only the capacity best entries per ranking
+        row = conn.execute(
+            'SELECT rank_key FROM leaderboard WHERE industry = ? AND criteria = ? '
+            'ORDER BY rank_key DESC LIMIT 1 OFFSET ?',
+            (industry, criteria, self.capacity)
+        ).fetchone()
+        if row:
+            conn.execute(
+                'DELETE FROM leaderboard WHERE industry = ? AND criteria = ? AND rank_key <= ?',
+                (industry, criteria, row['rank_key'])
+            )
+
+    def expire(self):
+        """Drop articles first ingested longer ago than max_age"""
+        cursor = self._connect().execute(
+            'DELETE FROM leaderboard WHERE first_seen < ?', (time.time() - self.max_age,)
+        )
+        return cursor.rowcount
+
+    def top(self, industry, relevance_criteria=(), limit=20):
+        """Return the best articles for an industry and criteria by decayed score, reading only limit rows"""
+        now = time.time()
+        # SQLite treats a negative LIMIT as no limit
+        rows = self._connect().execute(
+            'SELECT article, rank_key, first_seen FROM leaderboard '
+            'WHERE industry = ? AND criteria = ? AND first_seen >= ? ORDER BY rank_key DESC LIMIT ?',
+            ((industry or '').lower(), self.criteria_key(relevance_criteria), now - self.max_age, max(int(limit), 1))
+        ).fetchall()
+
+        articles = []
+        for row in rows:
+            article = json.loads(row['article'])
+            article['decayed_score'] = round(self._decayed(row['rank_key'], now), 4)
+            articles.append(article)
+        return articles
+
+    def industries(self):
+        """Return the maintained rankings as industry, criteria and size"""
+        return [
+            {'industry': row['industry'], 'criteria': row['criteria'].split(',') if row['criteria'] else [],
+             'size': row['size']}
+            for row in self._connect().execute(
+                'SELECT industry, criteria, COUNT(*) AS size FROM leaderboard '
+                'GROUP BY industry, criteria ORDER BY industry, criteria'
+            )
+        ]
+
+    def _meta(self, conn, key):
+        return conn.execute('SELECT value FROM leaderboard_meta WHERE key = ?', (key,)).fetchone()[0]
+
+    def encode_cursor(self, seq):
+        epoch = self._meta(self._connect(), 'epoch')
+        return base64.urlsafe_b64encode(f'{epoch}:{seq}'.encode('ascii')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Return the sequence number in a cursor, or None if it came from another store; raises ValueError if malformed"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+            epoch, seq = (int(part) for part in raw.split(':'))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise ValueError('Invalid cursor')
+        conn = self._connect()
+        if epoch != self._meta(conn, 'epoch') or seq > self._meta(conn, 'seq'):
+            return None
+        return seq
+
+    def current_cursor(self):
+        """Return a cursor for everything ingested so far"""
+        return self.encode_cursor(self._meta(self._connect(), 'seq'))
+
+    def changes(self, industry, relevance_criteria, since, limit=100):
+        """Return articles ingested or re-scored after a sequence number, oldest change first"""
+        conn = self._connect()
+        limit = max(int(limit), 1)
+        # Read the sequence first so changes committed during the query are returned next time
+        latest = self._meta(conn, 'seq')
+        rows = conn.execute(
+            'SELECT article, rank_key, seq FROM leaderboard '
+            'WHERE industry = ? AND criteria = ? AND seq > ? AND seq <= ? AND first_seen >= ? ORDER BY seq LIMIT ?',
+            ((industry or '').lower(), self.criteria_key(relevance_criteria), since, latest,
+             time.time() - self.max_age, limit + 1)
+        ).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        now = time.time()
+        articles = []
+        for row in rows:
+            article = json.loads(row['article'])
+            article['decayed_score'] = round(self._decayed(row['rank_key'], now), 4)
+            articles.append(article)
+        next_seq = rows[-1]['seq'] if has_more else latest
+        return articles, self.encode_cursor(next_seq), has_more
@@ -0,0 +1,312 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Label values past this many series per metric are reported as 'other'
+DEFAULT_MAX_SERIES = 200
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def feed_label(feed_url):
+    """Label feeds by hostname so user-supplied URLs can't create a series each"""
+    return (urlparse(feed_url).hostname or 'other').lower()
+
+class Counter:
+    def __init__(self, name, help_text, labels=(), max_series=DEFAULT_MAX_SERIES, on_change=None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.max_series = max_series
+        self.on_change = on_change
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels, series):
+        key = tuple(str(labels.get(label, '')) for label in self.labels)
+        if key not in series and len(series) >= self.max_series:
+            key = tuple('other' for _ in self.labels)
+        return key
+
+    def inc(self, amount=1, **labels):
+        """Increase the counter for the given label values"""
+        with self._lock:
+            key = self._key(labels, self._values)
+            self._values[key] = self._values.get(key, 0) + amount
+        if self.on_change:
+            self.on_change()
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    @staticmethod
+    def merge(total, snapshot):
+        for key, value in snapshot:
+            total[tuple(key)] = total.get(tuple(key), 0) + value
+
+    def render(self, values=None):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.append(f'{self.name}{_format_labels(self.labels, key)} {value}')
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS, max_series=DEFAULT_MAX_SERIES,
+                 on_change=None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.max_series = max_series
+        self.on_change = on_change
+        self._series = {}
+        self._lock = threading.Lock()
+
+    _key = Counter._key
+
+    def observe(self, value, **labels):
+        """Record one observation for the given label values"""
+        with self._lock:
+            key = self._key(labels, self._series)
+            series = self._series.get(key)
+            if series is None:
+                series = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+                self._series[key] = series
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+        if self.on_change:
+            self.on_change()
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), {'counts': list(series['counts']), 'sum': series['sum'], 'count': series['count']}]
+                    for key, series in self._series.items()]
+
+    @staticmethod
+    def merge(total, snapshot):
+        for key, series in snapshot:
+            merged = total.get(tuple(key))
+            if merged is None:
+                total[tuple(key)] = {'counts': list(series['counts']), 'sum': series['sum'], 'count': series['count']}
+                continue
+            merged['counts'] = [a + b for a, b in zip(merged['counts'], series['counts'])]
+            merged['sum'] += series['sum']
+            merged['count'] += series['count']
+
+    def render(self, series_by_key=None):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        if series_by_key is None:
+            series_by_key = self.snapshot_dict()
+        for key, series in sorted(series_by_key.items()):
+            for bound, count in zip(self.buckets, series['counts']):
+                labels = _format_labels(self.labels, key, ('le', bound))
+                lines.append(f'{self.name}_bucket{labels} {count}')
+            labels = _format_labels(self.labels, key, ('le', '+Inf'))
+            lines.append(f'{self.name}_bucket{labels} {series["count"]}')
+            labels = _format_labels(self.labels, key)
+            lines.append(f'{self.name}_sum{labels} {round(series["sum"], 6)}')
+            lines.append(f'{self.name}_count{labels} {series["count"]}')
+        return lines
+
+    def snapshot_dict(self):
+        total = {}
+        self.merge(total, self.snapshot())
+        return total
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        # Set by share(); each process then writes its snapshot there and /metrics sums them all
+        self.path = None
+        self.flush_interval = 5.0
+        self.retention = 86400
+        self._local = threading.local()
+        self._process = None
+        self._last_flush = 0.0
+
+    def counter(self, name, help_text, labels=(), max_series=DEFAULT_MAX_SERIES):
+        """Get or create a counter"""
+        return self._register(name, lambda: Counter(name, help_text, labels, max_series, self._changed))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS, max_series=DEFAULT_MAX_SERIES):
+        """Get or create a histogram"""
+        return self._register(
+            name, lambda: Histogram(name, help_text, labels, buckets, max_series, self._changed)
+        )
+
+    def _register(self, name, factory):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = factory()
+            return self._metrics[name]
+
+    def share(self, path, flush_interval=None, retention=None):
+        """Aggregate metrics across the worker processes on this node through a SQLite file"""
+        self.path = path
+        self.flush_interval = float(flush_interval or self.flush_interval)
+        self.retention = float(retention or self.retention)
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS metric_snapshots (
+                process_id TEXT PRIMARY KEY,
+                snapshot TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _process_id(self):
+        # A forked worker gets its own id instead of overwriting its parent's snapshot
+        pid = os.getpid()
+        if self._process is None or self._process[0] != pid:
+            self._process = (pid, uuid.uuid4().hex)
+        return self._process[1]
+
+    def _after_fork(self):
+        # The parent's counts stay in the parent's snapshot; copying them would count them twice
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        for metric in self._metrics.values():
+            metric._lock = threading.Lock()
+            metric.reset()
+
+    def _changed(self):
+        if not self.path:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_flush < self.flush_interval:
+                return
+            self._last_flush = now
+        self.flush()
+
+    def flush(self):
+        """Write this process's metrics for other workers' /metrics responses"""
+        if not self.path:
+            return
+        with self._lock:
+            metrics = dict(self._metrics)
+        snapshot = {name: metric.snapshot() for name, metric in metrics.items()}
+        try:
+            self._connect().execute(
+                'INSERT OR REPLACE INTO metric_snapshots (process_id, snapshot, updated_at) VALUES (?, ?, ?)',
+                (self._process_id(), json.dumps(snapshot), time.time())
+            )
+        except sqlite3.Error as e:
+            logger.warning('Metrics flush error: %s', e)
+
+    def _shared_snapshots(self):
+        self.flush()
+        conn = self._connect()
+        # Exited workers' totals are kept until the retention passes, so counters don't drop at once
+        conn.execute('DELETE FROM metric_snapshots WHERE updated_at < ?', (time.time() - self.retention,))
+        return [json.loads(row[0]) for row in conn.execute('SELECT snapshot FROM metric_snapshots')]
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        snapshots = None
+        if self.path:
+            try:
+                snapshots = self._shared_snapshots()
+            except sqlite3.Error as e:
+                logger.warning('Metrics read error: %s', e)
+
+        lines = []
+        for metric in metrics:
+            if snapshots is None:
+                lines.extend(metric.render())
+                continue
+            total = {}
+            for snapshot in snapshots:
+                metric.merge(total, snapshot.get(metric.name, []))
+            lines.extend(metric.render(total))
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+os.register_at_fork(after_in_child=registry._after_fork)
+
+stage_seconds = registry.histogram(
+    'rss_pipeline_stage_seconds', 'Time spent in each analyze pipeline stage', ['stage'])
+feed_fetch_seconds = registry.histogram(
+    'rss_feed_fetch_seconds', 'Latency of feed downloads by feed host', ['feed'])
+feed_bytes = registry.counter(
+    'rss_feed_bytes_downloaded_total', 'Bytes downloaded from feeds by feed host', ['feed'])
+feed_items = registry.counter(
+    'rss_feed_items_parsed_total', 'Items parsed from feeds by feed host', ['feed'])
+llm_seconds = registry.histogram(
+    'rss_llm_request_seconds', 'Latency of LLM analysis calls', ['status'])
+llm_tokens = registry.counter(
+    'rss_llm_tokens_total', 'Tokens used by LLM analysis calls', ['type'])
+cache_requests = registry.counter(
+    'rss_cache_requests_total', 'Cache lookups by cache and result', ['cache', 'result'])
+
+_local = threading.local()
+
+@contextmanager
+def collect_timings():
+    """Collect per-stage timings of the current thread into a dict of milliseconds"""
+    previous = getattr(_local, 'timings', None)
+    timings = {}
+    _local.timings = timings
+    try:
+        yield timings
+    finally:
+        _local.timings = previous
+
+@contextmanager
+def stage(name):
+    """Time a pipeline stage into the stage histogram and the active timings"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_seconds.observe(elapsed, stage=name)
+        timings = getattr(_local, 'timings', None)
+        if timings is not None:
+            timings[name] = round(timings.get(name, 0.0) + elapsed * 1000, 3)
@@ -0,0 +1,131 @@
+import os
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape, quoteattr
+from jobs import JobCancelled
+
+class OPMLError(ValueError):
+    pass
+
+class _LimitedStream:
+    def __init__(self, stream, max_bytes):
+        self.stream = stream
+        self.remaining = max_bytes
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = 64 * 1024
+        data = self.stream.read(min(size, self.remaining + 1))
+        self.remaining -= len(data)
+        if self.remaining < 0:
+            raise OPMLError('OPML file is too large')
+        return data
+
+def parse_opml(stream, max_bytes=None):
+    """Yield feed outlines from an OPML stream without building the whole document"""
+    max_bytes = int(max_bytes or os.getenv('OPML_MAX_BYTES', 10 * 1024 * 1024))
+    folders = []
+    try:
+        for event, elem in ET.iterparse(_LimitedStream(stream, max_bytes), events=('start', 'end')):
+            if elem.tag != 'outline':
+                if event == 'end' and elem.tag == 'body':
+                    elem.clear()
+                continue
+
+            url = elem.get('xmlUrl') or elem.get('xmlurl')
+            if event == 'start':
+                if not url:
+                    # Outlines without a feed URL are folders; their name becomes the category
+                    folders.append(elem.get('title') or elem.get('text') or '')
+                continue
+
+            if url:
+                yield {
+                    'url': url.strip(),
+                    'title': elem.get('title') or elem.get('text') or '',
+                    'category': (elem.get('category') or '').strip('/').split('/')[0] or
+                                next((folder for folder in reversed(folders) if folder), '')
+                }
+            else:
+                folders.pop()
+            # Drop finished outlines so memory stays flat on large files
+            elem.clear()
+    except ET.ParseError as e:
+        raise OPMLError(f'Invalid OPML: {e}')
+
+def render_opml(feeds, title='Nuvian RSS Feeds'):
+    """Yield an OPML 2.0 document for (industry, url, title) rows grouped by industry"""
+    created = datetime.now(timezone.utc).strftime('%a, %d %b %Y %H:%M:%S GMT')
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<opml version="2.0">\n'
+    yield f'  <head>\n    <title>{escape(title)}</title>\n    <dateCreated>{created}</dateCreated>\n  </head>\n  <body>\n'
+
+    current = None
+    for industry, url, feed_title in feeds:
+        if industry != current:
+            if current is not None:
+                yield '    </outline>\n'
+            yield f'    <outline text={quoteattr(industry)} title={quoteattr(industry)}>\n'
+            current = industry
+        name = quoteattr(feed_title or url)
+        yield f'      <outline type="rss" text={name} title={name} xmlUrl={quoteattr(url)} />\n'
+    if current is not None:
+        yield '    </outline>\n'
+    yield '  </body>\n</opml>\n'
+
+def import_outlines(outlines, registry, discoverer, industry=None, job=None, workers=None):
+    """Validate new feeds concurrently and add them to the registry, returning per-feed results"""
+    workers = int(workers or os.getenv('OPML_IMPORT_WORKERS', 16))
+    results = []
+    pending = {}
+    for outline in outlines:
+        target = (industry or outline['category'] or 'imported').lower()
+        if outline['url'] in pending:
+            results.append({'url': outline['url'], 'industry': target, 'status': 'duplicate'})
+        elif registry.is_known(outline['url']):
+            registry.register(target, [outline['url']])
+            results.append({
+                'url': outline['url'], 'industry': target, 'status': 'existing',
+                'canonical_url': registry.canonical(outline['url'])
+            })
+        else:
+            pending[outline['url']] = (target, outline['title'])
+
+    total = len(results) + len(pending)
+    if job:
+        job.update('validating', len(results), total, list(results))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as executor:
+        futures = {executor.submit(discoverer.validate, url): url for url in pending}
+        for future in as_completed(futures):
+            url = futures[future]
+            target, outline_title = pending[url]
+            feed = future.result()
+            if feed:
+                if feed['url'] != url:
+                    registry.learn_alias(url, feed['url'])
+                registry.add(target, feed['url'], feed['title'] or outline_title)
+                results.append({
+                    'url': url, 'industry': target, 'status': 'added',
+                    'canonical_url': feed['url'], 'title': feed['title'] or outline_title
+                })
+            else:
+                results.append({'url': url, 'industry': target, 'status': 'invalid'})
+
+            if job:
+                job.update('validating', len(results), total, list(results))
+                try:
+                    job.check_cancelled()
+                except JobCancelled:
+                    for other in futures:
+                        other.cancel()
+                    raise
+
+    return {
+        'total': total,
+        'added': sum(1 for result in results if result['status'] == 'added'),
+        'existing': sum(1 for result in results if result['status'] == 'existing'),
+        'duplicate': sum(1 for result in results if result['status'] == 'duplicate'),
+        'invalid': sum(1 for result in results if result['status'] == 'invalid'),
+        'feeds': results
+    }
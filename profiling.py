@@ -0,0 +1,129 @@
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+class StackSampler:
+    def __init__(self, thread_id, interval):
+        # Samples one thread's stack from a helper thread; the profiled code is not traced
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                frame = frame.f_back
+
+            stack = ';'.join(reversed(names))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+    def collapsed(self):
+        """Return samples in collapsed-stack format, one 'frame;frame count' per line"""
+        lines = [f'{stack} {count}' for stack, count in sorted(self.stacks.items())]
+        return '\n'.join(lines) + '\n'
+
+class RequestProfiler:
+    def __init__(self, profile_dir=None, sample_rate=None, interval=None, max_profiles=None):
+        self.profile_dir = profile_dir or os.getenv(
+            'PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'nuvian_profiles')
+        )
+        self.sample_rate = float(sample_rate if sample_rate is not None else os.getenv('PROFILE_SAMPLE_RATE', 0))
+        self.interval = float(interval or os.getenv('PROFILE_INTERVAL_MS', 5)) / 1000
+        self.max_profiles = int(max_profiles or os.getenv('PROFILE_MAX_FILES', 200))
+        self.is_admin = lambda: False
+
+    def init_app(self, app, is_admin):
+        """Register request hooks; is_admin decides whether the profile header is honored"""
+        self.is_admin = is_admin
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def _wants_profile(self):
+        if request.headers.get('X-Profile') and self.is_admin():
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _before_request(self):
+        if not self._wants_profile():
+            return
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        g.profiler = {
+            'id': uuid.uuid4().hex[:12],
+            'sampler': sampler,
+            'start': time.perf_counter()
+        }
+        sampler.start()
+
+    def _after_request(self, response):
+        profile = g.pop('profiler', None)
+        if profile:
+            name = self._finish(profile)
+            response.headers['X-Profile-Id'] = name
+        return response
+
+    def _teardown_request(self, error=None):
+        # Stop samplers for requests that failed before after_request ran
+        profile = g.pop('profiler', None)
+        if profile:
+            self._finish(profile)
+
+    def _finish(self, profile):
+        profile['sampler'].stop()
+        elapsed_ms = int((time.perf_counter() - profile['start']) * 1000)
+        endpoint = re.sub(r'[^A-Za-z0-9_]+', '_', request.endpoint or 'unknown')
+        name = f"{int(time.time())}-{endpoint}-{elapsed_ms}ms-{profile['id']}.folded"
+
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            with open(os.path.join(self.profile_dir, name), 'w') as f:
+                f.write(profile['sampler'].collapsed())
+            self._prune()
+        except OSError as e:
+            logger.warning('Error writing profile %s: %s', name, e)
+        return name
+
+    def _prune(self):
+        names = sorted(self.list_profiles())
+        for name in names[:-self.max_profiles]:
+            os.remove(os.path.join(self.profile_dir, name))
+
+    def list_profiles(self):
+        """Return stored profile file names, newest last"""
+        if not os.path.isdir(self.profile_dir):
+            return []
+        return sorted(name for name in os.listdir(self.profile_dir) if name.endswith('.folded'))
+
+    def read_profile(self, name):
+        """Return the collapsed stacks of a stored profile, or None if unknown"""
+        if name not in self.list_profiles():
+            return None
+        with open(os.path.join(self.profile_dir, name)) as f:
+            return f.read()
@@ -0,0 +1,126 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class RateLimiter:
+    def __init__(self, rate, burst=None):
+        # Token bucket: rate tokens per second, holding at most burst tokens
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Drain the bucket so no caller proceeds for the given number of seconds"""
+        with self._lock:
+            self._tokens = min(self._tokens, 0) - seconds * self.rate
+            self._updated = time.monotonic()
+
+class SharedRateLimiter:
+    def __init__(self, key, rate, burst=None, path=None):
+        # The same token bucket kept in SQLite, so every worker process on the node draws from one budget
+        self.path = path or os.getenv(
+            'RATE_LIMIT_DB_PATH',
+            os.path.join(tempfile.gettempdir(), 'nuvian_rate_limits.sqlite3')
+        )
+        # Keys often contain API keys, so only their hash is stored
+        self.key = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self._local = threading.local()
+        # Used when the shared file can't be reached, so sends slow down rather than fail
+        self._fallback = RateLimiter(rate, burst)
+        try:
+            self._connect().execute("""
+                CREATE TABLE IF NOT EXISTS rate_buckets (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+        except sqlite3.Error as e:
+            logger.warning('Error opening rate limit store: %s', e)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # A forked worker opens its own connection instead of sharing its parent's
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _update(self, take=0, pause=0.0):
+        """Refill the bucket, then take a token or drain it; return seconds to wait, 0 if a token was taken"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            row = conn.execute('SELECT tokens, updated_at FROM rate_buckets WHERE key = ?', (self.key,)).fetchone()
+            tokens = self.burst if row is None else min(self.burst, row[0] + max(now - row[1], 0) * self.rate)
+            wait = 0.0
+            if pause:
+                tokens = min(tokens, 0) - pause * self.rate
+            elif take:
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_buckets (key, tokens, updated_at) VALUES (?, ?, ?)',
+                (self.key, tokens, now)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+    def acquire(self):
+        """Block until a token is available and take it"""
+        while True:
+            try:
+                wait = self._update(take=1)
+            except sqlite3.Error as e:
+                logger.warning('Rate limit store error: %s', e)
+                return self._fallback.acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Drain the bucket so no caller in any process proceeds for the given number of seconds"""
+        try:
+            self._update(pause=seconds)
+        except sqlite3.Error as e:
+            logger.warning('Rate limit store error: %s', e)
+            self._fallback.pause(seconds)
+
+def retry_after_seconds(response, default):
+    """Read a Retry-After header in seconds, falling back to default"""
+    try:
+        return max(float(response.headers.get('Retry-After', default)), 0.0)
+    except (TypeError, ValueError):
+        return default
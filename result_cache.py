@@ -0,0 +1,86 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class ResultCache:
+    def __init__(self, ttl=None, stale_ttl=None, max_entries=256):
+        # Fresh entries are served as-is, stale ones are served while a refresh runs
+        self.ttl = float(ttl if ttl is not None else os.getenv('RESULT_CACHE_TTL', 120))
+        self.stale_ttl = float(stale_ttl if stale_ttl is not None else os.getenv('RESULT_CACHE_STALE_TTL', 600))
+        self.max_entries = max_entries
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def make_key(self, feed_urls, industry, relevance_criteria, max_articles, full_text=False):
+        """Build a cache key from the normalized request parameters"""
+        normalized = {
+            'feed_urls': sorted(set(url.strip() for url in feed_urls if url and url.strip())),
+            'industry': (industry or '').strip().lower(),
+            # Duplicates are kept since each entry adds to the score
+            'criteria': sorted(relevance_criteria or []),
+            'max_articles': int(max_articles),
+            'full_text': bool(full_text)
+        }
+        raw = json.dumps(normalized, sort_keys=True)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return (value, etag, state) where state is 'fresh', 'stale' or 'miss'"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None, None, 'miss'
+
+            age = time.time() - entry['stored_at']
+            if age <= self.ttl:
+                return entry['value'], entry['etag'], 'fresh'
+            if age <= self.ttl + self.stale_ttl:
+                return entry['value'], entry['etag'], 'stale'
+
+            del self._entries[key]
+            return None, None, 'miss'
+
+    def set(self, key, value):
+        """Store a value and return its ETag"""
+        body = json.dumps(value, sort_keys=True, default=str)
+        etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k]['stored_at'])
+                del self._entries[oldest]
+            self._entries[key] = {'value': value, 'etag': etag, 'stored_at': time.time()}
+
+        return etag
+
+    def refresh_async(self, key, compute):
+        """Recompute an entry in the background unless a refresh is already running; compute may return None to keep the entry as is"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+
+        def worker():
+            try:
+                value = compute()
+                if value is not None:
+                    self.set(key, value)
+            except Exception as e:
+                logger.error('Error refreshing cached result %s: %s', key[:12], e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=worker, daemon=True).start()
+        return True
+
+    def clear(self):
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
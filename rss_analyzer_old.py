@@ -1,25 +1,32 @@
-import openai
 import os
 from datetime import datetime
 import re
-from textblob import TextBlob
-import nltk
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
 
-# Download required NLTK data
-try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    nltk.download('vader_lexicon', quiet=True)
-except:
-    pass
+_nltk_ready = False
+
+def _ensure_nltk_data():
+    """Download required NLTK data once, on first use instead of at import"""
+    global _nltk_ready
+    if _nltk_ready:
+        return
+    try:
+        import nltk
+        nltk.download('punkt', quiet=True)
+        nltk.download('stopwords', quiet=True)
+        nltk.download('vader_lexicon', quiet=True)
+    except:
+        pass
+    _nltk_ready = True
 
 class RSSAnalyzer:
     def __init__(self):
+        # sklearn and nltk are slow to import, so load them only when an analyzer is built
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        _ensure_nltk_data()
+        
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         if self.openai_api_key:
+            import openai
             openai.api_key = self.openai_api_key
         
         # Initialize TF-IDF vectorizer for content similarity
@@ -212,6 +219,8 @@ class RSSAnalyzer:
             3. Why this article matters
             """
             
+            import openai
+            
             response = openai.ChatCompletion.create(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
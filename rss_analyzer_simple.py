@@ -1,17 +1,74 @@
-import openai
 import os
 from datetime import datetime
 import re
+import hashlib
+import time
+import metrics
+from singleflight import SingleFlight
 
 class RSSAnalyzer:
-    def __init__(self):
+    # Relevance criteria that _analyze_custom_criteria scores; other names add nothing
+    SCORED_CRITERIA = ('trending', 'innovation', 'expertise')
+    
+    def __init__(self, cache=None, article_fetcher=None):
+        self.article_fetcher = article_fetcher
+        # How many of the best candidates per analysis get their full text fetched
+        self.enrich_top = int(os.getenv('ARTICLE_ENRICH_TOP', 5))
+        # Characters of fetched text scored, matching the feed summary limit in parse_rss_content
+        self.score_excerpt_chars = 300
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
+        self.openai_api_base = os.getenv('OPENAI_API_BASE', 'https://api.openai.com/v1').rstrip('/')
+        self.cache = cache
+        self.analysis_cache_ttl = int(os.getenv('ANALYSIS_CACHE_TTL', 86400))
+        # Seconds of budget below which a new AI analysis is skipped rather than started
+        self.min_analysis_time = 1.0
+        self._analyses_in_flight = SingleFlight()
     
-    def analyze_articles(self, articles, industry, relevance_criteria):
-        """Analyze articles and return scored results"""
+    def analyze_articles(self, articles, industry, relevance_criteria, deadline=None, skipped=None, full_text=False):
+        """Analyze articles and return scored results, stopping work at an optional time.monotonic() deadline"""
         if not articles:
             return []
         
+        scored_articles = self.score_articles(articles, industry, relevance_criteria, deadline, skipped)
+        
+        if full_text:
+            self.enrich_articles(scored_articles, industry, relevance_criteria, deadline)
+        
+        for article in scored_articles:
+            self.add_analysis(article, industry, deadline, skipped)
+        
+        return scored_articles
+    
+    def enrich_articles(self, scored_articles, industry, relevance_criteria, deadline=None):
+        """Fetch full text for the best scored articles and re-sort them, in place"""
+        if not self.article_fetcher or (deadline and time.monotonic() >= deadline):
+            return
+        # Re-score the best candidates on their full text, which is more reliable than the feed summary
+        candidates = scored_articles[:self.enrich_top]
+        with metrics.stage('enrich'):
+            self.article_fetcher.enrich(candidates, deadline)
+        with metrics.stage('score'):
+            for article in candidates:
+                if article.get('full_text'):
+                    article['relevance_score'] = self._calculate_relevance_score(
+                        article, industry, relevance_criteria
+                    )
+            scored_articles.sort(key=lambda x: x['relevance_score'], reverse=True)
+    
+    def add_analysis(self, article, industry, deadline=None, skipped=None):
+        """Set article['analysis'], recording a skip when the deadline leaves no time for it"""
+        with metrics.stage('ai_analysis'):
+            analysis = self._get_ai_analysis(article, industry, deadline)
+        if analysis is None:
+            analysis = "AI analysis skipped (latency budget reached)"
+            self._record_skip(skipped, article, 'ai_analysis')
+        article['analysis'] = analysis
+        # The text only feeds scoring and analysis; responses and stored rankings stay small
+        if article.pop('full_text', None):
+            article['full_text_used'] = True
+    
+    def score_articles(self, articles, industry, relevance_criteria, deadline=None, skipped=None):
+        """Dedupe and score articles without AI analysis, best first"""
         # Remove duplicates before analysis
         unique_articles = []
         seen_urls = set()
@@ -33,19 +90,40 @@ class RSSAnalyzer:
         scored_articles = []
         
         for article in unique_articles:
-            score = self._calculate_relevance_score(
-                article, industry, relevance_criteria
-            )
+            if deadline and time.monotonic() >= deadline:
+                self._record_skip(skipped, article, 'score')
+                continue
+            
+            with metrics.stage('score'):
+                score = self._calculate_relevance_score(
+                    article, industry, relevance_criteria
+                )
             
             article['relevance_score'] = score
-            article['analysis'] = self._get_ai_analysis(article, industry)
             scored_articles.append(article)
         
-        # Sort by relevance score
-        scored_articles.sort(key=lambda x: x['relevance_score'], reverse=True)
+        # Sort by relevance score so the best candidates are analyzed first when time is short
+        with metrics.stage('score'):
+            scored_articles.sort(key=lambda x: x['relevance_score'], reverse=True)
         
         return scored_articles
     
+    def _article_text(self, article):
+        """Lowercased text used for keyword scoring"""
+        # Fetched text stands in for the summary at the summary's length, so enriched
+        # and summary-only articles are scored on the same amount of text
+        body = article['full_text'][:self.score_excerpt_chars] if article.get('full_text') else article.get('summary', '')
+        return f"{article.get('title', '')} {body}".lower()
+    
+    def _record_skip(self, skipped, article, stage):
+        """Note an article whose scoring or analysis was cut off by the deadline"""
+        if skipped is not None:
+            skipped.append({
+                'link': article.get('link', ''),
+                'title': article.get('title', ''),
+                'stage': stage
+            })
+    
     def _calculate_relevance_score(self, article, industry, criteria):
         """Calculate relevance score based on multiple factors"""
         score = 0.0
@@ -87,7 +165,7 @@ class RSSAnalyzer:
         keywords = industry_keywords.get(industry.lower(), [industry])
         
         # Analyze title and summary
-        text = f"{article.get('title', '')} {article.get('summary', '')}".lower()
+        text = self._article_text(article)
         
         # Count keyword matches
         matches = sum(1 for keyword in keywords if keyword.lower() in text)
@@ -167,7 +245,7 @@ class RSSAnalyzer:
             return 50.0
         
         score = 0.0
-        text = f"{article.get('title', '')} {article.get('summary', '')}".lower()
+        text = self._article_text(article)
         
         for criterion in criteria:
             if criterion == 'trending':
@@ -188,17 +266,72 @@ class RSSAnalyzer:
         
         return min(score, 100.0)
     
-    def _get_ai_analysis(self, article, industry):
-        """Get AI-powered analysis of the article"""
+    def _get_ai_analysis(self, article, industry, deadline=None):
+        """Get AI-powered analysis of the article, or None when the deadline has passed"""
         if not self.openai_api_key:
             return "AI analysis not available (OpenAI API key required)"
         
+        key = self._analysis_key(article, industry)
+        if self.cache:
+            cached = self.cache.get('analyses', key)
+            if cached is not None:
+                return cached
+        
+        timeout = 30
+        if deadline:
+            # Cached analyses are still served past the deadline; new requests are not
+            # started when too little time is left for one to finish
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout < self.min_analysis_time:
+                return None
+        
+        # Identical concurrent requests share one OpenAI call, but a budgeted caller
+        # waits on someone else's call no longer than its own timeout
+        try:
+            analysis = self._analyses_in_flight.do(
+                key, lambda: self._fetch_ai_analysis(key, article, industry, timeout),
+                timeout if deadline else None
+            )
+        except TimeoutError:
+            return None
+        if deadline and analysis.startswith('AI analysis error') and time.monotonic() >= deadline:
+            # Cut off by the budget rather than failed
+            return None
+        return analysis
+    
+    def _fetch_ai_analysis(self, key, article, industry, timeout=30):
+        """Request an analysis and store successful ones in the shared cache"""
+        analysis = self._request_ai_analysis(article, industry, timeout)
+        if self.cache and not analysis.startswith('AI analysis error'):
+            self.cache.set('analyses', key, analysis, self.analysis_cache_ttl)
+        return analysis
+    
+    def _analysis_key(self, article, industry):
+        """Build the key identifying an analysis request"""
+        raw = '\x1f'.join([
+            (industry or '').lower(),
+            article.get('link', ''),
+            article.get('title', ''),
+            article.get('summary', ''),
+            article.get('full_text', '')
+        ])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    
+    def _full_text_excerpt(self, article):
+        """Opening of the article text for the prompt, when it was fetched"""
+        if not article.get('full_text'):
+            return ''
+        return f"Article text (excerpt): {article['full_text'][:2000]}"
+    
+    def _request_ai_analysis(self, article, industry, timeout=30):
+        """Call the OpenAI API for an article analysis"""
         try:
             prompt = f"""
             Analyze this article for relevance to the {industry} industry:
             
             Title: {article.get('title', '')}
             Summary: {article.get('summary', '')}
+            {self._full_text_excerpt(article)}
             
             Provide a brief analysis (2-3 sentences) covering:
             1. Key relevance to {industry}
@@ -221,15 +354,20 @@ class RSSAnalyzer:
                 "temperature": 0.7
             }
             
+            start = time.perf_counter()
             response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
+                f"{self.openai_api_base}/chat/completions",
                 headers=headers,
                 json=data,
-                timeout=30
+                timeout=timeout
             )
+            metrics.llm_seconds.observe(time.perf_counter() - start, status=response.status_code)
             
             if response.status_code == 200:
                 result = response.json()
+                usage = result.get('usage', {})
+                metrics.llm_tokens.inc(usage.get('prompt_tokens', 0), type='prompt')
+                metrics.llm_tokens.inc(usage.get('completion_tokens', 0), type='completion')
                 return result['choices'][0]['message']['content'].strip()
             else:
                 return f"AI analysis error: HTTP {response.status_code} - {response.text}"
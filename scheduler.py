@@ -0,0 +1,261 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from delivery_queue import create_private_file
+
+logger = logging.getLogger(__name__)
+
+class CronExpression:
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError('Cron expression needs 5 fields: minute hour day month weekday')
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, self.RANGES)
+        ]
+        # Both 0 and 7 mean Sunday
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        # Vixie cron: when both day fields are restricted, either may match; a field
+        # starting with '*' (such as */2) counts as unrestricted
+        self.days_restricted = not fields[2].startswith('*')
+        self.weekdays_restricted = not fields[4].startswith('*')
+
+    def _parse_field(self, field, low, high):
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step_text = part.split('/', 1)
+                step = int(step_text)
+                if step < 1:
+                    raise ValueError(f'Invalid cron step: {field}')
+
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(value) for value in part.split('-', 1))
+            else:
+                start = end = int(part)
+
+            if start < low or end > high or start > end:
+                raise ValueError(f'Cron value out of range: {field}')
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment):
+        """Return the first matching minute strictly after moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f'Cron expression never matches: {self.expression}')
+
+class DigestScheduler:
+    def __init__(self, run_digest, path=None, workers=None, stagger=None):
+        # run_digest(digest) executes the pipeline and returns a JSON-safe summary
+        self.run_digest = run_digest
+        self.path = path or os.getenv(
+            'SCHEDULER_DB_PATH',
+            os.path.join(tempfile.gettempdir(), 'nuvian_digests.sqlite3')
+        )
+        self.workers = int(workers or os.getenv('SCHEDULER_WORKERS', 1))
+        # Runs are spread over this many seconds after their cron time so they don't all start at :00
+        self.stagger = int(stagger if stagger is not None else os.getenv('SCHEDULER_STAGGER', 300))
+        self.poll_interval = 15
+        self._local = threading.local()
+        self._executor = None
+        self._started_pid = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._init_db()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # A forked worker opens its own connection instead of sharing its parent's
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_db(self):
+        # Digest definitions hold integration credentials
+        create_private_file(self.path)
+        self._connect().execute("""
+            CREATE TABLE IF NOT EXISTS digests (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                industry TEXT NOT NULL,
+                feed_urls TEXT NOT NULL,
+                relevance_criteria TEXT NOT NULL,
+                max_articles INTEGER NOT NULL,
+                integration_type TEXT NOT NULL,
+                config TEXT NOT NULL,
+                cron TEXT NOT NULL,
+                enabled INTEGER NOT NULL DEFAULT 1,
+                next_run_at REAL NOT NULL,
+                last_run_at REAL,
+                last_status TEXT,
+                last_result TEXT,
+                created_at REAL NOT NULL
+            )
+        """)
+
+    def _offset(self, digest_id):
+        if not self.stagger:
+            return 0
+        return int(hashlib.sha1(digest_id.encode('utf-8')).hexdigest(), 16) % self.stagger
+
+    def _next_run(self, digest_id, cron, after=None):
+        after = after or datetime.now()
+        # Step back by the offset so a run that fired late doesn't skip its next slot
+        base = CronExpression(cron).next_after(after - timedelta(seconds=self._offset(digest_id)))
+        return (base + timedelta(seconds=self._offset(digest_id))).timestamp()
+
+    def create(self, definition):
+        """Save a digest definition and schedule its first run"""
+        CronExpression(definition['cron'])
+        digest_id = uuid.uuid4().hex
+        now = time.time()
+        self._connect().execute(
+            'INSERT INTO digests (id, name, industry, feed_urls, relevance_criteria, max_articles, '
+            'integration_type, config, cron, enabled, next_run_at, created_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                digest_id,
+                definition.get('name') or definition.get('industry') or 'Digest',
+                definition.get('industry', ''),
+                json.dumps(definition.get('feed_urls', [])),
+                json.dumps(definition.get('relevance_criteria', [])),
+                max(int(definition.get('max_articles') or 20), 1),
+                definition['integration_type'],
+                json.dumps(definition.get('config', {})),
+                definition['cron'],
+                1 if definition.get('enabled', True) else 0,
+                self._next_run(digest_id, definition['cron']),
+                now
+            )
+        )
+        self._wakeup.set()
+        return self.get(digest_id)
+
+    def _public(self, row):
+        digest = dict(row)
+        digest['feed_urls'] = json.loads(digest['feed_urls'])
+        digest['relevance_criteria'] = json.loads(digest['relevance_criteria'])
+        digest['last_result'] = json.loads(digest['last_result']) if digest['last_result'] else None
+        digest['enabled'] = bool(digest['enabled'])
+        # Integration credentials stay on the server
+        digest.pop('config')
+        return digest
+
+    def get(self, digest_id):
+        """Return a digest definition without its integration config"""
+        row = self._connect().execute('SELECT * FROM digests WHERE id = ?', (digest_id,)).fetchone()
+        return self._public(row) if row else None
+
+    def list(self):
+        """Return all digest definitions"""
+        rows = self._connect().execute('SELECT * FROM digests ORDER BY created_at').fetchall()
+        return [self._public(row) for row in rows]
+
+    def delete(self, digest_id):
+        """Remove a digest definition"""
+        cursor = self._connect().execute('DELETE FROM digests WHERE id = ?', (digest_id,))
+        return cursor.rowcount > 0
+
+    def run_now(self, digest_id):
+        """Schedule a digest to run on the next poll"""
+        cursor = self._connect().execute(
+            'UPDATE digests SET next_run_at = ? WHERE id = ?', (time.time(), digest_id)
+        )
+        self._wakeup.set()
+        return cursor.rowcount > 0
+
+    def start(self):
+        """Start the scheduler loop once per process"""
+        with self._lock:
+            # Compared by pid so a worker forked from a started parent starts its own loop
+            if self._started_pid == os.getpid():
+                return
+            self._started_pid = os.getpid()
+            # An executor inherited over fork has no live threads, so each process makes its own
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='digest')
+        threading.Thread(target=self._loop, name='digest-scheduler', daemon=True).start()
+
+    def _loop(self):
+        while True:
+            try:
+                for digest in self._claim_due():
+                    self._executor.submit(self._run, digest)
+            except sqlite3.Error as e:
+                logger.error('Digest scheduler error: %s', e)
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _claim_due(self):
+        """Claim due digests by moving their next run forward, so only one worker runs each"""
+        conn = self._connect()
+        now = time.time()
+        claimed = []
+        for row in conn.execute(
+            'SELECT * FROM digests WHERE enabled = 1 AND next_run_at <= ?', (now,)
+        ).fetchall():
+            next_run = self._next_run(row['id'], row['cron'])
+            cursor = conn.execute(
+                'UPDATE digests SET next_run_at = ?, last_status = ? WHERE id = ? AND next_run_at = ?',
+                (next_run, 'running', row['id'], row['next_run_at'])
+            )
+            if cursor.rowcount:
+                digest = dict(row)
+                digest['feed_urls'] = json.loads(digest['feed_urls'])
+                digest['relevance_criteria'] = json.loads(digest['relevance_criteria'])
+                digest['config'] = json.loads(digest['config'])
+                claimed.append(digest)
+        return claimed
+
+    def _run(self, digest):
+        try:
+            result = self.run_digest(digest)
+            status = 'completed'
+        except Exception as e:
+            result = {'error': str(e)}
+            status = 'failed'
+
+        self._connect().execute(
+            'UPDATE digests SET last_run_at = ?, last_status = ?, last_result = ? WHERE id = ?',
+            (time.time(), status, json.dumps(result), digest['id'])
+        )
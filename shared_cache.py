@@ -0,0 +1,225 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import metrics
+
+logger = logging.getLogger(__name__)
+
+class SharedCache:
+    def __init__(self, path=None, max_bytes=None):
+        # A SQLite file in WAL mode lets every gunicorn worker on the node share entries
+        self.path = path or os.getenv(
+            'SHARED_CACHE_PATH',
+            os.path.join(tempfile.gettempdir(), 'nuvian_rss_cache.sqlite3')
+        )
+        self.max_bytes = int(max_bytes or os.getenv('SHARED_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+        self.evict_every = 32
+        # Access times and hit/miss counters are buffered per process and written in one
+        # transaction, so cache reads don't each take the write lock
+        self.flush_interval = 5.0
+        self.flush_max = 256
+        # LRU order only needs coarse access times; more recent ones are not rewritten
+        self.touch_interval = 60.0
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._pending_access = {}
+        self._pending_counts = {}
+        self._last_flush = time.monotonic()
+        self._init_db()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # A forked worker opens its own connection instead of sharing its parent's
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed_at)')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_stats (
+                namespace TEXT PRIMARY KEY,
+                hits INTEGER NOT NULL DEFAULT 0,
+                misses INTEGER NOT NULL DEFAULT 0,
+                sets INTEGER NOT NULL DEFAULT 0,
+                evictions INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+    def get(self, namespace, key, default=None):
+        """Return the cached value or default if it is missing or expired"""
+        try:
+            conn = self._connect()
+            now = time.time()
+            row = conn.execute(
+                'SELECT value, expires_at, accessed_at FROM cache WHERE namespace = ? AND key = ?',
+                (namespace, key)
+            ).fetchone()
+
+            if row and row[1] > now:
+                self._record(namespace, 'hits', key if now - row[2] > self.touch_interval else None, now)
+                metrics.cache_requests.inc(cache=namespace, result='hit')
+                return json.loads(row[0])
+
+            self._record(namespace, 'misses')
+            metrics.cache_requests.inc(cache=namespace, result='miss')
+            return default
+        except sqlite3.Error as e:
+            logger.warning('Shared cache read error: %s', e)
+            return default
+
+    def set(self, namespace, key, value, ttl):
+        """Store a JSON-serializable value for ttl seconds"""
+        try:
+            conn = self._connect()
+            now = time.time()
+            payload = json.dumps(value)
+            conn.execute(
+                'INSERT OR REPLACE INTO cache (namespace, key, value, size, expires_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (namespace, key, payload, len(payload), now + ttl, now)
+            )
+            self._record(namespace, 'sets')
+
+            with self._lock:
+                self._writes += 1
+                evict = self._writes % self.evict_every == 0
+            if evict:
+                self.evict()
+        except sqlite3.Error as e:
+            logger.warning('Shared cache write error: %s', e)
+
+    def delete(self, namespace, key):
+        """Remove an entry"""
+        try:
+            self._connect().execute(
+                'DELETE FROM cache WHERE namespace = ? AND key = ?',
+                (namespace, key)
+            )
+        except sqlite3.Error as e:
+            logger.warning('Shared cache delete error: %s', e)
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        self.flush()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM cache WHERE expires_at <= ?', (time.time(),))
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+
+            if total > self.max_bytes:
+                # Free down to 90% so eviction doesn't run on every write
+                target = total - int(self.max_bytes * 0.9)
+                freed = 0
+                victims = []
+                for namespace, key, size in conn.execute(
+                    'SELECT namespace, key, size FROM cache ORDER BY accessed_at'
+                ):
+                    victims.append((namespace, key))
+                    freed += size
+                    if freed >= target:
+                        break
+
+                conn.executemany('DELETE FROM cache WHERE namespace = ? AND key = ?', victims)
+                for namespace, _ in victims:
+                    self._count(conn, namespace, 'evictions')
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _count(self, conn, namespace, field, amount=1):
+        conn.execute(
+            f'INSERT INTO cache_stats (namespace, {field}) VALUES (?, ?) '
+            f'ON CONFLICT(namespace) DO UPDATE SET {field} = {field} + ?',
+            (namespace, amount, amount)
+        )
+
+    def _record(self, namespace, field, touched_key=None, now=None):
+        """Buffer a counter increment and optional access time, flushing when the buffer is due"""
+        with self._lock:
+            counts_key = (namespace, field)
+            self._pending_counts[counts_key] = self._pending_counts.get(counts_key, 0) + 1
+            if touched_key is not None:
+                self._pending_access[(namespace, touched_key)] = now
+            due = len(self._pending_access) + len(self._pending_counts) >= self.flush_max or \
+                time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write buffered access times and counters in one transaction"""
+        with self._lock:
+            access, counts = self._pending_access, self._pending_counts
+            self._pending_access, self._pending_counts = {}, {}
+            self._last_flush = time.monotonic()
+        if not access and not counts:
+            return
+
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'UPDATE cache SET accessed_at = MAX(accessed_at, ?) WHERE namespace = ? AND key = ?',
+                [(accessed_at, namespace, key) for (namespace, key), accessed_at in access.items()]
+            )
+            for (namespace, field), amount in counts.items():
+                self._count(conn, namespace, field, amount)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def stats(self):
+        """Return hit rates and sizes per namespace"""
+        self.flush()
+        conn = self._connect()
+        sizes = {
+            namespace: {'entries': entries, 'bytes': size}
+            for namespace, entries, size in conn.execute(
+                'SELECT namespace, COUNT(*), COALESCE(SUM(size), 0) FROM cache GROUP BY namespace'
+            )
+        }
+
+        namespaces = {}
+        for namespace, hits, misses, sets, evictions in conn.execute(
+            'SELECT namespace, hits, misses, sets, evictions FROM cache_stats'
+        ):
+            lookups = hits + misses
+            namespaces[namespace] = {
+                'hits': hits,
+                'misses': misses,
+                'sets': sets,
+                'evictions': evictions,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                **sizes.get(namespace, {'entries': 0, 'bytes': 0})
+            }
+
+        return {
+            'path': self.path,
+            'max_bytes': self.max_bytes,
+            'total_bytes': sum(entry['bytes'] for entry in sizes.values()),
+            'namespaces': namespaces
+        }
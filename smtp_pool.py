@@ -0,0 +1,98 @@
+import smtplib
+import threading
+import time
+
+class SMTPPool:
+    def __init__(self, host, port, username=None, password=None, starttls=True, size=2, max_idle=60):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.size = size
+        # Idle connections older than this are checked with NOOP before reuse
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _open(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        server.ehlo()
+        if self.starttls:
+            server.starttls()
+            server.ehlo()
+        if self.username:
+            server.login(self.username, self.password)
+        return server
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                server, last_used = self._idle.pop()
+
+            if time.monotonic() - last_used < self.max_idle:
+                return server
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close(server)
+        return self._open()
+
+    def _checkin(self, server):
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((server, time.monotonic()))
+                return
+        self._close(server)
+
+    def _close(self, server):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            try:
+                server.close()
+            except OSError:
+                pass
+
+    def send(self, messages):
+        """Send (recipient, message) pairs over one pooled connection and return per-recipient results"""
+        results = []
+        try:
+            server = self._checkout()
+        except (smtplib.SMTPException, OSError) as e:
+            return [{'recipient': recipient, 'success': False, 'error': str(e)} for recipient, _ in messages]
+
+        for index, (recipient, message) in enumerate(messages):
+            try:
+                try:
+                    server.send_message(message, to_addrs=[recipient])
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    # The server dropped an idle connection; reconnect once and resend
+                    self._close(server)
+                    server = self._open()
+                    server.send_message(message, to_addrs=[recipient])
+                results.append({'recipient': recipient, 'success': True})
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                results.append({'recipient': recipient, 'success': False, 'error': str(e)})
+            except (smtplib.SMTPException, OSError) as e:
+                # The connection is unusable; keep the results of recipients already sent to
+                # so they are recorded, and report the rest as failed
+                self._close(server)
+                results.extend(
+                    {'recipient': unsent, 'success': False, 'error': str(e)} for unsent, _ in messages[index:]
+                )
+                return results
+
+        self._checkin(server)
+        return results
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
@@ -0,0 +1,87 @@
+import builtins
+import sys
+import threading
+import time
+
+_original_import = builtins.__import__
+_process_start = time.perf_counter()
+_state = {
+    'tracing': False,
+    'started_at': None,
+    'finished_at': None
+}
+_import_roots = []
+_import_stack = []
+_components = {}
+_components_lock = threading.Lock()
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Only time imports that actually load a module, from the main thread
+    if (level or name in sys.modules or not _state['tracing']
+            or threading.current_thread() is not threading.main_thread()):
+        return _original_import(name, globals, locals, fromlist, level)
+
+    node = {'module': name, 'ms': 0.0, 'children': []}
+    parent = _import_stack[-1] if _import_stack else None
+    (parent['children'] if parent else _import_roots).append(node)
+
+    _import_stack.append(node)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        node['ms'] = round((time.perf_counter() - start) * 1000, 2)
+        _import_stack.pop()
+
+def trace_imports():
+    """Start recording an import tree with per-module load times"""
+    _state['tracing'] = True
+    _state['started_at'] = time.perf_counter()
+    builtins.__import__ = _timed_import
+
+def finish_startup():
+    """Stop recording imports so requests pay no tracing overhead"""
+    builtins.__import__ = _original_import
+    _state['tracing'] = False
+    _state['finished_at'] = time.perf_counter()
+
+class LazyComponent:
+    def __init__(self, name, factory):
+        # Construct the wrapped component on first attribute access
+        self._name = name
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    start = time.perf_counter()
+                    self._instance = self._factory()
+                    with _components_lock:
+                        _components[self._name] = {
+                            'init_ms': round((time.perf_counter() - start) * 1000, 2),
+                            'initialized_after_ms': round((start - _process_start) * 1000, 2)
+                        }
+        return self._instance
+
+    def __getattr__(self, attr):
+        return getattr(self._get(), attr)
+
+def startup_report():
+    """Return import timings, startup duration and component init times"""
+    startup_ms = None
+    if _state['started_at'] is not None and _state['finished_at'] is not None:
+        startup_ms = round((_state['finished_at'] - _state['started_at']) * 1000, 2)
+
+    with _components_lock:
+        components = dict(_components)
+
+    return {
+        'startup_ms': startup_ms,
+        'uptime_s': round(time.perf_counter() - _process_start, 2),
+        'imports_ms': round(sum(node['ms'] for node in _import_roots), 2),
+        'imports': sorted(_import_roots, key=lambda node: node['ms'], reverse=True),
+        'components': components
+    }
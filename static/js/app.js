@@ -383,6 +383,9 @@ class RSSAnalyzerApp {
             
             if (result.success) {
                 this.showAlert(result.message, 'success');
+                if (result.delivery_id) {
+                    this.pollDelivery(result.delivery_id);
+                }
             } else {
                 this.showAlert(result.error, 'danger');
             }
@@ -394,6 +397,27 @@ class RSSAnalyzerApp {
         }
     }
 
+    async pollDelivery(deliveryId, attempts = 60) {
+        for (let i = 0; i < attempts; i++) {
+            await new Promise(resolve => setTimeout(resolve, 2000));
+            try {
+                const response = await fetch(`/api/integrations/deliveries/${deliveryId}`);
+                const delivery = await response.json();
+                
+                if (delivery.status === 'sent') {
+                    this.showAlert(delivery.result.message, 'success');
+                    return;
+                }
+                if (delivery.status === 'failed') {
+                    this.showAlert(delivery.last_error || 'Delivery failed', 'danger');
+                    return;
+                }
+            } catch (error) {
+                console.error('Error checking delivery:', error);
+            }
+        }
+    }
+
     getIntegrationConfig(integrationType) {
         switch (integrationType) {
             case 'email':
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.standins import store_environment
+
+# Point every SQLite store at a scratch directory before any app module reads its path
+os.environ.update(store_environment(tempfile.mkdtemp(prefix='nuvian-tests-')))
+os.environ.pop('OPENAI_API_KEY', None)
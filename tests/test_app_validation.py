@@ -0,0 +1,62 @@
+import pytest
+
+import app_simple
+
+@pytest.fixture
+def client(monkeypatch):
+    # Validation runs before any work, so the background workers are not needed
+    monkeypatch.setattr(app_simple, 'start_background_workers', lambda: None)
+    return app_simple.app.test_client()
+
+@pytest.mark.parametrize('feed_urls', [None, [], 'https://a.example/rss', {'url': 'x'}, [1, 2], ['  '], [None]])
+def test_read_feed_urls_rejects_anything_but_a_list_of_urls(feed_urls):
+    with pytest.raises(ValueError):
+        app_simple.read_feed_urls({'feed_urls': feed_urls})
+
+def test_read_feed_urls_strips_urls():
+    assert app_simple.read_feed_urls({'feed_urls': [' https://a.example/rss ']}) == ['https://a.example/rss']
+
+def test_read_relevance_criteria():
+    assert app_simple.read_relevance_criteria({}) == []
+    assert app_simple.read_relevance_criteria({'relevance_criteria': ['trending']}) == ['trending']
+    for value in ('trending', [1], {'trending': True}):
+        with pytest.raises(ValueError):
+            app_simple.read_relevance_criteria({'relevance_criteria': value})
+
+def test_read_max_articles():
+    assert app_simple.read_max_articles({}) == 20
+    assert app_simple.read_max_articles({'max_articles': '5'}) == 5
+    for value in (0, -1, 'abc', [5]):
+        with pytest.raises(ValueError):
+            app_simple.read_max_articles({'max_articles': value})
+
+@pytest.mark.parametrize('path', ['/api/feeds/analyze', '/api/jobs/analyze'])
+@pytest.mark.parametrize('body', [
+    {'feed_urls': 'https://a.example/rss'},
+    {'feed_urls': [1, 2]},
+    {'feed_urls': ['https://a.example/rss'], 'relevance_criteria': 'trending'},
+    {'feed_urls': ['https://a.example/rss'], 'max_articles': 'many'}
+])
+def test_analyze_endpoints_reject_malformed_bodies(client, path, body):
+    response = client.post(path, json=body)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+def test_create_digest_rejects_string_feed_urls(client):
+    response = client.post('/api/digests', json={
+        'integration_type': 'slack', 'cron': '0 9 * * *', 'feed_urls': 'https://a.example/rss'
+    })
+    assert response.status_code == 400
+
+def test_read_budget_ms():
+    assert app_simple.read_budget_ms({}) is None
+    assert app_simple.read_budget_ms({'budget_ms': '250'}) == 250.0
+    for value in ('abc', -5, 0, True, float('inf'), 'nan', [100]):
+        with pytest.raises(ValueError):
+            app_simple.read_budget_ms({'budget_ms': value})
+
+@pytest.mark.parametrize('budget_ms', ['abc', -5, 0])
+def test_analyze_rejects_invalid_budget(client, budget_ms):
+    response = client.post('/api/feeds/analyze', json={'feed_urls': ['https://a.example/rss'], 'budget_ms': budget_ms})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'budget_ms must be a positive number'
@@ -0,0 +1,81 @@
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from article_text import ArticleFetcher, TextExtractor, detect_encoding
+from benchmarks.standins import StandInServer
+
+PARAGRAPH = 'Café owners in Zürich report that naïve pricing models fail when demand shifts — résumé inside. '
+
+def _extract(html, max_chars=8000):
+    extractor = TextExtractor(max_chars)
+    extractor.feed(html)
+    return extractor.text()
+
+def test_extractor_prefers_article_content_over_boilerplate():
+    html = (
+        '<html><head><script>var tracking = "' + 'x' * 100 + '";</script></head><body>'
+        '<nav><ul><li>' + 'Navigation link text that is long enough to count' * 2 + '</ul></nav>'
+        '<div>' + 'Sidebar promotion copy that is long enough to be kept as a block. ' * 2 + '</div>'
+        '<article><h1>Short title</h1><p>' + PARAGRAPH * 3 + '</p></article>'
+        '<footer><p>' + 'Footer text that is long enough to count as a block.' * 2 + '</p></footer>'
+        '</body></html>'
+    )
+    assert _extract(html) == (PARAGRAPH * 3).strip()
+
+def test_extractor_falls_back_to_page_blocks_and_caps_length():
+    html = '<body>' + ''.join(f'<p>Paragraph {index}: {PARAGRAPH}</p>' for index in range(20)) + '</body>'
+    text = _extract(html, max_chars=300)
+    assert text.startswith('Paragraph 0: Café')
+    assert len(text) == 300
+
+@pytest.mark.parametrize('content_type, head, expected', [
+    ('text/html', b'<html>', 'utf-8'),
+    ('text/html; charset=Windows-1252', b'<meta charset="utf-8">', 'cp1252'),
+    ('text/html', b'<head><meta charset="ISO-8859-2">', 'iso8859-2'),
+    ('text/html', b'<meta http-equiv="Content-Type" content="text/html; charset=shift_jis">', 'shift_jis'),
+    ('text/html; charset=bogus', b'', 'utf-8'),
+    ('text/html', b'\xef\xbb\xbf<html>', 'utf-8'),
+    ('text/html; charset=latin-1', b'\xff\xfe<\x00', 'utf-16')
+])
+def test_detect_encoding(content_type, head, expected):
+    assert detect_encoding(content_type, head) == expected
+
+class _PageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        content_type, body = self.server.standin.pages[self.path]
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        # Dribble the body out so multibyte characters straddle reads
+        for offset in range(0, len(body), 7):
+            self.wfile.write(body[offset:offset + 7])
+            self.wfile.flush()
+
+@pytest.fixture
+def pages():
+    server = StandInServer(_PageHandler)
+    server.pages = {}
+    with server:
+        yield server
+
+def test_fetch_text_decodes_pages_split_across_reads(pages):
+    article = '<article><p>' + PARAGRAPH * 8 + '</p></article>'
+    pages.pages = {
+        # No charset in the header: requests would assume ISO-8859-1
+        '/utf8': ('text/html', f'<html><body>{article}</body></html>'.encode('utf-8')),
+        '/cp1252': ('text/html', f'<html><head><meta charset="windows-1252"></head><body>{article}</body></html>'
+                    .encode('cp1252')),
+        '/json': ('application/json', b'{}')
+    }
+    fetcher = ArticleFetcher()
+
+    assert fetcher.fetch_text(f'{pages.base_url}/utf8') == (PARAGRAPH * 8).strip()
+    assert fetcher.fetch_text(f'{pages.base_url}/cp1252') == (PARAGRAPH * 8).strip()
+    assert fetcher.fetch_text(f'{pages.base_url}/json') == ''
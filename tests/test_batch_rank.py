@@ -0,0 +1,101 @@
+import argparse
+import json
+import tarfile
+import threading
+
+import pytest
+
+import batch_rank
+from benchmarks.corpus import generate_rss
+from feed_parser import parse_rss_content
+
+def test_parse_criteria():
+    assert batch_rank.parse_criteria(' Trending, expertise ,') == ['trending', 'expertise']
+    assert batch_rank.parse_criteria('') == []
+    with pytest.raises(argparse.ArgumentTypeError):
+        batch_rank.parse_criteria('trending, vibes')
+
+def test_is_feed_file():
+    assert batch_rank.is_feed_file('snapshots/A.XML')
+    assert batch_rank.is_feed_file('feed.atom.gz')
+    assert not batch_rank.is_feed_file('notes.txt.gz')
+
+def test_iter_batches():
+    assert list(batch_rank.iter_batches(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+def test_iter_bounded_reads_ahead_only_while_slots_are_free():
+    pulled = []
+
+    def sources():
+        for index in range(100):
+            pulled.append(index)
+            yield index
+
+    slots = threading.Semaphore(3)
+    stop = threading.Event()
+    consumed = []
+
+    def feed():
+        for item in batch_rank.iter_bounded(sources(), slots, stop):
+            consumed.append(item)
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    feeder.join(0.2)
+    assert consumed == [0, 1, 2]
+    assert len(pulled) == 4
+
+    slots.release()
+    feeder.join(0.2)
+    assert consumed == [0, 1, 2, 3]
+    # Stopping unblocks the feeder without yielding anything more
+    stop.set()
+    slots.release()
+    feeder.join(1)
+    assert not feeder.is_alive()
+    assert consumed == [0, 1, 2, 3]
+
+def test_parse_errors_are_reported_to_the_caller():
+    errors = []
+    assert parse_rss_content(None, 'https://a.example/rss', errors=errors) == []
+    assert errors and errors[0]['feed_url'] == 'https://a.example/rss'
+
+@pytest.fixture
+def snapshots(tmp_path):
+    root = tmp_path / 'snapshots'
+    (root / 'day2').mkdir(parents=True)
+    for feed_id in range(6):
+        # The same feed archived on two days holds the same items
+        (root / f'{feed_id}.xml').write_text(generate_rss(5, seed=1, feed_id=feed_id), encoding='utf-8')
+        (root / 'day2' / f'{feed_id}.rss').write_text(generate_rss(5, seed=1, feed_id=feed_id), encoding='utf-8')
+    (root / 'broken.xml').write_bytes(b'\xff\xfe not a feed')
+    (root / 'readme.txt').write_text('ignored')
+
+    archive = tmp_path / 'snapshots.tar.gz'
+    with tarfile.open(archive, 'w:gz') as tar:
+        tar.add(root, arcname='snapshots')
+    return root, archive
+
+def _rank(capsys, *argv):
+    batch_rank.main([str(argv[0]), '--industry', 'technology', '--batch-size', '2'] + list(argv[1:]))
+    captured = capsys.readouterr()
+    return [json.loads(line) for line in captured.out.splitlines()], captured.err
+
+def test_directory_and_tar_inputs_rank_the_same(snapshots, capsys):
+    root, archive = snapshots
+    from_directory, summary = _rank(capsys, root, '--workers', '1')
+    from_tar, _ = _rank(capsys, archive, '--workers', '2')
+
+    assert len(from_directory) == 30
+    assert [article['rank'] for article in from_directory] == list(range(1, 31))
+    scores = [article['relevance_score'] for article in from_directory]
+    assert scores == sorted(scores, reverse=True)
+    assert [(article['link'], article['relevance_score']) for article in from_tar] == \
+        [(article['link'], article['relevance_score']) for article in from_directory]
+    assert 'from 13 files' in summary
+
+def test_top_limits_the_output(snapshots, capsys, tmp_path):
+    root, _ = snapshots
+    output = tmp_path / 'ranked.jsonl'
+    batch_rank.main([str(root), '--industry', 'technology', '--workers', '1', '--top', '5', '--output', str(output)])
+    assert len(output.read_text(encoding='utf-8').splitlines()) == 5
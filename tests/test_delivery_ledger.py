@@ -0,0 +1,44 @@
+from delivery_ledger import BloomFilter, DeliveryLedger
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    for index in range(1000):
+        bloom.add(f'item-{index}')
+
+    assert all(f'item-{index}' in bloom for index in range(1000))
+    false_positives = sum(f'other-{index}' in bloom for index in range(10000))
+    assert false_positives < 300
+    assert bloom.count == 1000
+
+def test_filter_new_skips_articles_already_delivered(tmp_path):
+    ledger = DeliveryLedger(path=str(tmp_path / 'ledger.sqlite3'))
+    articles = [{'link': 'https://news.example/1'}, {'link': 'https://news.example/2'}]
+    ledger.record('slack:a', articles[:1])
+
+    assert ledger.filter_new('slack:a', articles) == articles[1:]
+    # Deliveries are tracked per destination
+    assert ledger.filter_new('slack:b', articles) == articles
+
+def test_records_from_another_worker_are_seen(tmp_path):
+    path = str(tmp_path / 'ledger.sqlite3')
+    first, second = DeliveryLedger(path=path), DeliveryLedger(path=path)
+    article = {'link': 'https://news.example/1'}
+    first.record('slack:a', [article])
+    assert second.filter_new('slack:a', [article]) == []
+
+def test_filter_stays_exact_after_the_bloom_filter_fills(tmp_path):
+    ledger = DeliveryLedger(path=str(tmp_path / 'ledger.sqlite3'), capacity=10)
+    articles = [{'link': f'https://news.example/{index}'} for index in range(50)]
+    ledger.record('slack:a', articles[:40])
+
+    assert ledger.filter_new('slack:a', articles) == articles[40:]
+    assert ledger._bloom.capacity >= 40
+
+def test_article_hash_falls_back_to_title():
+    assert DeliveryLedger.article_hash({'title': ' Big News '}) == DeliveryLedger.article_hash({'title': 'big news'})
+
+def test_destination_key_ignores_recipient_order_and_case():
+    assert DeliveryLedger.destination_key('email', {'recipients': 'A@example.com, b@example.com'}) == \
+        DeliveryLedger.destination_key('email', {'recipients': ['b@example.com', 'a@example.com']})
+    assert DeliveryLedger.destination_key('slack', {'webhook_url': 'https://hooks.example/1'}) != \
+        DeliveryLedger.destination_key('slack', {'webhook_url': 'https://hooks.example/2'})
@@ -0,0 +1,43 @@
+from digest_templates import SLACK_MAX_BLOCKS, SLACK_MAX_HEADER_CHARS, DigestRenderer
+
+def _articles(count):
+    return [
+        {'title': f'Story {index}', 'link': f'https://news.example/{index}', 'summary': 'Summary',
+         'source': 'Example', 'relevance_score': 50.0}
+        for index in range(count)
+    ]
+
+def test_render_slack_parts_splits_at_the_block_limit():
+    articles = _articles(120)
+    parts = DigestRenderer().render_slack_parts(articles, title='Daily')
+
+    assert len(parts) == 3
+    assert all(len(payload['blocks']) <= SLACK_MAX_BLOCKS for payload, _ in parts)
+    # Every article goes out exactly once, in order, with the payload that carries it
+    assert [article for _, chunk in parts for article in chunk] == articles
+    for payload, chunk in parts:
+        assert len(payload['blocks']) == len(chunk) + 1
+    assert parts[0][0]['blocks'][0]['text']['text'] == 'Daily (120 articles) - part 1/3'
+
+def test_render_slack_single_message_and_empty_digest():
+    renderer = DigestRenderer()
+    [payload] = renderer.render_slack(_articles(SLACK_MAX_BLOCKS - 1))
+    assert len(payload['blocks']) == SLACK_MAX_BLOCKS
+    assert 'part' not in payload['blocks'][0]['text']['text']
+
+    [empty] = renderer.render_slack([])
+    assert len(empty['blocks']) == 1
+
+def test_render_slack_escapes_and_truncates():
+    article = {'title': 'A <b>&</b> B', 'link': 'https://news.example/?a=1&b=2', 'summary': 'x' * 500}
+    [payload] = DigestRenderer().render_slack([article], title='T' * 300)
+
+    text = payload['blocks'][1]['text']['text']
+    assert '<https://news.example/?a=1&amp;b=2|A &lt;b&gt;&amp;&lt;/b&gt; B>' in text
+    assert '\n' + 'x' * 197 + '...\n' in text
+    assert len(payload['blocks'][0]['text']['text']) == SLACK_MAX_HEADER_CHARS
+
+def test_render_email_escapes_article_fields():
+    html = DigestRenderer().render_email([{'title': '<script>alert(1)</script>', 'link': 'https://news.example/'}])
+    assert '<script>' not in html
+    assert '&lt;script&gt;' in html
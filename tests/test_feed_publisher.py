@@ -0,0 +1,47 @@
+import json
+import xml.etree.ElementTree as ET
+
+from feed_parser import parse_rss_content
+from feed_publisher import FeedPublisher
+
+FEED = {'id': 'urn:nuvian:digest:1', 'title': 'Tech <Digest>', 'description': 'Top stories',
+        'self_url': 'https://nuvian.example/api/digests/1/feed.atom'}
+ARTICLES = [
+    {'title': 'A & B', 'link': 'https://news.example/1?a=1&b=2', 'summary': 'Summary', 'analysis': 'Why it matters',
+     'published': 'Mon, 02 Sep 2024 10:00:00 GMT', 'relevance_score': 80.0},
+    {'title': 'Undated', 'link': 'https://news.example/2', 'summary': '', 'published': 'not a date'}
+]
+
+def test_publish_renders_every_format(tmp_path):
+    publisher = FeedPublisher(path=str(tmp_path / 'feeds.sqlite3'))
+    assert publisher.publish('1', FEED, ARTICLES)
+
+    rss = publisher.body('1', 'rss').decode('utf-8')
+    ET.fromstring(rss)
+    parsed = parse_rss_content(rss, 'https://nuvian.example/feed.rss')
+    assert [article['link'] for article in parsed] == ['https://news.example/1?a=1&b=2', 'https://news.example/2']
+
+    atom = ET.fromstring(publisher.body('1', 'atom'))
+    namespace = {'atom': 'http://www.w3.org/2005/Atom'}
+    assert atom.find('atom:title', namespace).text == 'Tech <Digest>'
+    assert atom.find('atom:entry/atom:updated', namespace).text == '2024-09-02T10:00:00+00:00'
+
+    feed = json.loads(publisher.body('1', 'json'))
+    assert feed['feed_url'] == FEED['self_url']
+    assert feed['items'][0]['content_text'] == 'Summary\n\nWhy it matters'
+    assert feed['items'][0]['_nuvian'] == {'relevance_score': 80.0}
+
+def test_unchanged_ranking_keeps_its_etag(tmp_path):
+    publisher = FeedPublisher(path=str(tmp_path / 'feeds.sqlite3'))
+    publisher.publish('1', FEED, ARTICLES)
+    headers = publisher.headers('1', 'rss')
+
+    # Scores alone don't show in the feeds, so a re-scored ranking is not republished
+    assert not publisher.publish('1', FEED, [dict(ARTICLES[0], relevance_score=10.0), ARTICLES[1]])
+    assert publisher.headers('1', 'rss') == headers
+    assert publisher.publish('1', FEED, ARTICLES[:1])
+    assert publisher.headers('1', 'rss')[0] != headers[0]
+
+    publisher.delete('1')
+    assert publisher.headers('1', 'rss') is None
+    assert publisher.body('1', 'json') is None
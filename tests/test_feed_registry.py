@@ -0,0 +1,76 @@
+import pytest
+
+from feed_registry import FeedRegistry
+
+@pytest.fixture
+def registry(tmp_path):
+    return FeedRegistry(path=str(tmp_path / 'registry.sqlite3'), workers=2)
+
+def _urls(registry, table='feeds'):
+    return {row[0] for row in registry._connect().execute(f'SELECT url FROM {table}')}
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://a.example/rss', True),
+    ('http://a.example/rss', True),
+    ('ftp://a.example/rss', False),
+    ('/rss', False),
+    ('h', False),
+    (None, False),
+    (42, False)
+])
+def test_is_feed_url(url, expected):
+    assert FeedRegistry.is_feed_url(url) is expected
+
+def test_register_follows_redirects_and_skips_non_urls(registry, monkeypatch):
+    redirects = {'http://a.example/rss': 'https://a.example/feed.xml'}
+    monkeypatch.setattr(registry, '_resolve', lambda url: (url, redirects.get(url, url)))
+
+    # A string iterated by mistake would register one row per character
+    registry.register('technology', list('https://') + ['http://a.example/rss', 'ftp://b.example/rss'])
+
+    assert _urls(registry) == {'https://a.example/feed.xml'}
+    assert registry.canonical('http://a.example/rss') == 'https://a.example/feed.xml'
+    assert [feed['url'] for feed in registry.feeds_for('technology')] == ['https://a.example/feed.xml']
+
+def test_failed_lookups_are_not_repeated_until_the_retry_passes(registry, monkeypatch):
+    lookups = []
+
+    def resolve(url):
+        lookups.append(url)
+        return url, None
+
+    monkeypatch.setattr(registry, '_resolve', resolve)
+    registry.register('technology', ['https://down.example/rss'])
+    registry.register('technology', ['https://down.example/rss'])
+    assert lookups == ['https://down.example/rss']
+    # The feed is still registered, just not marked as resolved
+    assert _urls(registry) == {'https://down.example/rss'}
+    assert not registry.is_known('https://down.example/rss')
+
+    registry.resolve_retry = 0
+    registry._connect().execute('UPDATE feed_resolve_failures SET failed_at = failed_at - 1')
+    registry.register('technology', ['https://down.example/rss'])
+    assert len(lookups) == 2
+
+def test_record_fetch_only_keeps_registered_or_successful_feeds(registry):
+    registry.record_fetch('https://unknown.example/rss', False, 1.5)
+    registry.record_fetch('not a url', True, 0.1, [{'link': 'https://a.example/1'}])
+    assert _urls(registry) == set()
+
+    articles = [{'link': 'https://a.example/1'}, {'link': 'https://a.example/2'}]
+    registry.record_fetch('https://a.example/rss', True, 0.2, articles, title='A')
+    registry.record_fetch('https://a.example/rss', True, 0.4, articles)
+    registry.record_fetch('https://a.example/rss', False, 2.0)
+
+    [feed] = registry.stats()
+    assert feed['url'] == 'https://a.example/rss'
+    assert feed['title'] == 'A'
+    assert (feed['fetches'], feed['failures'], feed['items']) == (3, 1, 2)
+
+def test_rank_prefers_fast_feeds_under_a_deadline(registry):
+    for host, latency in (('slow', 4.0), ('fast', 0.1)):
+        articles = [{'link': f'https://{host}.example/{index}'} for index in range(5)]
+        registry.record_fetch(f'https://{host}.example/rss', True, latency, articles)
+
+    assert registry.rank(['https://slow.example/rss', 'https://fast.example/rss'], by_latency=True)[0] == \
+        'https://fast.example/rss'
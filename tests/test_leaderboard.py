@@ -0,0 +1,55 @@
+import pytest
+
+from leaderboard import Leaderboard
+
+@pytest.fixture
+def board(tmp_path):
+    return Leaderboard(path=str(tmp_path / 'leaderboard.sqlite3'), capacity=3)
+
+def _article(index, score):
+    return {'link': f'https://news.example/{index}', 'title': f'Story {index}', 'relevance_score': score}
+
+def test_criteria_key_normalizes_but_keeps_duplicates():
+    assert Leaderboard.criteria_key([' Trending', 'innovation', '']) == 'innovation,trending'
+    assert Leaderboard.criteria_key(['trending', 'trending']) == 'trending,trending'
+    assert Leaderboard.criteria_key(None) == ''
+
+def test_top_keeps_the_best_capacity_articles_per_ranking(board):
+    board.ingest('Tech', ['trending'], [_article(index, score) for index, score in enumerate([10, 50, 30, 40, 20])])
+
+    assert [article['relevance_score'] for article in board.top('tech', ['trending'])] == [50, 40, 30]
+    # Rankings scored for other criteria are kept apart
+    assert board.top('tech', []) == []
+    assert board.top('tech', ['trending'], limit=1)[0]['decayed_score'] == pytest.approx(50, rel=1e-3)
+
+def test_ingest_ignores_articles_without_links_and_unchanged_rescores(board):
+    assert board.ingest('tech', [], [{'title': 'No link', 'relevance_score': 90}]) == 0
+    assert board.ingest('tech', [], [_article(1, 10)]) == 1
+    assert board.ingest('tech', [], [_article(1, 10)]) == 0
+    assert board.ingest('tech', [], [_article(1, 60)]) == 1
+    assert board.top('tech')[0]['relevance_score'] == 60
+
+def test_cursor_round_trip_and_rejection(board, tmp_path):
+    cursor = board.encode_cursor(0)
+    assert '=' not in cursor
+    assert board.decode_cursor(cursor) == 0
+    for malformed in ('!!!', 'bm90LWEtY3Vyc29y', ''):
+        with pytest.raises(ValueError):
+            board.decode_cursor(malformed)
+    # A cursor from another store, or past this one's sequence, asks the client to start over
+    other = Leaderboard(path=str(tmp_path / 'other.sqlite3'))
+    assert board.decode_cursor(other.current_cursor()) is None
+    assert board.decode_cursor(board.encode_cursor(99)) is None
+
+def test_changes_pages_through_new_and_rescored_articles(board):
+    start = board.decode_cursor(board.current_cursor())
+    board.ingest('tech', [], [_article(1, 10), _article(2, 20)])
+    board.ingest('tech', [], [_article(1, 30)])
+
+    articles, cursor, has_more = board.changes('tech', [], start, limit=1)
+    assert [article['link'] for article in articles] == ['https://news.example/2']
+    assert has_more
+    articles, cursor, has_more = board.changes('tech', [], board.decode_cursor(cursor), limit=1)
+    assert [(article['link'], article['relevance_score']) for article in articles] == [('https://news.example/1', 30)]
+    assert not has_more
+    assert board.changes('tech', [], board.decode_cursor(cursor)) == ([], cursor, False)
@@ -0,0 +1,65 @@
+import io
+
+import pytest
+
+from feed_registry import FeedRegistry
+from opml import OPMLError, import_outlines, parse_opml, render_opml
+
+OPML = b"""<?xml version="1.0"?>
+<opml version="2.0">
+  <head><title>Subscriptions</title></head>
+  <body>
+    <outline text="Technology">
+      <outline type="rss" text="A" xmlUrl=" https://a.example/rss " />
+      <outline text="Nested">
+        <outline type="rss" title="B" xmlUrl="https://b.example/rss" />
+      </outline>
+    </outline>
+    <outline type="rss" text="C" xmlurl="https://c.example/rss" category="/Finance/Markets" />
+  </body>
+</opml>"""
+
+def test_parse_opml_takes_categories_from_folders_and_attributes():
+    assert list(parse_opml(io.BytesIO(OPML))) == [
+        {'url': 'https://a.example/rss', 'title': 'A', 'category': 'Technology'},
+        {'url': 'https://b.example/rss', 'title': 'B', 'category': 'Nested'},
+        {'url': 'https://c.example/rss', 'title': 'C', 'category': 'Finance'}
+    ]
+
+def test_parse_opml_rejects_malformed_and_oversized_files():
+    with pytest.raises(OPMLError):
+        list(parse_opml(io.BytesIO(b'<opml><body><outline xmlUrl="x">')))
+    with pytest.raises(OPMLError):
+        list(parse_opml(io.BytesIO(OPML), max_bytes=100))
+
+def test_render_opml_round_trips():
+    feeds = [('finance', 'https://c.example/rss', None), ('tech', 'https://a.example/rss?a=1&b=2', 'A "quoted" feed')]
+    document = ''.join(render_opml(feeds)).encode('utf-8')
+    assert [(outline['category'], outline['url'], outline['title']) for outline in parse_opml(io.BytesIO(document))] == [
+        ('finance', 'https://c.example/rss', 'https://c.example/rss'),
+        ('tech', 'https://a.example/rss?a=1&b=2', 'A "quoted" feed')
+    ]
+
+class _Discoverer:
+    def validate(self, url):
+        if 'invalid' in url:
+            return None
+        return {'url': url.replace('http://', 'https://'), 'title': ''}
+
+def test_import_outlines_sorts_feeds_into_statuses(tmp_path):
+    registry = FeedRegistry(path=str(tmp_path / 'registry.sqlite3'))
+    registry.add('tech', 'https://known.example/rss')
+    outlines = [
+        {'url': 'http://new.example/rss', 'title': 'New', 'category': 'Tech'},
+        {'url': 'http://new.example/rss', 'title': 'New', 'category': 'Tech'},
+        {'url': 'https://known.example/rss', 'title': 'Known', 'category': ''},
+        {'url': 'https://invalid.example/rss', 'title': 'Broken', 'category': 'Tech'}
+    ]
+
+    summary = import_outlines(outlines, registry, _Discoverer())
+
+    assert (summary['added'], summary['existing'], summary['duplicate'], summary['invalid']) == (1, 1, 1, 1)
+    assert registry.canonical('http://new.example/rss') == 'https://new.example/rss'
+    assert [(industry, url, title) for industry, url, title in registry.export('tech')] == [
+        ('tech', 'https://known.example/rss', None), ('tech', 'https://new.example/rss', 'New')
+    ]
@@ -0,0 +1,48 @@
+import time
+
+from result_cache import ResultCache
+
+def test_make_key_ignores_feed_order_duplicates_and_whitespace():
+    cache = ResultCache()
+    key = cache.make_key(['https://a.example/rss', 'https://b.example/rss'], 'Tech', ['trending'], 20)
+    assert cache.make_key(
+        [' https://b.example/rss', 'https://a.example/rss', 'https://a.example/rss', ''], ' tech ', ['trending'], '20'
+    ) == key
+
+def test_make_key_keeps_duplicate_criteria():
+    cache = ResultCache()
+    feeds = ['https://a.example/rss']
+    # Each criteria entry adds to the score, so a repeated one is a different request
+    assert cache.make_key(feeds, 'tech', ['trending'], 20) != cache.make_key(feeds, 'tech', ['trending', 'trending'], 20)
+    assert cache.make_key(feeds, 'tech', ['innovation', 'trending'], 20) == \
+        cache.make_key(feeds, 'tech', ['trending', 'innovation'], 20)
+
+def test_make_key_separates_max_articles_and_full_text():
+    cache = ResultCache()
+    feeds = ['https://a.example/rss']
+    keys = {
+        cache.make_key(feeds, 'tech', [], 20),
+        cache.make_key(feeds, 'tech', [], 10),
+        cache.make_key(feeds, 'tech', [], 20, full_text=True)
+    }
+    assert len(keys) == 3
+
+def test_get_reports_fresh_then_miss_after_clear():
+    cache = ResultCache(ttl=60, stale_ttl=60)
+    cache.set('key', {'articles': []})
+    value, etag, state = cache.get('key')
+    assert (value, state) == ({'articles': []}, 'fresh')
+    assert etag
+    cache.clear()
+    assert cache.get('key') == (None, None, 'miss')
+
+def test_refresh_async_keeps_entry_when_compute_returns_none():
+    cache = ResultCache(ttl=0, stale_ttl=60)
+    cache.set('key', {'articles': ['old']})
+    # A budgeted refresh that skipped work returns None and must not replace the entry
+    assert cache.refresh_async('key', lambda: None)
+    deadline = time.monotonic() + 5
+    while cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    value, _, state = cache.get('key')
+    assert (value, state) == ({'articles': ['old']}, 'stale')
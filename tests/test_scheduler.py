@@ -0,0 +1,90 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from scheduler import CronExpression, DigestScheduler
+
+@pytest.mark.parametrize('expression', ['* * * *', '60 * * * *', '* 24 * * *', '* * 0 * *', '*/0 * * * *', '5-1 * * * *'])
+def test_invalid_expressions_are_rejected(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+def test_fields_expand_lists_ranges_and_steps():
+    cron = CronExpression('0,30 9-17/4 * * 7')
+    assert cron.minutes == {0, 30}
+    assert cron.hours == {9, 13, 17}
+    # 7 and 0 both mean Sunday
+    assert cron.weekdays == {0}
+
+def test_next_after_rolls_over_hours_days_and_months():
+    cron = CronExpression('15 9 1 * *')
+    assert cron.next_after(datetime(2024, 1, 1, 9, 15)) == datetime(2024, 2, 1, 9, 15)
+    assert cron.next_after(datetime(2024, 12, 31, 23, 59)) == datetime(2025, 1, 1, 9, 15)
+
+def test_restricted_day_and_weekday_match_either():
+    # The 13th or any Friday
+    cron = CronExpression('0 0 13 * 5')
+    assert cron.days_restricted and cron.weekdays_restricted
+    assert cron.next_after(datetime(2024, 9, 1)) == datetime(2024, 9, 6)
+    assert cron.next_after(datetime(2024, 9, 10)) == datetime(2024, 9, 13)
+
+def test_stepped_star_day_counts_as_unrestricted():
+    # Vixie cron: */2 starts with '*', so only Mondays on odd days match, not every odd day
+    cron = CronExpression('0 9 */2 * 1')
+    assert not cron.days_restricted
+    run = cron.next_after(datetime(2024, 9, 1))
+    assert run == datetime(2024, 9, 9, 9, 0)
+    assert run.weekday() == 0
+
+def test_never_matching_expression_raises():
+    with pytest.raises(ValueError):
+        CronExpression('0 0 31 2 *').next_after(datetime(2024, 1, 1))
+
+def _definition(**overrides):
+    definition = {'industry': 'technology', 'feed_urls': ['https://a.example/rss'], 'integration_type': 'slack',
+                  'config': {'webhook_url': 'https://hooks.example/secret'}, 'cron': '0 9 * * *'}
+    definition.update(overrides)
+    return definition
+
+def test_create_hides_the_integration_config(tmp_path):
+    scheduler = DigestScheduler(lambda digest: {}, path=str(tmp_path / 'digests.sqlite3'), stagger=0)
+    digest = scheduler.create(_definition())
+    assert 'config' not in digest
+    assert scheduler.list() == [digest]
+    assert datetime.fromtimestamp(digest['next_run_at']).strftime('%H:%M') == '09:00'
+    with pytest.raises(ValueError):
+        scheduler.create(_definition(cron='every day'))
+
+def test_due_digest_is_claimed_by_one_worker_only(tmp_path):
+    path = str(tmp_path / 'digests.sqlite3')
+    first = DigestScheduler(lambda digest: {}, path=path, stagger=0)
+    second = DigestScheduler(lambda digest: {}, path=path, stagger=0)
+    digest = first.create(_definition())
+    first.run_now(digest['id'])
+
+    claimed = first._claim_due()
+    assert [row['id'] for row in claimed] == [digest['id']]
+    assert claimed[0]['config'] == {'webhook_url': 'https://hooks.example/secret'}
+    assert second._claim_due() == []
+
+def test_started_scheduler_runs_digests(tmp_path):
+    ran = threading.Event()
+
+    def run_digest(digest):
+        ran.set()
+        return {'sent': 1}
+
+    scheduler = DigestScheduler(run_digest, path=str(tmp_path / 'digests.sqlite3'), stagger=0)
+    digest = scheduler.create(_definition())
+    scheduler.start()
+    scheduler.start()
+    scheduler.run_now(digest['id'])
+
+    assert ran.wait(5)
+    for _ in range(100):
+        if scheduler.get(digest['id'])['last_status'] == 'completed':
+            break
+        time.sleep(0.05)
+    assert scheduler.get(digest['id'])['last_result'] == {'sent': 1}
@@ -0,0 +1,61 @@
+import smtplib
+from email.message import EmailMessage
+
+from benchmarks.standins import SMTPStandIn
+from smtp_pool import SMTPPool
+
+def _message(subject='Digest'):
+    message = EmailMessage()
+    message['From'] = 'digest@example.com'
+    message['Subject'] = subject
+    message.set_content('body')
+    return message
+
+def test_send_reports_refused_recipients_and_reuses_the_connection():
+    with SMTPStandIn(reject={'gone@example.com'}) as server:
+        pool = SMTPPool('127.0.0.1', server.port, starttls=False)
+        results = pool.send([('a@example.com', _message()), ('gone@example.com', _message())])
+        again = pool.send([('b@example.com', _message())])
+        pool.close()
+
+    assert [result['success'] for result in results] == [True, False]
+    assert again == [{'recipient': 'b@example.com', 'success': True}]
+    assert server.connections == 1
+    assert [message['to'] for message in server.messages] == [['a@example.com'], ['b@example.com']]
+
+class _DroppingServer:
+    def __init__(self, fail_on):
+        self.fail_on = fail_on
+        self.sent = []
+
+    def send_message(self, message, to_addrs):
+        if to_addrs[0] == self.fail_on:
+            raise TimeoutError('timed out')
+        self.sent.append(to_addrs[0])
+
+    def quit(self):
+        pass
+
+def test_send_keeps_results_when_the_connection_fails_mid_send(monkeypatch):
+    pool = SMTPPool('127.0.0.1', 0)
+    server = _DroppingServer(fail_on='b@example.com')
+    monkeypatch.setattr(pool, '_open', lambda: server)
+
+    results = pool.send([(recipient, _message()) for recipient in ('a@example.com', 'b@example.com', 'c@example.com')])
+
+    assert [(result['recipient'], result['success']) for result in results] == [
+        ('a@example.com', True), ('b@example.com', False), ('c@example.com', False)
+    ]
+    assert server.sent == ['a@example.com']
+    # A broken connection is not returned to the pool
+    assert pool._idle == []
+
+def test_send_fails_every_recipient_when_no_connection_opens(monkeypatch):
+    pool = SMTPPool('127.0.0.1', 0)
+
+    def refuse():
+        raise smtplib.SMTPConnectError(421, 'busy')
+
+    monkeypatch.setattr(pool, '_open', refuse)
+    results = pool.send([('a@example.com', _message()), ('b@example.com', _message())])
+    assert [result['success'] for result in results] == [False, False]
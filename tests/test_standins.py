@@ -0,0 +1,91 @@
+import os
+import smtplib
+from email.message import EmailMessage
+
+import requests
+
+from benchmarks.standins import (
+    STORE_PATH_VARIABLES, FeedServer, MockOpenAIServer, SMTPStandIn, store_environment
+)
+from feed_parser import parse_rss_content
+
+def test_store_environment_covers_every_store(tmp_path):
+    environment = store_environment(str(tmp_path))
+    assert set(environment) == set(STORE_PATH_VARIABLES)
+    assert all(os.path.dirname(path) == str(tmp_path) for path in environment.values())
+    assert len(set(environment.values())) == len(environment)
+
+def test_feed_server_serves_parseable_deterministic_feeds():
+    with FeedServer(items_per_feed=5) as server:
+        url = server.feed_urls(1)[0]
+        first = requests.get(url, timeout=5)
+        second = requests.get(url, timeout=5)
+        missing = requests.get(f'{server.base_url}/nothing', timeout=5)
+
+    assert first.status_code == 200
+    assert first.headers['Content-Type'] == 'application/rss+xml'
+    assert first.text == second.text
+    assert missing.status_code == 404
+    articles = parse_rss_content(first.text, url, max_items=None)
+    assert len(articles) == 5
+    assert all(article['title'] and article['link'] for article in articles)
+
+def test_feed_server_error_rate():
+    with FeedServer(error_rate=1.0) as server:
+        assert requests.get(server.feed_urls(1)[0], timeout=5).status_code == 503
+
+def test_mock_openai_server_answers_chat_completions():
+    with MockOpenAIServer() as server:
+        response = requests.post(
+            f'{server.api_base}/chat/completions',
+            json={'model': 'gpt-3.5-turbo', 'messages': [{'role': 'user', 'content': 'rate this article'}]},
+            timeout=5
+        )
+        assert server.calls == 1
+
+    body = response.json()
+    assert body['choices'][0]['message']['content']
+    assert body['usage']['prompt_tokens'] == 3
+
+def test_smtp_standin_records_and_rejects_recipients():
+    message = EmailMessage()
+    message['From'] = 'digest@example.com'
+    message['Subject'] = 'Digest'
+    message.set_content('body')
+    with SMTPStandIn(reject={'gone@example.com'}) as server:
+        with smtplib.SMTP('127.0.0.1', server.port, timeout=5) as client:
+            refused = client.send_message(message, to_addrs=['ok@example.com', 'gone@example.com'])
+
+    assert list(refused) == ['gone@example.com']
+    assert server.messages[0]['to'] == ['ok@example.com']
+
+def test_analyze_endpoint_against_feed_server(monkeypatch):
+    import app_simple
+    monkeypatch.setattr(app_simple, 'start_background_workers', lambda: None)
+    client = app_simple.app.test_client()
+    with FeedServer(items_per_feed=5) as server:
+        body = {'feed_urls': server.feed_urls(2), 'industry': 'standins', 'max_articles': 3}
+        response = client.post('/api/feeds/analyze', json=body)
+        repeated = client.post('/api/feeds/analyze', json=body)
+
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'MISS'
+    articles = response.get_json()
+    assert 0 < len(articles) <= 3
+    assert all(article['link'].startswith('https://') for article in articles)
+    assert repeated.headers['X-Cache'] == 'FRESH'
+    assert repeated.get_json() == articles
+
+def test_budgeted_analyze_reports_skipped_feeds(monkeypatch):
+    import app_simple
+    monkeypatch.setattr(app_simple, 'start_background_workers', lambda: None)
+    with FeedServer(items_per_feed=5, latency=0.2) as server:
+        response = app_simple.app.test_client().post('/api/feeds/analyze', json={
+            'feed_urls': server.feed_urls(4, kind='rss'), 'industry': 'budget', 'budget_ms': 100
+        })
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['partial'] is True
+    assert body['skipped']['feeds']
+    assert response.headers.get('ETag') is None